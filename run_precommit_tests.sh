@@ -1,5 +1,11 @@
 #!/bin/bash
 set -e
 
+# Coverage traces every line and slows the run, so it is opt-in
+if [ "$1" = "--coverage" ]; then
+    .venv/bin/python -m pytest --cov=src --cov-branch
+    exit
+fi
+
 # Run all unit tests
 .venv/bin/python -m unittest discover -s tests
@@ -7,62 +7,137 @@ Responsibilities:
 - Validate and assemble a BugReport object
 """
 
-import os
-from typing import Dict, Any, Optional, Tuple
+import io
+import re
+import sys
+import time
+from typing import Dict, Any, List, Optional, Tuple
 
-import openai
-from dotenv import load_dotenv
+import orjson
 
 from src.bug_report.schema import BugReport, Severity
+from src.llm_cache import LLMCache
+from src.openai_client import get_openai_client
 
-load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
+MODEL = "gpt-4.1-nano"
+# Upper bound on the structured output; a bug report is a few short fields
+MAX_OUTPUT_TOKENS = 500
+
+# Static instructions are sent first and kept byte-identical across turns so the
+# API can reuse its cached prompt prefix. Per-turn data goes in later messages.
+SYSTEM_PREFIX = (
+    "You are a helpful assistant collecting bug reports. "
+    "The next message lists which bug report fields are already collected and which are missing. "
+    "Extract any bug report information from the user's message. "
+    "Leave a field empty unless the user's message provides or corrects it. "
+    "Return the bug report in the expected format."
+)
+
+# Computed once instead of on every turn
+BUG_REPORT_FIELDS = tuple(BugReport.model_fields.keys())
+# Values that count as "not provided" for a bug report field
+EMPTY_VALUES = (None, "", [], {})
+# Steps to reproduce are separated by newlines or semicolons
+STEP_SEPARATOR = re.compile(r"[;\n]+")
+# Valid severity strings, for O(1) membership checks
+SEVERITY_VALUES = frozenset(severity.value for severity in Severity)
+
+# Batch jobs that end in one of these states will never produce output
+BATCH_FAILED_STATUSES = ("failed", "expired", "cancelled")
+
+
+def summarize_state(state: Dict[str, Any]) -> str:
+    """
+    Describe which fields are collected and which are missing, without their values.
+    The summary stays the same size every turn, unlike the full state.
+    """
+    collected = [
+        field for field in BUG_REPORT_FIELDS if state.get(field) not in EMPTY_VALUES
+    ]
+    missing = [field for field in BUG_REPORT_FIELDS if field not in collected]
+    return (
+        f"Collected fields: {', '.join(collected) or 'none'}. "
+        f"Missing: {', '.join(missing) or 'none'}."
+    )
+
+
+def build_messages(state: Dict[str, Any], user_input: str) -> List[Dict[str, str]]:
+    """
+    Build the request messages for a turn.
+    The static prefix comes first so it stays cacheable; the state summary and user input follow it.
+    """
+    return [
+        {"role": "system", "content": SYSTEM_PREFIX},
+        {"role": "system", "content": summarize_state(state)},
+        {"role": "user", "content": user_input},
+    ]
+
+
+def merge_report(state: Dict[str, Any], update: BugReport) -> BugReport:
+    """Combine the collected state with the fields the model extracted this turn."""
+    merged = {
+        field: state[field]
+        for field in BUG_REPORT_FIELDS
+        if state.get(field) not in EMPTY_VALUES
+    }
+    for field in BUG_REPORT_FIELDS:
+        value = getattr(update, field)
+        if value not in EMPTY_VALUES:
+            merged[field] = value
+    return BugReport(**merged)
 
 
 class BugReportAgent:
     """Conversational agent for collecting structured bug reports over multiple turns."""
 
-    def __init__(self):
+    # Fields to collect, in order, so we can prompt the user with the correct questions.
+    FIELDS: Tuple[str, ...] = (
+        "project_affected",
+        "error_message",
+        "steps_to_reproduce",
+        "severity",
+    )
+    # Question to ask for each field, shared by all instances
+    PROMPTS: Dict[str, str] = {
+        "project_affected": "What project or component is affected?",
+        "error_message": "What is the error message or problem?",
+        "steps_to_reproduce": "List the steps to reproduce the issue (one per line or separated by ';').",
+        "severity": "What is the severity? (Low, Medium, High)",
+    }
+
+    def __init__(self, cache: Optional[LLMCache] = None):
         # Initialize conversation state
         self.state: Dict[str, Any] = {}
-        # Define the fields to collect in order.
-        # This is so that we can prompt the user with the correct questions later.
-        self.fields = [
-            "project_affected",
-            "error_message",
-            "steps_to_reproduce",
-            "severity",
-        ]
+        # Cache of parsed responses keyed by (model, state, user input)
+        self.cache = cache if cache is not None else LLMCache()
+        self.current_field_index = 0
+
+    def reset(self) -> None:
+        """Clear the conversation state to start a new report. Cached responses are kept."""
+        self.state = {}
         self.current_field_index = 0
 
     def get_next_prompt(self) -> Optional[str]:
         """Return the next prompt for the user, or None if complete."""
-        if self.current_field_index >= len(self.fields):
+        if self.current_field_index >= len(self.FIELDS):
             return None
-        field = self.fields[self.current_field_index]
-        prompts = {
-            "project_affected": "What project or component is affected?",
-            "error_message": "What is the error message or problem?",
-            "steps_to_reproduce": "List the steps to reproduce the issue (one per line or separated by ';').",
-            "severity": "What is the severity? (Low, Medium, High)",
-        }
-        return prompts[field]
+        return self.PROMPTS[self.FIELDS[self.current_field_index]]
 
     def update_state(self, user_input: str) -> None:
         """Update the state with the user's input for the current field."""
-        field = self.fields[self.current_field_index]
+        field = self.FIELDS[self.current_field_index]
         if field == "steps_to_reproduce":
             # Split steps by line or semicolon
             steps = [
-                step.strip()
-                for step in user_input.replace(";", "\n").split("\n")
-                if step.strip()
+                step
+                for step in (part.strip() for part in STEP_SEPARATOR.split(user_input))
+                if step
             ]
             self.state[field] = steps
         elif field == "severity":
             # Normalize and validate severity
             value = user_input.strip().capitalize()
-            if value not in [s.value for s in Severity]:
+            if value not in SEVERITY_VALUES:
                 raise ValueError(f"Invalid severity: {user_input}")
             self.state[field] = value
         else:
@@ -71,7 +146,7 @@ class BugReportAgent:
 
     def is_complete(self) -> bool:
         """Check if all fields have been collected."""
-        return self.current_field_index >= len(self.fields)
+        return self.current_field_index >= len(self.FIELDS)
 
     def assemble_report(self) -> BugReport:
         """Assemble and return the BugReport object from state."""
@@ -95,47 +170,46 @@ class BugReportAgent:
                 - prompt (str): Message to send to the user (acknowledges filled fields, requests missing ones).
                 - is_complete (bool): True if all required fields are filled.
         """
-        # Prepare system prompt with current state
-        system_message = (
-            "You are a helpful assistant collecting bug reports. "
-            "Here is the current bug report state (fields may be missing):\n"
-            f"{self.state}\n"
-            "Update the bug report with any new information from the user's message. "
-            "Return the updated bug report in the expected format."
+        cache_key = LLMCache.make_key(
+            {"model": MODEL, "state": self.state, "user": user_input}
         )
-
-        try:
-            # Call OpenAI API to parse and update the state
-            response = openai.responses.parse(
-                model="gpt-4.1-nano",
-                input=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": user_input},
-                ],
-                text_format=BugReport,
-            )
-            # Parse the output into a BugReport model
-            bug_report = response.output_parsed
-        # pylint: disable=broad-except
-        except (
-            Exception
-        ) as exc:  # Many possible OpenAI errors: rate limit, connection, validation, etc.
-            # Return a partial BugReport (with possibly incomplete fields) and a helpful prompt
-            partial_report = BugReport()
-            prompt = f"There was a problem parsing your input: {exc}"
-            return partial_report, prompt, False
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            bug_report = BugReport(**cached)
+        else:
+            try:
+                # Call OpenAI API to parse and update the state.
+                # temperature=0 keeps the output deterministic so it is safe to cache.
+                response = get_openai_client().responses.parse(
+                    model=MODEL,
+                    input=build_messages(self.state, user_input),
+                    text_format=BugReport,
+                    temperature=0,
+                    max_output_tokens=MAX_OUTPUT_TOKENS,
+                )
+                # Parse the output into a BugReport model
+                bug_report = response.output_parsed
+            # pylint: disable=broad-except
+            except (
+                Exception
+            ) as exc:  # Many possible OpenAI errors: rate limit, connection, validation, etc.
+                # Return a partial BugReport (with possibly incomplete fields) and a helpful prompt
+                partial_report = BugReport()
+                prompt = f"There was a problem parsing your input: {exc}"
+                return partial_report, prompt, False
+            # Store before the defaults below mutate the report
+            self.cache.set(cache_key, bug_report.model_dump())
+        # The model only sees which fields are collected, so fill in their values locally
+        bug_report = merge_report(self.state, bug_report)
 
         # If severity is missing and all other fields are present, set to Medium and mark as complete
-        missing = [
-            field
-            for field in BugReport.model_fields.keys()
-            if getattr(bug_report, field) in (None, "", [], {})
-        ]
-        filled = [
-            field
-            for field in BugReport.model_fields.keys()
-            if getattr(bug_report, field) not in (None, "", [], {})
-        ]
+        missing = []
+        filled = []
+        for field in BUG_REPORT_FIELDS:
+            if getattr(bug_report, field) in EMPTY_VALUES:
+                missing.append(field)
+            else:
+                filled.append(field)
         if missing == ["severity"]:
             bug_report.severity = Severity.MEDIUM
             prompt = (
@@ -173,27 +247,147 @@ class BugReportAgent:
         is_complete = True
         return bug_report, prompt, is_complete
 
+    def submit_batch(self, reports: List[str]) -> str:
+        """
+        Submit bug reports for offline parsing through the OpenAI Batch API.
+        Batch requests cost less and use a separate rate limit pool, but results
+        can take up to 24 hours. Use poll_batch to wait for and collect them.
+        Args:
+            reports (List[str]): Free-text bug reports, one per request.
+        Returns:
+            str: The ID of the created batch.
+        """
+        if not reports:
+            raise ValueError("No bug reports to submit.")
+        text_format = {
+            "format": {
+                "type": "json_schema",
+                "name": "BugReport",
+                "schema": BugReport.model_json_schema(),
+                "strict": False,
+            }
+        }
+        lines = []
+        for index, report in enumerate(reports):
+            request = {
+                "custom_id": f"report-{index}",
+                "method": "POST",
+                "url": "/v1/responses",
+                "body": {
+                    "model": MODEL,
+                    "input": build_messages({}, report),
+                    "text": text_format,
+                    "temperature": 0,
+                    "max_output_tokens": MAX_OUTPUT_TOKENS,
+                },
+            }
+            lines.append(orjson.dumps(request))
+        client = get_openai_client()
+        batch_file = client.files.create(
+            file=("bug_reports.jsonl", io.BytesIO(b"\n".join(lines))),
+            purpose="batch",
+        )
+        batch = client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/responses",
+            completion_window="24h",
+        )
+        return batch.id
+
+    def poll_batch(
+        self,
+        batch_id: str,
+        poll_interval: float = 30.0,
+        timeout: Optional[float] = None,
+    ) -> List[Optional[BugReport]]:
+        """
+        Wait for a batch submitted with submit_batch to finish and return its results.
+        Args:
+            batch_id (str): The batch ID returned by submit_batch.
+            poll_interval (float): Seconds to wait between status checks.
+            timeout (Optional[float]): Maximum seconds to wait, or None to wait indefinitely.
+        Returns:
+            List[Optional[BugReport]]: Parsed reports in submission order.
+            Entries are None for requests that failed or whose output is not a valid report.
+        Raises:
+            RuntimeError: If the batch fails, expires, is cancelled, or the timeout elapses.
+        """
+        client = get_openai_client()
+        start = time.monotonic()
+        batch = client.batches.retrieve(batch_id)
+        while batch.status != "completed":
+            if batch.status in BATCH_FAILED_STATUSES:
+                raise RuntimeError(
+                    f"Batch {batch_id} ended with status '{batch.status}'."
+                )
+            if timeout is not None and time.monotonic() - start > timeout:
+                raise RuntimeError(
+                    f"Timed out waiting for batch {batch_id} (status '{batch.status}')."
+                )
+            time.sleep(poll_interval)
+            batch = client.batches.retrieve(batch_id)
+
+        results: List[Optional[BugReport]] = [None] * batch.request_counts.total
+        if not batch.output_file_id:
+            return results
+        output = client.files.content(batch.output_file_id).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            # A malformed line or a truncated, empty or invalid report only loses its
+            # own entry (pydantic's ValidationError is a ValueError)
+            try:
+                record = orjson.loads(line)
+                index = int(record["custom_id"].split("-")[-1])
+                response = record.get("response") or {}
+                if response.get("status_code") != 200:
+                    continue
+                results[index] = BugReport.model_validate_json(
+                    _output_text(response["body"])
+                )
+            except (ValueError, KeyError, IndexError):
+                continue
+        return results
+
     def report_bug(self):
         """
         Run the full bug report collection process interactively in the console.
         Prompts the user for input, processes each turn, and outputs the final report.
         """
-        print("Welcome to the Bug Report Agent! Type your bug details below.")
+        write = sys.stdout.write
+        write("Welcome to the Bug Report Agent! Type your bug details below.\n")
         is_complete = False
         state = None
         while not is_complete:
+            # input() flushes stdout before blocking, so buffered writes show up in time
             user_input = input("You: ")
             state, prompt, is_complete = self.process_turn(user_input)
-            self.state = (
-                state.model_dump()
-            )  # Store as dict for backward compatibility if needed
-            print(f"Agent: {prompt}\n")
-        print("Final structured bug report:")
+            # Copy only the fields that changed instead of dumping the whole model each turn.
+            # A failed turn returns an empty report, which leaves the collected state intact.
+            for field in BUG_REPORT_FIELDS:
+                value = getattr(state, field)
+                if value not in EMPTY_VALUES and self.state.get(field) != value:
+                    self.state[field] = value
+            write(f"Agent: {prompt}\n\n")
+        # Build the whole report and write it at once instead of a print per line
+        lines = ["Final structured bug report:"]
         data = state.model_dump(by_alias=True)
         for key, value in data.items():
             if key == "Steps To Reproduce" and isinstance(value, list):
-                print(f"{key}:")
-                for i, step in enumerate(value, 1):
-                    print(f"  {i}. {step}")
+                lines.append(f"{key}:")
+                lines.extend(f"  {i}. {step}" for i, step in enumerate(value, 1))
             else:
-                print(f"{key}: {value}")
+                lines.append(f"{key}: {value}")
+        write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+
+def _output_text(response_body: Dict[str, Any]) -> str:
+    """Extract the concatenated output text from a raw Responses API body."""
+    return "".join(
+        content["text"]
+        for item in response_body.get("output", [])
+        if item.get("type") == "message"
+        for content in item.get("content", [])
+        if content.get("type") == "output_text"
+    )
@@ -2,15 +2,14 @@
 Command-line interface for AI Agents project.
 
 Provides subcommands for interacting with the top news and daily standup agents.
+
+Agent modules are imported inside each command. They pull in the OpenAI SDK and
+load the environment, which is slow, so `--help` and other commands skip that cost.
 """
 
+# pylint: disable=import-outside-toplevel
+
 import click
-from src.top_news.agent import top_news
-from src.daily_standup.agent import daily_standup_with_output as standup
-from src.bug_report.agent import BugReportAgent
-from src.file_search.agent import FileSearchAgent
-from src.dev_tools.agent import DevToolsAgent
-from src.dev_tools.function_schemas import get_openai_function_schemas
 
 
 @click.group()
@@ -24,6 +23,8 @@ def ai():
 @click.argument("num_stories", type=int)
 def news_cmd(num_stories):
     """Fetch the top news stories of the day and list summaries."""
+    from src.top_news.agent import top_news
+
     result = top_news(num_stories)
     click.echo(result)
 
@@ -32,17 +33,84 @@ def news_cmd(num_stories):
 @click.argument("status_input", type=str)
 def standup_cmd(status_input):
     """Gather daily status and present it in a standard format. (Enclose your status in quotes)"""
+    from src.daily_standup.agent import daily_standup_with_output as standup
+
     result = standup(status_input)
     click.echo(result)
 
 
 @ai.command(name="bug-report")
-def bug_report_cmd():
-    """Start an interactive bug report session."""
+@click.option(
+    "--batch",
+    "batch_file",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Submit the reports in FILE (separated by blank lines) to the OpenAI Batch API.",
+)
+@click.option(
+    "--batch-results",
+    "batch_id",
+    type=str,
+    help="Wait for a submitted batch to finish and print the parsed reports.",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0),
+    default=60.0,
+    show_default=True,
+    help="Seconds --batch-results waits for the batch before giving up.",
+)
+def bug_report_cmd(batch_file, batch_id, timeout):
+    """Start an interactive bug report session, or triage reports offline in a batch."""
+    from src.bug_report.agent import BugReportAgent
+
     agent = BugReportAgent()
+    if batch_file:
+        with open(batch_file, "r", encoding="utf-8") as f:
+            reports = [
+                block.strip() for block in f.read().split("\n\n") if block.strip()
+            ]
+        try:
+            submitted_id = agent.submit_batch(reports)
+        except ValueError as e:
+            click.echo(str(e))
+            return
+        click.echo(f"Submitted {len(reports)} bug report(s) as batch {submitted_id}.")
+        click.echo(
+            f"Check results with: ./ai bug-report --batch-results {submitted_id}"
+        )
+        return
+    if batch_id:
+        try:
+            results = agent.poll_batch(
+                batch_id, poll_interval=min(10.0, timeout), timeout=timeout
+            )
+        except (RuntimeError, ValueError) as e:
+            click.echo(str(e))
+            return
+        for index, report in enumerate(results, 1):
+            if report is None:
+                click.echo(f"Report {index}: failed to parse")
+            else:
+                click.echo(f"Report {index}: {report.model_dump(by_alias=True)}")
+        return
     agent.report_bug()
 
 
+@ai.command(name="combined")
+@click.argument("status_input", type=str)
+@click.argument("bug_input", type=str)
+def combined_cmd(status_input, bug_input):
+    """Format a standup update and a bug report with a single request. (Enclose each in quotes)"""
+    from src.combined.agent import combined_with_output
+
+    try:
+        result = combined_with_output(status_input, bug_input)
+    except ValueError as e:
+        click.echo(str(e))
+        return
+    click.echo(result)
+
+
 @ai.command(name="file-search")
 @click.argument("file_paths", type=click.Path(exists=True), nargs=-1)
 @click.argument("question", type=str)
@@ -58,6 +126,8 @@ def file_search_cmd(file_paths, question):
     Example:
       python src/cli.py file-search notes.txt report.txt "Summarize the main points."
     """
+    from src.file_search.agent import FileSearchAgent
+
     agent = FileSearchAgent()
     file_ids = []
     for path in file_paths:
@@ -73,9 +143,18 @@ def file_search_cmd(file_paths, question):
 
 
 @ai.command(name="dev-tools")
-def dev_tools_cmd():
+@click.option(
+    "--in-process",
+    is_flag=True,
+    help="Run black, pylint and unittest in children forked from the CLI process instead of new interpreters.",
+)
+def dev_tools_cmd(in_process):
     """Start an interactive DevToolsAgent session (OpenAI-powered developer tools)."""
-    agent = DevToolsAgent()
+    from src.dev_tools.agent import DevToolsAgent
+    from src.dev_tools.function_schemas import get_openai_function_schemas
+    from src.dev_tools.lint_cache import LintCache
+
+    agent = DevToolsAgent(lint_cache=LintCache(), in_process=in_process)
     function_schemas = get_openai_function_schemas()
     agent.run_openai_chat_loop(function_schemas)
 
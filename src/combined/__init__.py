@@ -0,0 +1 @@
+"""Combined standup and bug report agent package."""
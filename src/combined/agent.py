@@ -0,0 +1,114 @@
+"""
+Combined agent that parses a standup update and a bug report in one request.
+
+Running `standup` and `bug-report` back to back costs two round trips. Both
+outputs are structured, so one request with a composite response model returns
+both, and the shared instructions are sent once.
+"""
+
+from pydantic import BaseModel
+
+from src.bug_report.agent import BUG_REPORT_FIELDS, EMPTY_VALUES
+from src.bug_report.agent import MAX_OUTPUT_TOKENS as BUG_REPORT_MAX_OUTPUT_TOKENS
+from src.bug_report.agent import MODEL
+from src.bug_report.schema import BugReport, Severity
+from src.daily_standup.agent import MAX_OUTPUT_TOKENS as STANDUP_MAX_OUTPUT_TOKENS
+from src.daily_standup.agent import DailyStatus, format_daily_status, validate_status
+from src.openai_client import get_openai_client
+
+_COMBINED_SYSTEM = (
+    "You handle two independent tasks for a software development team. "
+    "Standup: categorize the status update into yesterday, today, and blockers; "
+    "leave a section empty if there is no information for it, and start each item with a capital letter. "
+    "Bug: extract the affected project, error message, steps to reproduce, and severity (Low, Medium, High) "
+    "from the bug report; leave a field empty if it is not provided. "
+    "Return both results in the expected format."
+)
+
+
+class CombinedOutput(BaseModel):
+    """Pydantic model for a standup update and a bug report parsed together."""
+
+    standup: DailyStatus
+    bug: BugReport
+
+
+def combined(status: str, bug_text: str) -> CombinedOutput:
+    """
+    Parse a standup update and a bug report with a single API request.
+
+    Args:
+        status (str): Natural language status update
+        bug_text (str): Free-text bug report
+
+    Returns:
+        CombinedOutput: The parsed standup and bug report, not yet validated
+
+    Raises:
+        ValueError: If the model refused or its response was incomplete
+    """
+    response = get_openai_client().responses.parse(
+        model=MODEL,
+        input=[
+            {"role": "system", "content": _COMBINED_SYSTEM},
+            {"role": "user", "content": f"Standup:\n{status}\n\nBug:\n{bug_text}"},
+        ],
+        text_format=CombinedOutput,
+        temperature=0,
+        max_output_tokens=STANDUP_MAX_OUTPUT_TOKENS + BUG_REPORT_MAX_OUTPUT_TOKENS,
+    )
+    # responses.parse leaves output_parsed unset on a refusal or an incomplete response
+    if response.output_parsed is None:
+        raise ValueError(
+            "No standup or bug report was returned: the request was refused or incomplete. "
+            "Please try again."
+        )
+    return response.output_parsed
+
+
+def format_bug_report(bug_report: BugReport) -> str:
+    """
+    Format a BugReport as readable text, noting any fields that are still missing.
+    Severity defaults to Medium when it is the only missing field, as in the bug report agent.
+    """
+    missing = [
+        field
+        for field in BUG_REPORT_FIELDS
+        if getattr(bug_report, field) in EMPTY_VALUES
+    ]
+    if missing == ["severity"]:
+        bug_report.severity = Severity.MEDIUM
+        missing = []
+
+    lines = ["### Bug Report"]
+    for key, value in bug_report.model_dump(by_alias=True, mode="json").items():
+        if isinstance(value, list):
+            lines.append(f"- **{key}:**")
+            lines.extend(f"  {i}. {step}" for i, step in enumerate(value, 1))
+        else:
+            lines.append(f"- **{key}:** {value if value is not None else ''}")
+    if missing:
+        lines.append(f"Missing information for: {', '.join(missing)}.")
+    return "\n".join(lines)
+
+
+def combined_with_output(status: str, bug_text: str) -> str:
+    """
+    Parse a standup update and a bug report together and return both formatted.
+
+    Args:
+        status (str): Natural language status update
+        bug_text (str): Free-text bug report
+
+    Returns:
+        str: The formatted standup (or its error message) followed by the formatted bug report
+
+    Raises:
+        ValueError: If the model refused or its response was incomplete
+    """
+    result = combined(status, bug_text)
+    try:
+        standup_output = format_daily_status(validate_status(result.standup))
+    except ValueError as e:
+        standup_output = str(e)
+    return f"{standup_output}\n\n{format_bug_report(result.bug)}"
@@ -1,16 +1,42 @@
 """Daily Standup Agent for processing and formatting team status updates."""
 
-import os
-from typing import List
+import asyncio
+import re
+from typing import Any, Dict, List, Optional, Union
 
-import openai
-from dotenv import load_dotenv
 from pydantic import BaseModel
 
-load_dotenv()
+from src.openai_client import get_async_openai_client, get_openai_client
+from src.semantic_cache import SemanticCache
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-openai.api_key = OPENAI_API_KEY
+# Three short lists fit comfortably; the cap bounds tail latency on runaway output
+MAX_OUTPUT_TOKENS = 300
+
+# Kept at module scope so every request starts with a byte-identical prefix,
+# which lets the API serve it from its prompt cache.
+_STANDUP_SYSTEM = (
+    "You are a scrum master for a software development team. "
+    "You are collecting daily standup updates. You want to take the information and "
+    "categorize it into three sections: yesterday, today, and blockers. "
+    "If there is no information for a section, leave it empty. "
+    "Each item in the lists should start with a capital letter."
+)
+_STANDUP_BATCH_SYSTEM = (
+    "The user message contains several numbered status updates from different team members. "
+    "Return one entry per update and set its index to the update's number."
+)
+
+# Fast path for updates that already use explicit section labels, e.g.
+# "Yesterday: fixed bugs. Today: write tests. Blockers: none".
+# Labels must end with a colon so free-form prose still goes to the model.
+_LABELED_STATUS = re.compile(
+    r"^\s*yesterday:\s*(?P<yesterday>.*?)\s*today:\s*(?P<today>.*?)"
+    r"(?:\s*blockers?:\s*(?P<blockers>.*?))?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+# Items are separated by semicolons, newlines, or a sentence-ending period
+_ITEM_SEPARATOR = re.compile(r"(?:[;\n]|\.(?=\s|$))+")
+_NO_BLOCKERS = frozenset(["", "none", "no", "n/a", "no blockers", "nothing"])
 
 
 class DailyStatus(BaseModel):
@@ -21,7 +47,19 @@ class DailyStatus(BaseModel):
     blockers: List[str] = []
 
 
-def daily_standup(status: str) -> DailyStatus:
+class IndexedDailyStatus(DailyStatus):
+    """DailyStatus tagged with the position of the update it was parsed from."""
+
+    index: int
+
+
+class DailyStatusBatch(BaseModel):
+    """Pydantic model for several status updates parsed in a single request."""
+
+    statuses: List[IndexedDailyStatus] = []
+
+
+def daily_standup(status: str, cache: Optional[SemanticCache] = None) -> DailyStatus:
     """
     Process daily status in natural language and format it as a structured update.
 
@@ -31,6 +69,8 @@ def daily_standup(status: str) -> DailyStatus:
 
     Args:
         status (str): Natural language status update
+        cache (Optional[SemanticCache]): When given, a near-duplicate of an earlier
+            update returns that update's result instead of calling the model
 
     Returns:
         DailyStatus: Parsed status with yesterday, today, and blockers sections
@@ -43,28 +83,159 @@ def daily_standup(status: str) -> DailyStatus:
         >>> print(result.yesterday)
         ['worked on the login feature']
     """
-    response = openai.responses.parse(
+    labeled_status = _parse_labeled_status(status)
+    if labeled_status is not None:
+        return validate_status(labeled_status)
+    if cache is not None:
+        embedding = cache.embed(status)
+        cached = cache.get(embedding)
+        if cached is not None:
+            return DailyStatus(**cached)
+    response = get_openai_client().responses.parse(**_standup_request(status))
+    parsed_status = validate_status(response.output_parsed)
+    if cache is not None:
+        # Only complete updates are cached, so a hit never skips validation
+        cache.set(embedding, parsed_status.model_dump())
+    return parsed_status
+
+
+async def daily_standup_async(status: str) -> DailyStatus:
+    """
+    Async version of daily_standup using the running event loop's AsyncOpenAI client.
+
+    Args:
+        status (str): Natural language status update
+
+    Returns:
+        DailyStatus: Parsed status with yesterday, today, and blockers sections
+
+    Raises:
+        ValueError: If required information (yesterday or today) is missing
+    """
+    labeled_status = _parse_labeled_status(status)
+    if labeled_status is not None:
+        return validate_status(labeled_status)
+    response = await get_async_openai_client().responses.parse(
+        **_standup_request(status)
+    )
+    return validate_status(response.output_parsed)
+
+
+async def gather_daily_standups(
+    statuses: List[str], max_concurrency: int = 8
+) -> List[Union[DailyStatus, Exception]]:
+    """
+    Process several status updates concurrently.
+
+    Requests overlap instead of running one after another. A semaphore caps the
+    number of requests in flight to stay under the API rate limits.
+
+    Args:
+        statuses (List[str]): Natural language status updates
+        max_concurrency (int): Maximum number of simultaneous API requests
+
+    Returns:
+        List[Union[DailyStatus, Exception]]: One entry per status, in input order.
+        Failed updates (e.g. missing information) are returned as the raised exception.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def process(status: str) -> DailyStatus:
+        async with semaphore:
+            return await daily_standup_async(status)
+
+    return await asyncio.gather(
+        *(process(status) for status in statuses), return_exceptions=True
+    )
+
+
+def daily_standup_many(statuses: List[str]) -> List[Union[DailyStatus, Exception]]:
+    """
+    Process several status updates with a single API request.
+
+    The system prompt is sent once for the whole team instead of once per update,
+    and N updates cost one request against the rate limit instead of N.
+
+    Args:
+        statuses (List[str]): Natural language status updates
+
+    Returns:
+        List[Union[DailyStatus, Exception]]: One entry per status, in input order.
+        Updates with missing information are returned as a ValueError.
+    """
+    if not statuses:
+        return []
+    numbered = "\n\n".join(
+        f"Update {index}:\n{status}" for index, status in enumerate(statuses)
+    )
+    response = get_openai_client().responses.parse(
         model="gpt-4.1-nano",
         input=[
-            {
-                "role": "system",
-                "content": (
-                    "You are a scrum master for a software development team. "
-                    "You are collecting daily standup updates. You want to take the information and "
-                    "categorize it into three sections: yesterday, today, and blockers. "
-                    "If there is no information for a section, leave it empty. "
-                    "Each item in the lists should start with a capital letter."
-                ),
-            },
-            {
-                "role": "user",
-                "content": status,
-            },
+            {"role": "system", "content": _STANDUP_SYSTEM},
+            {"role": "system", "content": _STANDUP_BATCH_SYSTEM},
+            {"role": "user", "content": numbered},
         ],
-        text_format=DailyStatus,
+        text_format=DailyStatusBatch,
+        max_output_tokens=MAX_OUTPUT_TOKENS * len(statuses),
+    )
+
+    # Match parsed entries back to their inputs by index, not by list position
+    by_index = {item.index: item for item in response.output_parsed.statuses}
+    results: List[Union[DailyStatus, Exception]] = []
+    for index in range(len(statuses)):
+        item = by_index.get(index)
+        if item is None:
+            results.append(ValueError(f"No result returned for update {index}."))
+            continue
+        parsed_status = DailyStatus(
+            yesterday=item.yesterday, today=item.today, blockers=item.blockers
+        )
+        try:
+            results.append(validate_status(parsed_status))
+        except ValueError as e:
+            results.append(e)
+    return results
+
+
+def _parse_labeled_status(status: str) -> Optional[DailyStatus]:
+    """
+    Parse an update that uses explicit "Yesterday:/Today:/Blockers:" labels locally.
+    Returns None when the update is not in that format and needs the model.
+    """
+    match = _LABELED_STATUS.match(status)
+    if match is None:
+        return None
+
+    def split_items(text: Optional[str]) -> List[str]:
+        items = (item.strip() for item in _ITEM_SEPARATOR.split(text or ""))
+        # Match the model's output style: each item starts with a capital letter
+        return [item[0].upper() + item[1:] for item in items if item]
+
+    blockers = split_items(match.group("blockers"))
+    if len(blockers) == 1 and blockers[0].lower() in _NO_BLOCKERS:
+        blockers = []
+    return DailyStatus(
+        yesterday=split_items(match.group("yesterday")),
+        today=split_items(match.group("today")),
+        blockers=blockers,
     )
 
-    parsed_status = response.output_parsed
+
+def _standup_request(status: str) -> Dict[str, Any]:
+    """Build the keyword arguments for a standup parse request."""
+    return {
+        "model": "gpt-4.1-nano",
+        "input": [
+            {"role": "system", "content": _STANDUP_SYSTEM},
+            {"role": "user", "content": status},
+        ],
+        "text_format": DailyStatus,
+        "max_output_tokens": MAX_OUTPUT_TOKENS,
+    }
+
+
+def validate_status(parsed_status: DailyStatus) -> DailyStatus:
+    """Fill in default blockers and raise if yesterday or today is missing."""
     missing_info = []
 
     if parsed_status.yesterday == []:
@@ -6,9 +6,12 @@ This script demonstrates how to use the daily_standup agent to process
 natural language status updates into structured daily standup reports.
 """
 
+import asyncio
+
 from src.daily_standup.agent import (
     daily_standup,
     format_daily_status,
+    gather_daily_standups,
 )
 
 
@@ -17,37 +20,30 @@ def main():
     print("Daily Standup Agent - Example Usage")
     print("=" * 40)
 
-    # Example 1: Complete status update
-    print("\n📅 Example 1: Complete Status Update")
-    status1 = (
-        "Yesterday I worked on the login feature and fixed some bugs. "
-        "Today I will continue with the login feature and start on the signup feature. "
-        "No blockers."
-    )
-
-    try:
-        result1 = daily_standup(status1)
-        formatted1 = format_daily_status(result1)
-        print(f"\nInput: {status1}")
-        print(f"\nParsed Output:\n{formatted1}")
-    except Exception as e:  # pylint: disable=broad-except
-        print(f"Error processing status 1: {e}")
-
-    # Example 2: Status with blockers
-    print("\n📅 Example 2: Status with Blockers")
-    status2 = (
-        "Yesterday I researched the new API endpoints. "
-        "Today I'm implementing the authentication flow. "
-        "I'm blocked by waiting for API keys from the platform team."
-    )
+    # Examples 1 and 2 are independent, so their requests run concurrently
+    examples = [
+        (
+            "📅 Example 1: Complete Status Update",
+            "Yesterday I worked on the login feature and fixed some bugs. "
+            "Today I will continue with the login feature and start on the signup feature. "
+            "No blockers.",
+        ),
+        (
+            "📅 Example 2: Status with Blockers",
+            "Yesterday I researched the new API endpoints. "
+            "Today I'm implementing the authentication flow. "
+            "I'm blocked by waiting for API keys from the platform team.",
+        ),
+    ]
+    results = asyncio.run(gather_daily_standups([status for _, status in examples]))
 
-    try:
-        result2 = daily_standup(status2)
-        formatted2 = format_daily_status(result2)
-        print(f"\nInput: {status2}")
-        print(f"\nParsed Output:\n{formatted2}")
-    except Exception as e:  # pylint: disable=broad-except
-        print(f"Error processing status 2: {e}")
+    for number, ((title, status), result) in enumerate(zip(examples, results), 1):
+        print(f"\n{title}")
+        if isinstance(result, Exception):
+            print(f"Error processing status {number}: {result}")
+            continue
+        print(f"\nInput: {status}")
+        print(f"\nParsed Output:\n{format_daily_status(result)}")
 
     # Example 3: Interactive mode
     print("\n📅 Example 3: Interactive Mode")
@@ -10,14 +10,16 @@ Responsibilities:
 import json
 import logging
 import os
-import re
+import random
+import shutil
 import subprocess
-from typing import Any, Dict
-
-from dotenv import load_dotenv
-import openai
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from src.dev_tools.schema import (
+    PylintMessage,
     RunFormatterLinterRequest,
     RunFormatterLinterResponse,
     RunUnitTestsRequest,
@@ -25,20 +27,149 @@ from src.dev_tools.schema import (
     CheckGitStatusRequest,
     CheckGitStatusResponse,
 )
+from src.dev_tools.chat_history import (
+    MAX_HISTORY_TURNS,
+    ChatHistory,
+    format_transcript,
+)
+from src.dev_tools.in_process import run_in_process
+from src.dev_tools.lint_cache import LintCache, python_files
+from src.openai_client import get_openai_client
+
+if TYPE_CHECKING:
+    import openai
+
+# Retries for transient OpenAI errors (see _retryable_errors); the delay doubles on each attempt
+MAX_RETRIES = 3
+RETRY_BASE_DELAY = 1.0
+
+# Tool output when every file is unchanged since the tool last passed it
+CACHED_OUTPUT = "All files unchanged since the last clean run (cached)."
+# System message that starts every chat loop conversation
+SYSTEM_PROMPT = (
+    "You are a helpful developer assistant. "
+    "You can run code formatting, linting, unit tests, and check git status. "
+    "Use function calling when appropriate."
+)
+# Cheaper model that condenses chat turns that no longer fit in the history window
+SUMMARY_MODEL = "gpt-4o-mini"
+SUMMARY_PROMPT = (
+    "Summarize this developer assistant conversation in a few sentences. "
+    "Keep the requests, tool results and conclusions needed to continue it."
+)
+# pylint lints files in parallel on every core and reports messages as JSON
+PYLINT_OPTIONS = ["--jobs=0", "--output-format=json"]
+# pylint message types that fail the run
+PYLINT_FAILING_TYPES = frozenset(["error", "fatal"])
+# Most tool calls from one model response that run at the same time
+MAX_PARALLEL_TOOL_CALLS = 4
+# Tool calls that run one after another: black rewrites the files that pylint and the
+# unit tests read, and formatter runs share the lint cache
+SERIAL_TOOL_CALLS = frozenset(["run_formatter_linter", "run_unit_tests"])
+
+
+def _run_tool(name: str, cmd: List[str], timeout: int = 10) -> Tuple[str, str]:
+    """
+    Run a formatter/linter command and return its (stdout, stderr).
+    Errors and timeouts are returned as stdout messages starting with "Error" instead of raised.
+    """
+    try:
+        proc = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=timeout,
+        )
+        return proc.stdout, proc.stderr
+    except subprocess.TimeoutExpired:
+        logging.exception("Timeout running %s", name)
+        return f"Error: {name} timed out after {timeout} seconds.", ""
+    except Exception as exc:  # pylint: disable=broad-except
+        # Catch-all to ensure subprocess errors are logged and surfaced to user
+        logging.exception("Error running %s", name)
+        return f"Error running {name}: {exc}", ""
+
 
-# Load environment and OpenAI API key at module level
-load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
-    raise RuntimeError(
-        "OPENAI_API_KEY not found in environment. Please set it in your .env file."
+def parse_pylint_json(output: str) -> Optional[List[PylintMessage]]:
+    """Parse pylint's JSON report, or return None if the output is not one (e.g. an error)."""
+    try:
+        return [PylintMessage.model_validate(m) for m in json.loads(output)]
+    except (ValueError, TypeError):
+        return None
+
+
+def format_pylint_messages(messages: List[PylintMessage]) -> str:
+    """Render pylint messages in pylint's own text format, one per line."""
+    if not messages:
+        return "No pylint messages."
+    return "\n".join(
+        f"{m.path}:{m.line}:{m.column}: {m.message_id}: {m.message} ({m.symbol})"
+        for m in messages
+    )
+
+
+def pylint_passed(output: str, messages: Optional[List[PylintMessage]]) -> bool:
+    """Return whether pylint ran and reported no error or fatal messages."""
+    if messages is None:
+        # Not a JSON report: pylint crashed, timed out or could not be started
+        return "Error" not in output
+    return not any(m.type in PYLINT_FAILING_TYPES for m in messages)
+
+
+def unreported_files(files: List[str], messages: List[PylintMessage]) -> List[str]:
+    """Return the files pylint reported no messages for."""
+    reported = {os.path.abspath(m.path) for m in messages}
+    return [f for f in files if os.path.abspath(f) not in reported]
+
+
+def parse_unittest_output(
+    output: str, passed: Optional[bool] = None
+) -> RunUnitTestsResponse:
+    """
+    Parse unittest's report: the summary ("Ran 2 tests in 0.123s") and failed tests, in one pass.
+    passed is the exit status when known; otherwise success is read from the final "OK" line.
+    """
+    summary = "Tests completed."
+    failed_tests = []
+    ok_line = False
+    for line in output.splitlines():
+        if line.startswith(("FAIL:", "ERROR:")):
+            failed_tests.append(line.strip())
+        elif line.startswith("Ran "):
+            summary = line[4:].strip()
+        elif line == "OK" or line.startswith("OK ("):
+            ok_line = True
+    return RunUnitTestsResponse(
+        success=ok_line if passed is None else passed,
+        summary=summary,
+        failed_tests=failed_tests,
     )
-openai.api_key = OPENAI_API_KEY
 
 
 class DevToolsAgent:
     """Agent for developer tool automation via function calling."""
 
+    def __init__(
+        self,
+        lint_cache: Optional[LintCache] = None,
+        in_process: bool = False,
+        client: Optional["openai.OpenAI"] = None,
+    ):
+        # Files that already passed black/pylint; None runs the tools on every file
+        self.lint_cache = lint_cache
+        # Run black and pylint in this process instead of spawning them each call
+        self.in_process = in_process
+        # OpenAI client for the chat loop; None uses the shared client from src.openai_client
+        self.client = client
+        # Executables are resolved once instead of searching PATH on every call. A tool
+        # that is not found keeps its bare name, so running it fails with the usual error.
+        self.tool_paths = {
+            name: shutil.which(name) or name for name in ("black", "pylint", "git")
+        }
+        # Tests run with this interpreter, so they see the same virtualenv as the agent
+        self.tool_paths["python"] = sys.executable
+
     def run_formatter_linter(
         self, request: RunFormatterLinterRequest
     ) -> RunFormatterLinterResponse:
@@ -46,73 +177,135 @@ class DevToolsAgent:
         Run black and pylint on the given path using subprocess. Returns real output or error messages.
         - black runs on '.' by default
         - pylint runs on 'src' by default (to avoid linting .venv)
-        Both have a 10 second timeout to prevent hanging.
+        Both have a 10 second timeout to prevent hanging. pylint runs after black has
+        finished, so it never reads a file black is still rewriting.
+        With a lint cache, only files changed since their last clean run are checked.
         """
         black_path = request.path or "."
         pylint_path = request.path or "src"
-        # Run black
-        try:
-            black_proc = subprocess.run(
-                ["black", black_path],
-                capture_output=True,
-                text=True,
-                check=False,
-                timeout=10,
+        black_cmd = [self.tool_paths["black"], black_path]
+        # pylint ignores .venv
+        pylint_cmd = [
+            self.tool_paths["pylint"],
+            "--ignore=.venv",
+            *PYLINT_OPTIONS,
+            pylint_path,
+        ]
+        use_cache = (
+            self.lint_cache is not None
+            and not request.no_cache
+            and os.path.exists(black_path)
+            and os.path.exists(pylint_path)
+        )
+        if use_cache:
+            # Only pass the files that changed since each tool last passed them
+            black_files = self.lint_cache.changed_files(
+                "black", python_files(black_path)
             )
-            black_output = black_proc.stdout + black_proc.stderr
-        except subprocess.TimeoutExpired:
-            logging.exception("Timeout running black")
-            black_output = "Error: black timed out after 10 seconds."
-        except Exception as exc:  # pylint: disable=broad-except
-            # Catch-all to ensure subprocess errors are logged and surfaced to user
-            logging.exception("Error running black")
-            black_output = f"Error running black: {exc}"
-        # Run pylint (ignore .venv)
-        try:
-            pylint_proc = subprocess.run(
-                ["pylint", "--ignore=.venv", pylint_path],
-                capture_output=True,
-                text=True,
-                check=False,
-                timeout=10,
+            pylint_files = self.lint_cache.changed_files(
+                "pylint", python_files(pylint_path)
             )
-            pylint_output = pylint_proc.stdout + pylint_proc.stderr
-        except subprocess.TimeoutExpired:
-            logging.exception("Timeout running pylint")
-            pylint_output = "Error: pylint timed out after 10 seconds."
-        except Exception as exc:  # pylint: disable=broad-except
-            # Catch-all to ensure subprocess errors are logged and surfaced to user
-            logging.exception("Error running pylint")
-            pylint_output = f"Error running pylint: {exc}"
-        success = ("Error" not in black_output) and ("Error" not in pylint_output)
+            black_cmd = (
+                [self.tool_paths["black"], *black_files] if black_files else None
+            )
+            pylint_cmd = (
+                [self.tool_paths["pylint"], *PYLINT_OPTIONS, *pylint_files]
+                if pylint_files
+                else None
+            )
+        # black rewrites files in place, so pylint only starts once it is done
+        black_output = (
+            "".join(self._run_formatter_tool("black", black_cmd))
+            if black_cmd
+            else CACHED_OUTPUT
+        )
+        pylint_output = CACHED_OUTPUT
+        pylint_messages = []
+        if pylint_cmd:
+            # Only stdout holds the JSON report; stderr may carry warnings from plugins
+            pylint_stdout, pylint_stderr = self._run_formatter_tool(
+                "pylint", pylint_cmd
+            )
+            pylint_messages = parse_pylint_json(pylint_stdout)
+            pylint_output = (
+                pylint_stdout + pylint_stderr
+                if pylint_messages is None
+                else format_pylint_messages(pylint_messages)
+            )
+        if use_cache:
+            if black_cmd and "Error" not in black_output:
+                self.lint_cache.mark_clean(
+                    "black",
+                    [
+                        f
+                        for f in black_files
+                        if f"cannot format {f}" not in black_output
+                    ],
+                )
+            if pylint_cmd and pylint_messages is not None:
+                # Files with pylint messages stay uncached so they are reported again
+                self.lint_cache.mark_clean(
+                    "pylint", unreported_files(pylint_files, pylint_messages)
+                )
         return RunFormatterLinterResponse(
-            success=success,
+            success=("Error" not in black_output)
+            and pylint_passed(pylint_output, pylint_messages),
             black_output=black_output.strip(),
             pylint_output=pylint_output.strip(),
+            pylint_messages=pylint_messages or [],
         )
 
+    def _run_formatter_tool(self, name: str, cmd: List[str]) -> Tuple[str, str]:
+        """
+        Run black or pylint as a subprocess, or in process when enabled, and return its
+        (stdout, stderr). In process, all of the tool's output is returned as stdout.
+        An in-process run that fails (e.g. fork is unavailable) is retried as a
+        subprocess; a timeout is not, as it would not finish any sooner.
+        """
+        if self.in_process:
+            output = run_in_process(name, cmd[1:])
+            if not output.startswith(f"Error running {name}"):
+                return output, ""
+            logging.warning("Falling back to a %s subprocess: %s", name, output)
+        return _run_tool(name, cmd)
+
     def run_unit_tests(self, request: RunUnitTestsRequest) -> RunUnitTestsResponse:
         """
         Run unit tests at the given path using unittest discover. Returns real output and parses summary.
+        With in_process, tests run in a child forked from the agent instead of a new
+        interpreter (see in_process.py).
         """
         test_path = request.test_path or "tests"
+        if self.in_process:
+            output = run_in_process(
+                "unittest", ["discover", "-s", test_path], timeout=30
+            )
+            if output.startswith("Error: unittest"):
+                # Timed out; a subprocess would not finish any sooner
+                return RunUnitTestsResponse(
+                    success=False, summary=output, failed_tests=[]
+                )
+            if not output.startswith("Error running unittest"):
+                return parse_unittest_output(output)
+            # Tests that cannot run inside the agent (e.g. they exit) get their own process
+            logging.warning("Falling back to a unittest subprocess: %s", output)
         try:
             proc = subprocess.run(
-                ["python", "-m", "unittest", "discover", "-s", test_path],
+                [
+                    self.tool_paths["python"],
+                    "-m",
+                    "unittest",
+                    "discover",
+                    "-s",
+                    test_path,
+                ],
                 capture_output=True,
                 text=True,
                 check=False,
                 timeout=30,
+                # Repeated runs would otherwise rewrite __pycache__ for every changed test
+                env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
             )
-            output = proc.stdout + proc.stderr
-            # Parse summary and failed tests
-            summary_match = re.search(r"(\d+ tests? in [\d.]+s)\)?", output)
-            summary = summary_match.group(1) if summary_match else "Tests completed."
-            failed_tests = []
-            for line in output.splitlines():
-                if line.startswith("FAIL:") or line.startswith("ERROR:"):
-                    failed_tests.append(line.strip())
-            success = proc.returncode == 0
         except subprocess.TimeoutExpired:
             logging.exception("Timeout running unit tests")
             return RunUnitTestsResponse(
@@ -128,10 +321,8 @@ class DevToolsAgent:
                 summary=f"Error running unit tests: {exc}",
                 failed_tests=[],
             )
-        return RunUnitTestsResponse(
-            success=success,
-            summary=summary,
-            failed_tests=failed_tests,
+        return parse_unittest_output(
+            proc.stdout + proc.stderr, passed=proc.returncode == 0
         )
 
     def check_git_status(
@@ -139,24 +330,26 @@ class DevToolsAgent:
     ) -> CheckGitStatusResponse:
         """
         Check for uncommitted git files using git status --porcelain. Always uses '.' as the path.
+        -z output is NUL-separated and never quotes paths, so names with spaces parse as is.
         """
         path = "."
         try:
             proc = subprocess.run(
-                ["git", "-C", path, "status", "--porcelain"],
+                [self.tool_paths["git"], "-C", path, "status", "--porcelain=v1", "-z"],
                 capture_output=True,
                 text=True,
                 check=False,
                 timeout=10,
             )
-            output = proc.stdout
+            # Each entry is "XY path"; renames and copies are followed by the original path
+            entries = iter(proc.stdout.split("\0"))
             uncommitted_files = []
-            for line in output.splitlines():
-                parts = line.strip().split()
-                if len(parts) == 2:
-                    uncommitted_files.append(parts[1])
-                elif len(parts) > 2:
-                    uncommitted_files.append(parts[-1])
+            for entry in entries:
+                if not entry:
+                    continue
+                uncommitted_files.append(entry[3:])
+                if "R" in entry[:2] or "C" in entry[:2]:
+                    next(entries, None)
             has_uncommitted = len(uncommitted_files) > 0
         except subprocess.TimeoutExpired:
             logging.exception("Timeout running git status")
@@ -191,78 +384,214 @@ class DevToolsAgent:
             return self.check_git_status(request)
         raise ValueError(f"Unknown function: {function_name}")
 
-    def run_openai_chat_loop(self, function_schemas, model: str = "gpt-4o") -> None:
+    def run_tool_calls(self, tool_calls: List[Dict[str, Any]]) -> List[str]:
+        """
+        Run the tool calls from one model response, concurrently where that is safe.
+        Tool calls are in the assistant message format ({"id", "type", "function"}).
+        Up to MAX_PARALLEL_TOOL_CALLS calls run in a thread pool; SERIAL_TOOL_CALLS
+        run one after another on the caller's thread meanwhile.
+        Returns one result string per call, in the same order. Errors (unknown
+        function, invalid arguments) are returned as text so the model can react to them.
+        """
+
+        def run(tool_call) -> str:
+            function = tool_call["function"]
+            try:
+                args = json.loads(function["arguments"] or "{}")
+                result = self.call_function(function["name"], args)
+            except Exception as exc:  # pylint: disable=broad-except
+                logging.exception("Error running tool %s", function["name"])
+                return f"Error: {exc}"
+            # Compact JSON: the model does not need indentation, and it costs prompt tokens
+            if hasattr(result, "model_dump_json"):
+                # The readable copy is only built when debug logging is on
+                if logging.getLogger().isEnabledFor(logging.DEBUG):
+                    logging.debug(
+                        "Tool %s returned:\n%s",
+                        function["name"],
+                        result.model_dump_json(indent=2),
+                    )
+                return result.model_dump_json()
+            return json.dumps(result) if not isinstance(result, str) else result
+
+        parallel = [
+            i
+            for i, tool_call in enumerate(tool_calls)
+            if tool_call["function"]["name"] not in SERIAL_TOOL_CALLS
+        ]
+        if not parallel or len(tool_calls) == 1:
+            return [run(tool_call) for tool_call in tool_calls]
+        results: List[Optional[str]] = [None] * len(tool_calls)
+        with ThreadPoolExecutor(
+            max_workers=min(len(parallel), MAX_PARALLEL_TOOL_CALLS)
+        ) as executor:
+            futures = {i: executor.submit(run, tool_calls[i]) for i in parallel}
+            for i, tool_call in enumerate(tool_calls):
+                if i not in futures:
+                    results[i] = run(tool_call)
+            for i, future in futures.items():
+                results[i] = future.result()
+        return results
+
+    def run_openai_chat_loop(
+        self,
+        function_schemas,
+        model: str = "gpt-4o",
+        max_history_turns: int = MAX_HISTORY_TURNS,
+    ) -> None:
         """
         Run an interactive OpenAI chat loop that supports function calling for developer tools.
         Loads the OpenAI API key from environment using dotenv for security and convenience.
+        Replies are streamed, so text is printed as soon as the model produces it.
+        When the model requests several tools in one response, they run concurrently.
+        Only the last max_history_turns turns are resent in full; older turns are
+        summarized by SUMMARY_MODEL, so per-turn cost stops growing with the session.
 
         Args:
             function_schemas (list): List of OpenAI-compatible function schemas.
             model (str): OpenAI model name (default: 'gpt-4o').
+            max_history_turns (int): Number of recent turns sent word for word (at least 1).
         """
-        messages = [
-            {
-                "role": "system",
-                "content": (
-                    "You are a helpful developer assistant. "
-                    "You can run code formatting, linting, unit tests, and check git status. "
-                    "Use function calling when appropriate."
-                ),
-            }
+        tools = [
+            {"type": "function", "function": schema} for schema in function_schemas
         ]
+        # One client for the whole conversation so every request reuses its connections
+        client = self.client or get_openai_client()
+        history = ChatHistory(
+            SYSTEM_PROMPT,
+            lambda summary, turn: summarize_turn(client, summary, turn),
+            max_turns=max_history_turns,
+        )
+
+        def next_reply():
+            stream = _create_chat_completion(
+                client,
+                model=model,
+                messages=history.messages(),
+                tools=tools,
+                stream=True,
+            )
+            return collect_stream(stream)
+
         print("Type your request (or 'exit' to quit):")
         while True:
             user_input = input("You: ")
             if user_input.strip().lower() == "exit":
                 break
-            messages.append({"role": "user", "content": user_input})
-            response = openai.chat.completions.create(
-                model=model,
-                messages=messages,
-                functions=function_schemas,
-                function_call="auto",
-            )
-            message = response.choices[0].message
-            finish_reason = response.choices[0].finish_reason
-            # Handle a chain of function calls until we get an assistant message
-            while message.function_call:
-                func_name = message.function_call.name
-                func_args = message.function_call.arguments
-                # print(f"\nOpenAI called function: {func_name} with args: {func_args}")
-                args = json.loads(func_args)
-                result = self.call_function(func_name, args)
-                # Format result as JSON if possible
-                if hasattr(result, "dict"):
-                    result_json = json.dumps(result.dict(), indent=2)
-                else:
-                    result_json = (
-                        json.dumps(result, indent=2)
-                        if not isinstance(result, str)
-                        else result
-                    )
-                # print(
-                #     f"\n===== FUNCTION RESULT SUMMARY =====\n{result_json}\n==================================\n"
-                # )
-                messages.append(
-                    {
-                        "role": "function",
-                        "name": func_name,
-                        "content": result_json,
-                    }
-                )
-                # Get the next response (could be another function call or assistant message)
-                response = openai.chat.completions.create(
-                    model=model,
-                    messages=messages,
-                    functions=function_schemas,
-                    function_call="auto",
+            history.start_turn(user_input)
+            content, tool_calls, finish_reason = next_reply()
+            # Handle a chain of tool calls until we get an assistant message
+            while tool_calls:
+                history.append(
+                    {"role": "assistant", "content": content, "tool_calls": tool_calls}
                 )
-                message = response.choices[0].message
-                finish_reason = response.choices[0].finish_reason
-            # Now we have an assistant message
-            print(f"Assistant: {message.content}\n")
-            messages.append({"role": "assistant", "content": message.content})
+                results = self.run_tool_calls(tool_calls)
+                for tool_call, result in zip(tool_calls, results):
+                    history.append(
+                        {
+                            "role": "tool",
+                            "tool_call_id": tool_call["id"],
+                            "content": result,
+                        }
+                    )
+                # Get the next response (could be more tool calls or an assistant message)
+                content, tool_calls, finish_reason = next_reply()
+            # Now we have an assistant message, already printed while streaming
+            history.append({"role": "assistant", "content": content})
             if finish_reason == "stop":
                 print("Assistant indicated conversation is complete. Exiting loop.")
                 break
             print("\n--------------------\n")
+
+
+def summarize_turn(
+    client: "openai.OpenAI", summary: Optional[str], turn: List[Dict[str, Any]]
+) -> str:
+    """Fold a turn evicted from the chat history into the running summary."""
+    previous = f"Summary so far: {summary}\n\n" if summary else ""
+    response = _create_chat_completion(
+        client,
+        model=SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": SUMMARY_PROMPT},
+            {
+                "role": "user",
+                "content": f"{previous}New messages:\n{format_transcript(turn)}",
+            },
+        ],
+    )
+    return response.choices[0].message.content
+
+
+def collect_stream(stream) -> Tuple[Optional[str], List[Dict[str, Any]], Optional[str]]:
+    """
+    Print a streamed reply's text as it arrives and collect the complete reply.
+    Returns the text (None if there was none), the tool calls in assistant message
+    format with their streamed fragments joined by index, and the finish reason.
+    """
+    content_parts = []
+    tool_calls: Dict[int, Dict[str, Any]] = {}
+    finish_reason = None
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        delta = choice.delta
+        if delta.content:
+            if not content_parts:
+                print("Assistant: ", end="")
+            print(delta.content, end="", flush=True)
+            content_parts.append(delta.content)
+        for fragment in delta.tool_calls or []:
+            tool_call = tool_calls.setdefault(
+                fragment.index,
+                {
+                    "id": None,
+                    "type": "function",
+                    "function": {"name": "", "arguments": ""},
+                },
+            )
+            if fragment.id:
+                tool_call["id"] = fragment.id
+            if fragment.function:
+                tool_call["function"]["name"] += fragment.function.name or ""
+                tool_call["function"]["arguments"] += fragment.function.arguments or ""
+        if choice.finish_reason:
+            finish_reason = choice.finish_reason
+    if content_parts:
+        print("\n")
+    content = "".join(content_parts) if content_parts else None
+    return content, [tool_calls[index] for index in sorted(tool_calls)], finish_reason
+
+
+def _retryable_errors() -> tuple:
+    """
+    Return the transient OpenAI errors worth retrying.
+    openai is imported here rather than at module level, so only the chat loop loads it.
+    """
+    import openai  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    return (
+        openai.RateLimitError,
+        openai.APIConnectionError,
+        openai.InternalServerError,
+    )
+
+
+def _create_chat_completion(client: "openai.OpenAI", **kwargs):
+    """
+    Create a chat completion, retrying transient API errors with exponential backoff and jitter.
+    Non-transient errors (e.g. invalid requests) are raised immediately.
+    """
+    retryable = _retryable_errors()
+    attempt = 0
+    while True:
+        try:
+            return client.chat.completions.create(**kwargs)
+        except retryable:
+            if attempt == MAX_RETRIES:
+                raise
+            delay = RETRY_BASE_DELAY * 2**attempt
+            logging.warning("OpenAI request failed, retrying in %.1fs", delay)
+            time.sleep(delay + random.uniform(0, delay))
+            attempt += 1
@@ -0,0 +1,74 @@
+"""
+Bounded conversation history for the dev tools chat loop.
+
+Every request resends the whole history, so an unbounded history makes each turn
+slower and more expensive than the last and eventually overflows the context window.
+ChatHistory keeps the system prompt, the most recent turns in full and a running
+summary of the older turns.
+"""
+
+import collections
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+Message = Dict[str, Any]
+
+# Turns (a user message and every message up to the next one) kept word for word
+MAX_HISTORY_TURNS = 10
+
+
+class ChatHistory:
+    """
+    System prompt, a summary of evicted turns and a sliding window of recent turns.
+    Raises ValueError if max_turns is less than 1; the current turn is always kept.
+    """
+
+    def __init__(
+        self,
+        system_prompt: str,
+        summarize: Callable[[Optional[str], List[Message]], str],
+        max_turns: int = MAX_HISTORY_TURNS,
+    ):
+        if max_turns < 1:
+            raise ValueError(f"max_turns must be at least 1, got {max_turns}.")
+        self.system_prompt = system_prompt
+        # Folds an evicted turn into the previous summary (None before the first eviction)
+        self.summarize = summarize
+        self.max_turns = max_turns
+        self.summary: Optional[str] = None
+        self.turns: Deque[List[Message]] = collections.deque()
+
+    def start_turn(self, user_input: str) -> None:
+        """Start a new turn with the user's message, summarizing the oldest turn if full."""
+        # Whole turns are evicted so tool results never lose the call they answer
+        if len(self.turns) == self.max_turns:
+            self.summary = self.summarize(self.summary, self.turns.popleft())
+        self.turns.append([{"role": "user", "content": user_input}])
+
+    def append(self, message: Message) -> None:
+        """Add a message to the current turn."""
+        self.turns[-1].append(message)
+
+    def messages(self) -> List[Message]:
+        """Return the messages to send: system prompt, summary, then the recent turns."""
+        messages = [{"role": "system", "content": self.system_prompt}]
+        if self.summary:
+            messages.append(
+                {
+                    "role": "system",
+                    "content": f"Summary of the earlier conversation: {self.summary}",
+                }
+            )
+        for turn in self.turns:
+            messages.extend(turn)
+        return messages
+
+
+def format_transcript(messages: List[Message]) -> str:
+    """Render messages as plain "role: text" lines for summarization."""
+    lines = []
+    for message in messages:
+        if message.get("content"):
+            lines.append(f"{message['role']}: {message['content']}")
+        for tool_call in message.get("tool_calls") or []:
+            lines.append(f"{message['role']}: called {tool_call['function']['name']}")
+    return "\n".join(lines)
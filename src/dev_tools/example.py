@@ -5,13 +5,14 @@ Run this script to interact with the agent and see function calling in action.
 
 from src.dev_tools.agent import DevToolsAgent
 from src.dev_tools.function_schemas import get_openai_function_schemas
+from src.dev_tools.lint_cache import LintCache
 
 
 def main():
     """
     Minimal demo: instantiate the agent, load schemas, and start the OpenAI chat loop.
     """
-    agent = DevToolsAgent()
+    agent = DevToolsAgent(lint_cache=LintCache())
     function_schemas = get_openai_function_schemas()
     agent.run_openai_chat_loop(function_schemas)
 
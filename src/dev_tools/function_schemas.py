@@ -10,28 +10,32 @@ from src.dev_tools.schema import (
     CheckGitStatusRequest,
 )
 
+# Built once at import; pydantic regenerates a model's JSON schema on every call
+FUNCTION_SCHEMAS = [
+    {
+        "name": "run_formatter_linter",
+        "description": "Run black and pylint on the given path.",
+        "parameters": RunFormatterLinterRequest.model_json_schema(),
+    },
+    {
+        "name": "run_unit_tests",
+        "description": "Run unit tests at the given path.",
+        "parameters": RunUnitTestsRequest.model_json_schema(),
+    },
+    {
+        "name": "check_git_status",
+        "description": "Check for uncommitted git files.",
+        "parameters": CheckGitStatusRequest.model_json_schema(),
+    },
+]
+
 
 def get_openai_function_schemas():
     """
     Returns a list of OpenAI function schemas for DevToolsAgent.
+    The schema dicts are shared between calls and must not be modified.
     """
-    return [
-        {
-            "name": "run_formatter_linter",
-            "description": "Run black and pylint on the given path.",
-            "parameters": RunFormatterLinterRequest.model_json_schema(),
-        },
-        {
-            "name": "run_unit_tests",
-            "description": "Run unit tests at the given path.",
-            "parameters": RunUnitTestsRequest.model_json_schema(),
-        },
-        {
-            "name": "check_git_status",
-            "description": "Check for uncommitted git files.",
-            "parameters": CheckGitStatusRequest.model_json_schema(),
-        },
-    ]
+    return list(FUNCTION_SCHEMAS)
 
 
 if __name__ == "__main__":
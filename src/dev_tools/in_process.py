@@ -0,0 +1,162 @@
+"""
+Run black, pylint and unittest as libraries instead of as new interpreters.
+
+Spawning a tool pays for interpreter startup and its imports on every call. Here the
+tools are imported once into this process, and each run happens in a child forked
+from it, which starts with them already loaded. A run that hangs or crashes only
+takes its child down: it is killed on timeout, and its output never reaches the
+agent's sys.stdout. Forking needs a POSIX system, so this is opt-in.
+"""
+
+# pylint: disable=import-outside-toplevel
+# The tools are only imported when an in-process run is requested
+
+import contextlib
+import importlib
+import io
+import logging
+import multiprocessing
+import os
+import sys
+from typing import Callable, Dict, Iterable, List
+
+# This agent's own package; its modules are never evicted before a test run
+AGENT_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_black(args: List[str]) -> str:
+    """Run black with command-line args and return its output."""
+    import black
+
+    output = io.StringIO()
+    # black reports through click, which writes to sys.stdout/sys.stderr
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        # One worker formats in a thread of this process instead of spawning a pool
+        # black.main is a click command; pylint cannot see the arguments click fills in
+        # pylint: disable-next=no-value-for-parameter
+        black.main(["--workers", "1", *args], standalone_mode=False)
+    return output.getvalue()
+
+
+def run_pylint(args: List[str]) -> str:
+    """Run pylint with command-line args and return its report."""
+    from astroid import MANAGER
+    from pylint.lint import Run
+
+    # astroid caches parsed modules; clear it so edited files are not linted stale
+    MANAGER.clear_cache()
+    output = io.StringIO()
+    # The reporter chosen by --output-format writes to sys.stdout
+    with contextlib.redirect_stdout(output):
+        Run(args, exit=False)
+    return output.getvalue()
+
+
+def run_unittest(args: List[str]) -> str:
+    """
+    Run unittest with command-line args (e.g. ["discover", "-s", "tests"]) and return its report.
+    Modules loaded from the working directory (the project) and the discovery directory are
+    re-imported so edits to code and tests are seen. Installed packages and this agent's
+    own package are reused as loaded.
+    """
+    import unittest
+
+    forget_modules(os.getcwd(), keep=[AGENT_PACKAGE_DIR, sys.prefix, sys.base_prefix])
+    if "-s" in args:
+        forget_modules(args[args.index("-s") + 1])
+    output = io.StringIO()
+    # Tests may print; keep their output with the report instead of the agent's console
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        try:
+            unittest.main(
+                module=None,
+                argv=["python -m unittest", *args],
+                # The default loader is shared and keeps state from earlier discoveries
+                testLoader=unittest.TestLoader(),
+                testRunner=unittest.TextTestRunner(stream=output),
+                exit=False,
+            )
+        except SystemExit as exc:
+            # e.g. invalid arguments or an import-time sys.exit(); surface it as an error
+            raise RuntimeError(f"unittest exited with status {exc.code}") from exc
+    return output.getvalue()
+
+
+def forget_modules(path: str, keep: Iterable[str] = ()) -> None:
+    """Remove modules loaded from files under path, except under keep, from sys.modules."""
+    root = os.path.join(os.path.abspath(path), "")
+    # A virtualenv inside the project (sys.prefix) is under root but must stay loaded
+    kept = tuple(os.path.join(os.path.abspath(k), "") for k in keep)
+    for name, module in list(sys.modules.items()):
+        module_file = getattr(module, "__file__", None)
+        if not module_file:
+            continue
+        module_file = os.path.abspath(module_file)
+        if module_file.startswith(root) and not module_file.startswith(kept):
+            del sys.modules[name]
+
+
+RUNNERS: Dict[str, Callable[[List[str]], str]] = {
+    "black": run_black,
+    "pylint": run_pylint,
+    "unittest": run_unittest,
+}
+# Modules each runner needs, imported here before forking so every child starts with them
+PRELOAD: Dict[str, List[str]] = {
+    "black": ["black"],
+    "pylint": ["astroid", "pylint.lint"],
+    "unittest": ["unittest"],
+}
+
+
+def _run_child(conn, name: str, args: List[str]) -> None:
+    """Run a tool in a forked child and send (ok, output or error message) to the parent."""
+    try:
+        conn.send((True, RUNNERS[name](args)))
+    except BaseException as exc:  # pylint: disable=broad-except
+        # Anything the tool raises, including SystemExit, is reported to the parent
+        conn.send((False, str(exc) or type(exc).__name__))
+    finally:
+        conn.close()
+
+
+def run_in_process(name: str, args: List[str], timeout: float = 10) -> str:
+    """
+    Run a tool in a child forked from this process and return its output.
+    Errors and timeouts are returned as messages starting with "Error" instead of raised,
+    matching the subprocess runner. A run that times out is killed.
+    """
+    try:
+        for module in PRELOAD.get(name, []):
+            importlib.import_module(module)
+        # ValueError where fork is unavailable; the caller then falls back to a subprocess
+        context = multiprocessing.get_context("fork")
+        receiver, sender = context.Pipe(duplex=False)
+        # Not a daemon: pylint --jobs starts worker processes of its own
+        process = context.Process(target=_run_child, args=(sender, name, args))
+        process.start()
+        sender.close()
+        try:
+            if not receiver.poll(timeout):
+                logging.error("Timeout running %s in process", name)
+                return f"Error: {name} timed out after {timeout} seconds."
+            try:
+                ok, output = receiver.recv()
+            except EOFError:
+                # The child died without reporting, e.g. a test called os._exit()
+                process.join()
+                raise RuntimeError(
+                    f"{name} exited with code {process.exitcode}"
+                ) from None
+        finally:
+            receiver.close()
+            if process.is_alive():
+                process.kill()
+            process.join()
+        if not ok:
+            raise RuntimeError(output)
+        return output
+    except Exception as exc:  # pylint: disable=broad-except
+        # Catch-all to ensure tool errors are logged and surfaced to user
+        logging.exception("Error running %s", name)
+        return f"Error running {name}: {exc}"
@@ -0,0 +1,106 @@
+"""
+Content-hash cache for formatter/linter runs.
+
+Records the hash of every file that black or pylint last passed cleanly, so the
+next run only passes changed files to the tools. Each tool's entries are reset
+when the tool version or the project's lint configuration changes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from importlib import metadata
+from typing import Dict, List
+
+# Files whose contents change what the tools report
+CONFIG_FILES = ("pyproject.toml", ".pylintrc", "setup.cfg")
+# Directories never worth formatting or linting
+SKIPPED_DIRS = frozenset(["__pycache__", "venv", "node_modules"])
+
+
+def python_files(path: str) -> List[str]:
+    """Return the Python files at path (a file or a directory), skipping hidden and virtualenv dirs."""
+    if os.path.isfile(path):
+        return [path]
+    files = []
+    for root, dirs, names in os.walk(path):
+        dirs[:] = sorted(
+            d for d in dirs if not d.startswith(".") and d not in SKIPPED_DIRS
+        )
+        files.extend(
+            os.path.join(root, name) for name in sorted(names) if name.endswith(".py")
+        )
+    return files
+
+
+def file_hash(path: str) -> str:
+    """Return a hash of the file's contents."""
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+class LintCache:
+    """Persistent map of file path to content hash for files each tool passed cleanly."""
+
+    def __init__(self, cache_dir: str = ".devtools_cache"):
+        self.cache_path = os.path.join(cache_dir, "lint_cache.json")
+        self._entries: Dict[str, Dict[str, object]] = self._load()
+
+    def changed_files(self, tool: str, files: List[str]) -> List[str]:
+        """Return the files whose contents changed since the tool last passed them."""
+        clean = self._tool_entries(tool)
+        return [f for f in files if clean.get(os.path.abspath(f)) != file_hash(f)]
+
+    def mark_clean(self, tool: str, files: List[str]) -> None:
+        """Record the current contents of files as passed by the tool and save the cache."""
+        clean = self._tool_entries(tool)
+        for f in files:
+            if os.path.isfile(f):
+                clean[os.path.abspath(f)] = file_hash(f)
+        self._save()
+
+    def clear(self) -> None:
+        """Forget all recorded files."""
+        self._entries = {}
+        self._save()
+
+    def _tool_entries(self, tool: str) -> Dict[str, str]:
+        """Return the tool's file hashes, starting over if its version or config changed."""
+        version = _tool_version_key(tool)
+        entry = self._entries.get(tool)
+        if entry is None or entry.get("version") != version:
+            entry = {"version": version, "files": {}}
+            self._entries[tool] = entry
+        return entry["files"]
+
+    def _load(self) -> Dict[str, Dict[str, object]]:
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+        except OSError:
+            # A cache that cannot be written only costs speed, never correctness
+            logging.exception("Could not write lint cache %s", self.cache_path)
+
+
+def _tool_version_key(tool: str) -> str:
+    """Combine the installed tool version with the lint config contents."""
+    try:
+        version = metadata.version(tool)
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    config = hashlib.blake2b(digest_size=16)
+    for name in CONFIG_FILES:
+        if os.path.isfile(name):
+            config.update(name.encode("utf-8"))
+            with open(name, "rb") as f:
+                config.update(f.read())
+    return f"{version}:{config.hexdigest()}"
@@ -12,6 +12,22 @@ class RunFormatterLinterRequest(BaseModel):
     path: Optional[str] = Field(
         None, description="Path to format/lint. Defaults to project root."
     )
+    no_cache: bool = Field(
+        False,
+        description="Check every file, even ones unchanged since their last clean run.",
+    )
+
+
+class PylintMessage(BaseModel):
+    """A single message from pylint's JSON report."""
+
+    type: str
+    path: str
+    line: int
+    column: int
+    symbol: str
+    message: str
+    message_id: str = Field(alias="message-id")
 
 
 class RunFormatterLinterResponse(BaseModel):
@@ -20,6 +36,9 @@ class RunFormatterLinterResponse(BaseModel):
     success: bool
     black_output: str
     pylint_output: str
+    # Structured copy of pylint_output for library callers; left out of the JSON sent
+    # to the model, which already gets the same messages as text
+    pylint_messages: List[PylintMessage] = Field([], exclude=True)
 
 
 class RunUnitTestsRequest(BaseModel):
@@ -2,9 +2,70 @@
 File Search Agent: Handles file upload and natural language Q&A using OpenAI.
 """
 
-import uuid
+import collections
+import itertools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
 from src.openai_client import get_openai_completion
 
+# Chunk size used when splitting files at upload time
+DEFAULT_CHUNK_SIZE = 8000
+# Instructions shared by every chunk question, sent once per request as the system message
+CHUNK_SYSTEM_PROMPT = (
+    "You are an assistant helping a user with questions about a file. "
+    "You are given one part of the file; answer from that part."
+)
+# Largest file accepted for upload, in characters; each chunk costs one OpenAI request
+MAX_FILE_CHARS = 2_000_000
+
+
+def rechunk(segments: List[str], chunk_size: int) -> Iterator[str]:
+    """
+    Yields chunk_size pieces of the text made by joining segments, without joining them.
+    Only a segment and the tail of the previous one are buffered at a time.
+    Raises ValueError if chunk_size is not positive, which would never end.
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}.")
+    buffer = ""
+    for segment in segments:
+        buffer += segment
+        # Slice whole chunks out in place; only the shorter tail is carried forward
+        end = len(buffer) - len(buffer) % chunk_size
+        for start in range(0, end, chunk_size):
+            yield buffer[start : start + chunk_size]
+        buffer = buffer[end:]
+    if buffer:
+        yield buffer
+
+
+def iter_files(directory: str) -> Iterator[str]:
+    """Yields the paths of all files under directory, skipping hidden files and directories."""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_files(entry.path)
+            elif entry.is_file():
+                yield entry.path
+
+
+def read_text_file(path: str) -> str:
+    """
+    Reads a UTF-8 text file in one call.
+    Raises ValueError if the file cannot be read or is not valid UTF-8.
+    """
+    try:
+        return Path(path).read_bytes().decode("utf-8")
+    except (OSError, UnicodeDecodeError) as e:
+        raise ValueError(f"Error reading file '{path}': {e}") from e
+
 
 class FileSearchAgent:
     """
@@ -12,16 +73,68 @@ class FileSearchAgent:
     Uses chunking to handle files larger than the OpenAI context window.
     """
 
-    def __init__(self):
-        # In-memory storage for uploaded files: {file_id: (filename, content)}
-        self.files = {}
+    def __init__(
+        self,
+        max_in_flight: int = 8,
+        max_file_chars: int = MAX_FILE_CHARS,
+        completion_fn: Optional[Callable[..., str]] = None,
+    ):
+        # In-memory storage for uploaded files, split into parallel maps keyed by file ID:
+        # {file_id: filename} and {file_id: [content chunks of DEFAULT_CHUNK_SIZE]}
+        self.filenames = {}
+        self.chunks = {}
+        # IDs only need to be unique within this agent, so a counter is enough
+        self._next_id = itertools.count(1)
+        # Chunk and file requests run concurrently; this caps how many OpenAI
+        # requests are in flight at once to stay within rate limits
+        self.max_in_flight = max_in_flight
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        # Larger uploads are rejected to prevent runaway request counts and cost
+        self.max_file_chars = max_file_chars
+        # Called as completion_fn(prompt, system=...); tests pass a fake instead of OpenAI
+        self._completion = (
+            get_openai_completion if completion_fn is None else completion_fn
+        )
+
+    def _complete(self, prompt: str, system: Optional[str] = None) -> str:
+        """Call OpenAI, waiting for a free slot if max_in_flight requests are running."""
+        with self._in_flight:
+            return self._completion(prompt, system=system)
+
+    def _complete_all(
+        self, prompts: Iterable[str], system: Optional[str] = None
+    ) -> List[str]:
+        """
+        Run independent prompts concurrently and return the answers in prompt order.
+        Prompts are consumed lazily: at most max_in_flight are built ahead of their answers.
+        """
+        answers = []
+        pending = collections.deque()
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            for prompt in prompts:
+                if len(pending) == self.max_in_flight:
+                    answers.append(pending.popleft().result())
+                pending.append(executor.submit(self._complete, prompt, system))
+            answers.extend(future.result() for future in pending)
+        return answers
 
     def upload_file(self, filename: str, content: str) -> str:
         """
         Stores the uploaded file and returns a unique file ID.
+        Raises ValueError if the file is longer than max_file_chars.
         """
-        file_id = str(uuid.uuid4())
-        self.files[file_id] = (filename, content)
+        if len(content) > self.max_file_chars:
+            raise ValueError(
+                f"File '{filename}' has {len(content)} characters; "
+                f"the limit is {self.max_file_chars}."
+            )
+        file_id = f"f{next(self._next_id)}"
+        self.filenames[file_id] = filename
+        # Split once here so questions at the default chunk size reuse the same chunks
+        self.chunks[file_id] = [
+            content[i : i + DEFAULT_CHUNK_SIZE]
+            for i in range(0, len(content), DEFAULT_CHUNK_SIZE)
+        ]
         return file_id
 
     def upload_file_from_path(self, file_path: str) -> str:
@@ -37,32 +150,55 @@ class FileSearchAgent:
             raise ValueError(f"Error reading file '{file_path}': {e}") from e
         return self.upload_file(file_path, content)
 
+    def upload_directory(self, directory: str) -> Dict[str, str]:
+        """
+        Uploads every text file under directory, skipping hidden files and directories.
+        Files are read concurrently (reads release the GIL) and uploaded in path order.
+        Returns {path: file_id}. Files that cannot be read, are not UTF-8 or are too
+        large are skipped with a warning.
+        """
+        paths = sorted(iter_files(directory))
+        file_ids = {}
+        with ThreadPoolExecutor(
+            max_workers=min(32, (os.cpu_count() or 1) * 4)
+        ) as executor:
+            futures = [executor.submit(read_text_file, path) for path in paths]
+            for path, future in zip(paths, futures):
+                try:
+                    file_ids[path] = self.upload_file(path, future.result())
+                except ValueError as e:
+                    logging.warning("Skipping %s: %s", path, e)
+        return file_ids
+
     def answer_question(
-        self, file_id: str, question: str, chunk_size: int = 8000
+        self, file_id: str, question: str, chunk_size: int = DEFAULT_CHUNK_SIZE
     ) -> str:
         """
         Answers a question about the uploaded file using OpenAI.
         If the file is too large, splits it into chunks and aggregates answers.
+        Chunks are independent, so they are sent concurrently.
+        Raises ValueError if the file is unknown or chunk_size is not positive.
         """
-        if file_id not in self.files:
+        # Checked before any request; rechunk only checks once it is iterated
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}.")
+        filename = self.filenames.get(file_id)
+        if filename is None:
             raise ValueError("File not found.")
-        filename, content = self.files[file_id]
-        # Split content into chunks to fit within OpenAI's context window
-        chunks = [
-            content[i : i + chunk_size] for i in range(0, len(content), chunk_size)
-        ]
-        partial_answers = []
-        for idx, chunk in enumerate(chunks):
-            # Each chunk is processed independently
-            prompt = (
-                f"You are an assistant helping a user with questions about a file.\n"
+        # Chunks keep each prompt within OpenAI's context window
+        chunks = self.chunks[file_id]
+        if chunk_size != DEFAULT_CHUNK_SIZE:
+            chunks = rechunk(chunks, chunk_size)
+        # Each chunk is processed independently
+        prompts = (
+            (
                 f"File name: {filename}\n"
                 f"File content (part {idx+1}):\n{chunk}\n"
-                f"Question: {question}\n"
-                f"Answer:"
+                f"Question: {question}"
             )
-            answer = get_openai_completion(prompt)
-            partial_answers.append(answer)
+            for idx, chunk in enumerate(chunks)
+        )
+        partial_answers = self._complete_all(prompts, system=CHUNK_SYSTEM_PROMPT)
         # Synthesize a final answer from all partial answers
         if len(partial_answers) == 1:
             return partial_answers[0]
@@ -71,26 +207,37 @@ class FileSearchAgent:
             + "\n".join(partial_answers)
             + "\nPlease synthesize a single, comprehensive answer."
         )
-        final_answer = get_openai_completion(synthesis_prompt)
+        final_answer = self._complete(synthesis_prompt)
         return final_answer
 
     def answer_question_multiple_files(
-        self, file_ids: list[str], question: str, chunk_size: int = 8000
+        self,
+        file_ids: list[str],
+        question: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
     ) -> str:
         """
         Answers a question about multiple uploaded files, synthesizing a single response.
         If any file fails, the error is surfaced to the user and not included in the synthesis.
+        Files are answered concurrently; results keep the order of file_ids.
         """
-        partial_answers = []
-        errors = []
-        for file_id in file_ids:
+
+        def answer_file(file_id: str) -> Tuple[str, str]:
             try:
                 answer = self.answer_question(file_id, question, chunk_size=chunk_size)
-                filename = self.files[file_id][0]
-                partial_answers.append(f"File: {filename}\nAnswer: {answer}")
+                filename = self.filenames[file_id]
+                return f"File: {filename}\nAnswer: {answer}", ""
             except ValueError as e:
                 # Only catch expected file/question errors
-                errors.append(f"File ID {file_id}: {e}")
+                return "", f"File ID {file_id}: {e}"
+
+        # Requests are bounded by the in-flight semaphore, not by this pool
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(len(file_ids), self.max_in_flight))
+        ) as executor:
+            results = list(executor.map(answer_file, file_ids))
+        partial_answers = [answer for answer, error in results if not error]
+        errors = [error for _, error in results if error]
         if errors:
             return "\n".join(errors)
         if not partial_answers:
@@ -102,4 +249,4 @@ class FileSearchAgent:
             + "\n".join(partial_answers)
             + "\nPlease synthesize a single, comprehensive answer."
         )
-        return get_openai_completion(synthesis_prompt)
+        return self._complete(synthesis_prompt)
@@ -0,0 +1,51 @@
+"""
+In-memory response cache for deterministic LLM calls.
+
+Keys are a SHA-256 hash of the canonical (sorted-key) JSON request payload, so
+identical requests (same model, conversation state and user input) map to the
+same entry.
+Only cache responses from requests made with temperature=0, otherwise a cache
+hit could hide a different answer the model would have given.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import orjson
+
+
+class LLMCache:
+    """Bounded least-recently-used cache of serialized LLM responses."""
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        """Return a stable hash for a request payload (key order does not matter)."""
+        canonical = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS, default=str)
+        return hashlib.sha256(canonical).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value for key, or None on a miss."""
+        value = self._entries.get(key)
+        if value is not None:
+            # Mark as most recently used
+            self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -2,25 +2,85 @@
 OpenAI client utility functions for the AI Agents project.
 
 Handles API key loading and provides helper functions for interacting with the OpenAI API.
+This is the only module that loads the .env file; agents get their key or client from here,
+so the file is read once however many agents are imported.
+
+openai and dotenv are imported on first use rather than at import time: openai alone
+takes hundreds of milliseconds to import, which callers that never contact the API
+(e.g. running git status or the unit tests) should not pay.
 """
 
+# pylint: disable=import-outside-toplevel
+
+import functools
 import os
-import openai
-from dotenv import load_dotenv
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import openai
+
+
+@functools.lru_cache(maxsize=1)
+def get_openai_api_key() -> str:
+    """
+    Returns the OpenAI API key, loading the .env file on first use.
+    Raises RuntimeError if the key is not set.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError(
+            "OPENAI_API_KEY not found in environment. Please set it in your .env file."
+        )
+    return api_key
+
+
+@functools.lru_cache(maxsize=1)
+def get_openai_client() -> "openai.OpenAI":
+    """
+    Returns a shared OpenAI client, created on first use.
+    Reusing one client keeps its HTTP connection pool warm, so later requests
+    skip the TCP and TLS handshake.
+    """
+    import openai
+
+    return openai.OpenAI(api_key=get_openai_api_key())
+
+
+@functools.lru_cache(maxsize=1)
+def _async_openai_client_for(_loop) -> "openai.AsyncOpenAI":
+    """Returns the AsyncOpenAI client for an event loop; a new loop replaces the old client."""
+    import openai
 
-load_dotenv()
+    return openai.AsyncOpenAI(api_key=get_openai_api_key())
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-openai.api_key = OPENAI_API_KEY
 
+def get_async_openai_client() -> "openai.AsyncOpenAI":
+    """
+    Returns the AsyncOpenAI client shared by the running event loop, created on first use.
+    Reusing one client keeps its HTTP connection pool warm across requests. Pooled
+    connections belong to the loop that opened them, so each new loop (e.g. every
+    asyncio.run) gets its own client. Must be called from a coroutine.
+    """
+    import asyncio
+
+    return _async_openai_client_for(asyncio.get_running_loop())
 
-def get_openai_completion(prompt: str) -> str:
+
+def get_openai_completion(prompt: str, system: Optional[str] = None) -> str:
     """
     Calls the OpenAI API with the given prompt and returns the response text.
-    Updated for openai>=1.0.0
+    An optional system message carries fixed instructions, so requests that share them
+    also share a prompt prefix OpenAI can cache.
+    Uses the shared client, so concurrent and repeated calls reuse its connections.
     """
-    response = openai.chat.completions.create(
-        model="gpt-3.5-turbo", messages=[{"role": "user", "content": prompt}]
+    messages = [{"role": "user", "content": prompt}]
+    if system:
+        messages.insert(0, {"role": "system", "content": system})
+    response = get_openai_client().chat.completions.create(
+        model="gpt-3.5-turbo", messages=messages
     )
     return response.choices[0].message.content
 
@@ -30,7 +90,7 @@ def soothing_sunset_description() -> str:
     Asks GPT-3.5-turbo for a soothing description of a sunset and returns the response.
     """
     prompt = "Give me a soothing description of a sunset."
-    response = openai.chat.completions.create(
+    response = get_openai_client().chat.completions.create(
         model="gpt-3.5-turbo", messages=[{"role": "user", "content": prompt}]
     )
     return response.choices[0].message.content
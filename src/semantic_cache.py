@@ -0,0 +1,120 @@
+"""
+Semantic-similarity cache for LLM results.
+
+Inputs are embedded and compared by cosine similarity, so near-duplicate
+requests ("Continued work on login. Same today. No blockers.") reuse an earlier
+result instead of making another LLM call. Only use it where a close paraphrase
+should give the same answer.
+
+Embeddings are kept as rows of one contiguous matrix (with the cached values in
+a parallel list), so a lookup is a single matrix-vector product. With
+quantize=True the rows are stored as int8 with one float32 scale per row, which
+takes a quarter of the memory at a small cost in similarity precision.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.openai_client import get_openai_client
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+# Largest magnitude of a symmetric int8 value
+INT8_MAX = 127
+# Quantized rows are widened to int32 this many at a time, so a lookup never
+# copies the whole matrix (4x its int8 size)
+QUANTIZED_BLOCK_ROWS = 256
+
+
+def embed_openai(text: str) -> Sequence[float]:
+    """Embed text with the OpenAI embeddings API."""
+    response = get_openai_client().embeddings.create(model=EMBEDDING_MODEL, input=text)
+    return response.data[0].embedding
+
+
+def quantize_int8(vector: np.ndarray) -> Tuple[np.ndarray, float]:
+    """Quantize a vector to int8 with a symmetric per-vector scale (vector ~= q * scale)."""
+    peak = float(np.max(np.abs(vector)))
+    if peak == 0.0:
+        return np.zeros(vector.shape, np.int8), 0.0
+    scale = peak / INT8_MAX
+    quantized = np.clip(np.round(vector / scale), -INT8_MAX, INT8_MAX)
+    return quantized.astype(np.int8), scale
+
+
+class SemanticCache:  # pylint: disable=too-many-instance-attributes
+    """Bounded cache that matches inputs by embedding similarity."""
+
+    def __init__(
+        self,
+        embed: Callable[[str], Sequence[float]] = embed_openai,
+        threshold: float = 0.92,
+        max_size: int = 1024,
+        quantize: bool = False,
+    ):
+        self.embed_fn = embed
+        self.threshold = threshold
+        self.max_size = max_size
+        self.quantize = quantize
+        # Allocated on the first set, once the embedding size is known
+        self._matrix: Optional[np.ndarray] = None
+        # Per-row dequantization scales, only used when quantize is set
+        self._scales: Optional[np.ndarray] = None
+        self._values: List[Dict[str, Any]] = []
+        # Row to overwrite next once the cache is full (oldest entry first)
+        self._next_row = 0
+
+    def embed(self, text: str) -> np.ndarray:
+        """Return the unit-length float32 embedding for text."""
+        vector = np.asarray(self.embed_fn(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, embedding: np.ndarray) -> Optional[Dict[str, Any]]:
+        """Return the value of the most similar entry above the threshold, or None."""
+        if not self._values:
+            return None
+        rows = self._matrix[: len(self._values)]
+        if self.quantize:
+            query, query_scale = quantize_int8(embedding)
+            # Accumulate in int32 so int8 products cannot overflow
+            query = query.astype(np.int32)
+            dots = np.empty(len(rows), np.int32)
+            for start in range(0, len(rows), QUANTIZED_BLOCK_ROWS):
+                block = rows[start : start + QUANTIZED_BLOCK_ROWS]
+                dots[start : start + len(block)] = block.astype(np.int32) @ query
+            scores = dots * (self._scales[: len(self._values)] * query_scale)
+        else:
+            scores = rows @ embedding
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        return self._values[best]
+
+    def set(self, embedding: np.ndarray, value: Dict[str, Any]) -> None:
+        """Store a value, replacing the oldest entry when full."""
+        if self._matrix is None:
+            dtype = np.int8 if self.quantize else np.float32
+            self._matrix = np.zeros((self.max_size, embedding.shape[0]), dtype)
+            self._scales = np.zeros(self.max_size, np.float32)
+        if len(self._values) < self.max_size:
+            row = len(self._values)
+            self._values.append(value)
+        else:
+            row = self._next_row
+            self._values[row] = value
+            self._next_row = (row + 1) % self.max_size
+        if self.quantize:
+            self._matrix[row], self._scales[row] = quantize_int8(embedding)
+        else:
+            self._matrix[row] = embedding
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        self._matrix = None
+        self._scales = None
+        self._values = []
+        self._next_row = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
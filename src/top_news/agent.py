@@ -2,7 +2,7 @@
 Agent module for fetching and summarizing the top news stories of the day.
 """
 
-from openai import OpenAI
+from src.openai_client import get_openai_client
 
 
 def top_news(num_stories: int) -> str:
@@ -22,7 +22,7 @@ def top_news(num_stories: int) -> str:
     if num_stories > 10:
         return "Too many stories requested. Please request 10 or fewer."
     try:
-        client = OpenAI()
+        client = get_openai_client()
         prompt = (
             f"Find the top {num_stories} news stories from today. "
             "Return a Markdown table with two columns: 'Headline' and 'Summary'. "
@@ -1,17 +1,60 @@
 """Unit tests for the BugReportAgent and bug report conversation logic."""
 
+import io
+import json
+import re
 import unittest
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
 
-from src.bug_report.agent import BugReportAgent
+from src.bug_report import agent as agent_module
+from src.bug_report.agent import BugReportAgent, SYSTEM_PREFIX
 from src.bug_report.schema import Severity, BugReport
 
+# Every required field, in the order the agent asks for them
+ALL_FIELDS_PATTERN = re.compile(
+    "project_affected.*error_message.*steps_to_reproduce.*severity", re.DOTALL
+)
+
+# A complete report, validated once. Tests share it or take a model_copy(update=...);
+# process_turn merges the parsed report into a new model and never mutates it.
+BASE_REPORT = BugReport(
+    project_affected="proj",
+    error_message="err",
+    steps_to_reproduce=["step1"],
+    severity=Severity.LOW,
+)
+
+# Complete reports that differ only in severity
+SEVERITY_REPORTS = {
+    severity: BASE_REPORT.model_copy(update={"severity": severity})
+    for severity in (Severity.LOW, Severity.HIGH)
+}
+
 
 class TestBugReportAgent(unittest.TestCase):
     """Test cases for the BugReportAgent multi-turn bug reporting logic."""
 
-    @patch("openai.responses.parse")
-    def test_process_turn_all_fields(self, mock_parse):
+    @classmethod
+    def setUpClass(cls):
+        # Swap the client getter once for the whole class; patch() per test costs more
+        # than these tests do.
+        cls.original_get_client = agent_module.get_openai_client
+        cls.mock_client = MagicMock()
+        agent_module.get_openai_client = MagicMock(return_value=cls.mock_client)
+        cls.agent = BugReportAgent()
+
+    @classmethod
+    def tearDownClass(cls):
+        agent_module.get_openai_client = cls.original_get_client
+
+    def setUp(self):
+        self.mock_client.reset_mock(return_value=True, side_effect=True)
+        self.mock_parse = self.mock_client.responses.parse
+        self.agent.reset()
+        self.agent.cache.clear()
+
+    def test_process_turn_all_fields(self):
         """Agent completes when all fields are provided in one turn."""
         mock_bug_report = BugReport(
             project_affected="test_project",
@@ -19,82 +62,41 @@ class TestBugReportAgent(unittest.TestCase):
             steps_to_reproduce=["Step 1", "Step 2"],
             severity=Severity.HIGH,
         )
-        mock_parse.return_value.output_parsed = mock_bug_report
+        self.mock_parse.return_value.output_parsed = mock_bug_report
 
-        agent = BugReportAgent()
-        state, prompt, is_complete = agent.process_turn("Full bug report input")
+        state, prompt, is_complete = self.agent.process_turn("Full bug report input")
         self.assertTrue(is_complete)
         self.assertIn("Thank you! All required information has been collected", prompt)
         self.assertEqual(state.severity, Severity.HIGH)
 
-    @patch("openai.responses.parse")
-    def test_process_turn_missing_severity_defaults_medium(self, mock_parse):
+    def test_process_turn_missing_severity_defaults_medium(self):
         """Agent defaults severity to Medium if missing and all else is present."""
-        mock_bug_report = BugReport(
-            project_affected="proj",
-            error_message="err",
-            steps_to_reproduce=["step1"],
-            severity=None,
-        )
-        mock_parse.return_value.output_parsed = mock_bug_report
+        mock_bug_report = BASE_REPORT.model_copy(update={"severity": None})
+        self.mock_parse.return_value.output_parsed = mock_bug_report
 
-        agent = BugReportAgent()
-        state, prompt, is_complete = agent.process_turn("No severity")
+        state, prompt, is_complete = self.agent.process_turn("No severity")
         self.assertTrue(is_complete)
         self.assertEqual(state.severity, Severity.MEDIUM)
         self.assertIn("Medium", prompt)
         self.assertIn("no severity was specified", prompt.lower())
 
-    @patch("openai.responses.parse")
-    def test_process_turn_missing_steps(self, mock_parse):
-        """Agent prompts for steps if missing."""
-        mock_bug_report = BugReport(
-            project_affected="proj",
-            error_message="err",
-            steps_to_reproduce=[],
-            severity=Severity.LOW,
-        )
-        mock_parse.return_value.output_parsed = mock_bug_report
-
-        agent = BugReportAgent()
-        _, prompt, is_complete = agent.process_turn("No steps")
-        self.assertFalse(is_complete)
-        self.assertIn("steps_to_reproduce", prompt)
-
-    @patch("openai.responses.parse")
-    def test_process_turn_missing_project(self, mock_parse):
-        """Agent prompts for project if missing."""
-        mock_bug_report = BugReport(
-            project_affected=None,
-            error_message="err",
-            steps_to_reproduce=["step1"],
-            severity=Severity.LOW,
-        )
-        mock_parse.return_value.output_parsed = mock_bug_report
-
-        agent = BugReportAgent()
-        _, prompt, is_complete = agent.process_turn("No project")
-        self.assertFalse(is_complete)
-        self.assertIn("project_affected", prompt)
-
-    @patch("openai.responses.parse")
-    def test_process_turn_missing_error_message(self, mock_parse):
-        """Agent prompts for error message if missing."""
-        mock_bug_report = BugReport(
-            project_affected="proj",
-            error_message=None,
-            steps_to_reproduce=["step1"],
-            severity=Severity.LOW,
-        )
-        mock_parse.return_value.output_parsed = mock_bug_report
-
-        agent = BugReportAgent()
-        _, prompt, is_complete = agent.process_turn("No error message")
-        self.assertFalse(is_complete)
-        self.assertIn("error_message", prompt)
+    def test_process_turn_missing_field(self):
+        """Agent prompts for a required field the model could not fill."""
+        for field, value in [
+            ("project_affected", None),
+            ("error_message", None),
+            ("steps_to_reproduce", []),
+        ]:
+            with self.subTest(field=field):
+                self.agent.reset()
+                self.mock_parse.return_value.output_parsed = BASE_REPORT.model_copy(
+                    update={field: value}
+                )
+                _, prompt, is_complete = self.agent.process_turn(f"No {field}")
+                self.assertFalse(is_complete)
+                self.assertIn(field, prompt)
 
-    @patch("openai.responses.parse")
-    def test_process_turn_multi_turn_completion(self, mock_parse):
+    def test_process_turn_multi_turn_completion(self):
         """Agent supports multi-turn completion."""
         mock_bug_report1 = BugReport(
             project_affected="proj",
@@ -102,73 +104,47 @@ class TestBugReportAgent(unittest.TestCase):
             steps_to_reproduce=[],
             severity=None,
         )
-        mock_bug_report2 = BugReport(
-            project_affected="proj",
-            error_message="err",
-            steps_to_reproduce=["step1"],
-            severity=Severity.HIGH,
-        )
-        mock_parse.side_effect = [
-            MagicMock(output_parsed=mock_bug_report1),
-            MagicMock(output_parsed=mock_bug_report2),
+        mock_bug_report2 = BASE_REPORT.model_copy(update={"severity": Severity.HIGH})
+        self.mock_parse.side_effect = [
+            SimpleNamespace(output_parsed=mock_bug_report1),
+            SimpleNamespace(output_parsed=mock_bug_report2),
         ]
 
-        agent = BugReportAgent()
-        _, _, is_complete = agent.process_turn("Only project")
-        state, _, is_complete = agent.process_turn("err, step1, high")
+        _, _, is_complete = self.agent.process_turn("Only project")
+        state, _, is_complete = self.agent.process_turn("err, step1, high")
         self.assertTrue(is_complete)
         self.assertEqual(state.severity, Severity.HIGH)
 
-    @patch("openai.responses.parse")
-    def test_process_turn_invalid_severity(self, mock_parse):
+    def test_process_turn_invalid_severity(self):
         """Agent prompts for valid severity if invalid provided."""
-        mock_bug_report = BugReport(
-            project_affected="proj",
-            error_message="err",
-            steps_to_reproduce=["step1"],
-            severity="Critical",
-        )
-        mock_parse.return_value.output_parsed = mock_bug_report
+        mock_bug_report = BASE_REPORT.model_copy(update={"severity": "Critical"})
+        self.mock_parse.return_value.output_parsed = mock_bug_report
 
-        agent = BugReportAgent()
-        _, prompt, is_complete = agent.process_turn("Invalid severity")
+        _, prompt, is_complete = self.agent.process_turn("Invalid severity")
         self.assertFalse(is_complete)
         self.assertIn("severity", prompt.lower())
 
-    @patch("openai.responses.parse")
-    def test_process_turn_steps_semicolon_split(self, mock_parse):
+    def test_process_turn_steps_semicolon_split(self):
         """Agent handles steps as semicolon-separated string."""
-        mock_bug_report = BugReport(
-            project_affected="proj",
-            error_message="err",
-            steps_to_reproduce=["step1; step2; step3"],
-            severity=Severity.LOW,
+        mock_bug_report = BASE_REPORT.model_copy(
+            update={"steps_to_reproduce": ["step1; step2; step3"]}
         )
-        mock_parse.return_value.output_parsed = mock_bug_report
+        self.mock_parse.return_value.output_parsed = mock_bug_report
 
-        agent = BugReportAgent()
-        state, _, _ = agent.process_turn("Steps as semicolon string")
+        state, _, _ = self.agent.process_turn("Steps as semicolon string")
         self.assertIn("steps_to_reproduce", state.model_fields)
 
-    @patch("openai.responses.parse")
-    def test_process_turn_severity_explicit_low_high(self, mock_parse):
+    def test_process_turn_severity_explicit_low_high(self):
         """Agent accepts explicit Low/High severity values."""
-        for sev in [Severity.LOW, Severity.HIGH]:
-            mock_bug_report = BugReport(
-                project_affected="proj",
-                error_message="err",
-                steps_to_reproduce=["step1"],
-                severity=sev,
-            )
-            mock_parse.return_value.output_parsed = mock_bug_report
-
-            agent = BugReportAgent()
-            state, _, is_complete = agent.process_turn(f"Severity {sev}")
-            self.assertTrue(is_complete)
-            self.assertEqual(state.severity, sev)
+        for sev, report in SEVERITY_REPORTS.items():
+            with self.subTest(severity=sev):
+                self.mock_parse.return_value.output_parsed = report
+                self.agent.reset()
+                state, _, is_complete = self.agent.process_turn(f"Severity {sev}")
+                self.assertTrue(is_complete)
+                self.assertEqual(state.severity, sev)
 
-    @patch("openai.responses.parse")
-    def test_process_turn_empty_input(self, mock_parse):
+    def test_process_turn_empty_input(self):
         """Agent prompts for all fields if input is empty."""
         mock_bug_report = BugReport(
             project_affected=None,
@@ -176,38 +152,77 @@ class TestBugReportAgent(unittest.TestCase):
             steps_to_reproduce=[],
             severity=None,
         )
-        mock_parse.return_value.output_parsed = mock_bug_report
+        self.mock_parse.return_value.output_parsed = mock_bug_report
 
-        agent = BugReportAgent()
-        _, prompt, is_complete = agent.process_turn("")
+        _, prompt, is_complete = self.agent.process_turn("")
         self.assertFalse(is_complete)
-        self.assertIn("project_affected", prompt)
-        self.assertIn("error_message", prompt)
-        self.assertIn("steps_to_reproduce", prompt)
-        self.assertIn("severity", prompt)
+        self.assertRegex(prompt, ALL_FIELDS_PATTERN)
 
-    @patch("openai.responses.parse")
-    def test_process_turn_api_validation_error(self, mock_parse):
+    def test_process_turn_api_validation_error(self):
         """Agent handles API validation errors gracefully."""
-        mock_parse.side_effect = Exception("API validation error")
-        agent = BugReportAgent()
-        _, prompt, is_complete = agent.process_turn("bad input")
+        self.mock_parse.side_effect = Exception("API validation error")
+        _, prompt, is_complete = self.agent.process_turn("bad input")
         self.assertFalse(is_complete)
         self.assertIn("problem parsing", prompt.lower())
 
-    @patch("openai.responses.parse")
-    def test_process_turn_extra_irrelevant_info(self, mock_parse):
-        """Agent ignores extra irrelevant info and completes if all fields are present."""
-        mock_bug_report = BugReport(
-            project_affected="proj",
-            error_message="err",
-            steps_to_reproduce=["step1"],
-            severity=Severity.LOW,
+    def test_process_turn_repeated_input_uses_cache(self):
+        """Agent reuses the cached response for an identical state and input."""
+        self.mock_parse.return_value.output_parsed = BASE_REPORT
+
+        self.agent.process_turn("Same input")
+        state, _, is_complete = self.agent.process_turn("Same input")
+        self.assertEqual(1, self.mock_parse.call_count)
+        self.assertTrue(is_complete)
+        self.assertEqual(state.project_affected, "proj")
+        self.assertEqual(0, self.mock_parse.call_args[1]["temperature"])
+
+    def test_process_turn_api_error_not_cached(self):
+        """Agent does not cache failed API calls."""
+        self.mock_parse.side_effect = [
+            Exception("Rate limited"),
+            SimpleNamespace(output_parsed=BASE_REPORT),
+        ]
+
+        _, _, is_complete = self.agent.process_turn("Retry me")
+        self.assertFalse(is_complete)
+        _, _, is_complete = self.agent.process_turn("Retry me")
+        self.assertTrue(is_complete)
+        self.assertEqual(2, self.mock_parse.call_count)
+
+    def test_process_turn_static_prefix_first(self):
+        """Agent sends the static instructions first and the state summary after them."""
+        self.mock_parse.return_value.output_parsed = BugReport(project_affected="proj")
+
+        self.agent.state = {"project_affected": "proj"}
+        self.agent.process_turn("The app crashes")
+        messages = self.mock_parse.call_args[1]["input"]
+        self.assertEqual(SYSTEM_PREFIX, messages[0]["content"])
+        self.assertEqual(
+            "Collected fields: project_affected. "
+            "Missing: error_message, steps_to_reproduce, severity.",
+            messages[1]["content"],
         )
-        mock_parse.return_value.output_parsed = mock_bug_report
+        self.assertEqual("The app crashes", messages[-1]["content"])
 
-        agent = BugReportAgent()
-        state, _, is_complete = agent.process_turn(
+    def test_process_turn_merges_collected_state(self):
+        """Fields collected in earlier turns are kept when the model only returns new ones."""
+        self.mock_parse.return_value.output_parsed = BugReport(
+            steps_to_reproduce=["step1"], severity=Severity.LOW
+        )
+
+        self.agent.state = {"project_affected": "proj", "error_message": "err"}
+        state, _, is_complete = self.agent.process_turn("Steps: step1. Severity low")
+
+        self.assertTrue(is_complete)
+        self.assertEqual("proj", state.project_affected)
+        self.assertEqual("err", state.error_message)
+        self.assertEqual(["step1"], state.steps_to_reproduce)
+
+    def test_process_turn_extra_irrelevant_info(self):
+        """Agent ignores extra irrelevant info and completes if all fields are present."""
+        self.mock_parse.return_value.output_parsed = BASE_REPORT
+
+        state, _, is_complete = self.agent.process_turn(
             "This is a bug with extra info: ignore this."
         )
         self.assertTrue(is_complete)
@@ -215,5 +230,246 @@ class TestBugReportAgent(unittest.TestCase):
         self.assertEqual(state.severity, Severity.LOW)
 
 
+class TestBugReportFieldPrompts(unittest.TestCase):
+    """Test cases for the field-by-field prompt and state update helpers."""
+
+    def test_get_next_prompt_walks_fields_in_order(self):
+        """get_next_prompt returns each field's question, then None when complete."""
+        agent = BugReportAgent()
+        self.assertEqual(
+            "What project or component is affected?", agent.get_next_prompt()
+        )
+        agent.update_state("proj")
+        self.assertEqual(
+            "What is the error message or problem?", agent.get_next_prompt()
+        )
+        agent.update_state("err")
+        agent.update_state("step1")
+        agent.update_state("high")
+        self.assertIsNone(agent.get_next_prompt())
+        self.assertTrue(agent.is_complete())
+
+    def test_update_state_normalizes_severity(self):
+        """update_state capitalizes a valid severity value."""
+        agent = BugReportAgent()
+        agent.current_field_index = 3
+        agent.update_state("  low ")
+        self.assertEqual("Low", agent.state["severity"])
+
+    def test_update_state_rejects_invalid_severity(self):
+        """update_state raises on an unknown severity and stays on the same field."""
+        agent = BugReportAgent()
+        agent.current_field_index = 3
+        with self.assertRaises(ValueError):
+            agent.update_state("Critical")
+        self.assertEqual(3, agent.current_field_index)
+
+    def test_update_state_splits_steps(self):
+        """update_state splits steps on newlines and semicolons and drops blanks."""
+        agent = BugReportAgent()
+        agent.current_field_index = 2
+        agent.update_state("open app; click save;;\n  see error \n")
+        self.assertEqual(
+            ["open app", "click save", "see error"], agent.state["steps_to_reproduce"]
+        )
+
+    def test_reset_clears_state(self):
+        """reset starts a new report from the first field."""
+        agent = BugReportAgent()
+        agent.update_state("proj")
+        agent.reset()
+        self.assertEqual({}, agent.state)
+        self.assertEqual(
+            "What project or component is affected?", agent.get_next_prompt()
+        )
+
+    def test_assemble_report(self):
+        """assemble_report builds a BugReport from the collected state."""
+        agent = BugReportAgent()
+        for answer in ["proj", "err", "step1", "medium"]:
+            agent.update_state(answer)
+        report = agent.assemble_report()
+        self.assertEqual("proj", report.project_affected)
+        self.assertEqual(Severity.MEDIUM, report.severity)
+
+
+class TestBugReportConsole(unittest.TestCase):
+    """Test cases for the interactive console session."""
+
+    @patch("builtins.input", return_value="Full bug report")
+    @patch.object(agent_module, "get_openai_client")
+    def test_report_bug_writes_final_report(self, mock_get_client, _mock_input):
+        """report_bug writes the agent reply and the numbered final report."""
+        mock_get_client.return_value.responses.parse.return_value.output_parsed = (
+            BASE_REPORT.model_copy(
+                update={
+                    "steps_to_reproduce": ["open app", "click save"],
+                    "severity": Severity.HIGH,
+                }
+            )
+        )
+
+        agent = BugReportAgent()
+        with patch("sys.stdout", new_callable=io.StringIO) as mock_stdout:
+            agent.report_bug()
+
+        output = mock_stdout.getvalue()
+        self.assertIn("Agent: Thank you!", output)
+        self.assertIn("Final structured bug report:\n", output)
+        self.assertIn("Steps To Reproduce:\n  1. open app\n  2. click save\n", output)
+
+    @patch("builtins.input", side_effect=["first", "second", "third"])
+    @patch.object(agent_module, "get_openai_client")
+    def test_report_bug_keeps_state_after_failed_turn(
+        self, mock_get_client, _mock_input
+    ):
+        """A failed turn does not discard fields collected in earlier turns."""
+        mock_parse = mock_get_client.return_value.responses.parse
+        mock_parse.side_effect = [
+            SimpleNamespace(
+                output_parsed=BugReport(project_affected="proj", error_message="err")
+            ),
+            Exception("API error"),
+            SimpleNamespace(
+                output_parsed=BugReport(
+                    steps_to_reproduce=["step1"], severity=Severity.LOW
+                )
+            ),
+        ]
+
+        agent = BugReportAgent()
+        with patch("sys.stdout", new_callable=io.StringIO):
+            agent.report_bug()
+
+        self.assertEqual("proj", agent.state["project_affected"])
+        self.assertEqual(["step1"], agent.state["steps_to_reproduce"])
+        summary = mock_parse.call_args[1]["input"][1]["content"]
+        self.assertIn("Collected fields: project_affected, error_message.", summary)
+
+
+class TestBugReportBatch(unittest.TestCase):
+    """Test cases for offline bug report triage through the Batch API."""
+
+    @patch.object(agent_module, "get_openai_client")
+    def test_submit_batch_uploads_one_request_per_report(self, mock_get_client):
+        """submit_batch uploads a JSONL file with one request per report."""
+        mock_files_create = mock_get_client.return_value.files.create
+        mock_batches_create = mock_get_client.return_value.batches.create
+        mock_files_create.return_value.id = "file-123"
+        mock_batches_create.return_value.id = "batch-456"
+
+        agent = BugReportAgent()
+        batch_id = agent.submit_batch(["first bug", "second bug"])
+
+        self.assertEqual("batch-456", batch_id)
+        _, file_obj = mock_files_create.call_args[1]["file"]
+        lines = file_obj.getvalue().decode("utf-8").splitlines()
+        self.assertEqual(2, len(lines))
+        first = json.loads(lines[0])
+        self.assertEqual("report-0", first["custom_id"])
+        self.assertEqual("/v1/responses", first["url"])
+        self.assertEqual(SYSTEM_PREFIX, first["body"]["input"][0]["content"])
+        self.assertEqual("first bug", first["body"]["input"][-1]["content"])
+        mock_batches_create.assert_called_once_with(
+            input_file_id="file-123",
+            endpoint="/v1/responses",
+            completion_window="24h",
+        )
+
+    def test_submit_batch_empty(self):
+        """submit_batch rejects an empty list of reports."""
+        agent = BugReportAgent()
+        with self.assertRaises(ValueError):
+            agent.submit_batch([])
+
+    @patch.object(agent_module, "get_openai_client")
+    def test_poll_batch_returns_reports_in_order(self, mock_get_client):
+        """poll_batch waits for completion and parses results by custom_id."""
+        mock_retrieve = mock_get_client.return_value.batches.retrieve
+        mock_content = mock_get_client.return_value.files.content
+        report = BASE_REPORT.model_copy(update={"severity": Severity.HIGH})
+        in_progress = MagicMock(status="in_progress")
+        completed = MagicMock(status="completed", output_file_id="file-out")
+        completed.request_counts.total = 2
+        mock_retrieve.side_effect = [in_progress, completed]
+        success_line = {
+            "custom_id": "report-1",
+            "response": {
+                "status_code": 200,
+                "body": {
+                    "output": [
+                        {
+                            "type": "message",
+                            "content": [
+                                {
+                                    "type": "output_text",
+                                    "text": report.model_dump_json(),
+                                }
+                            ],
+                        }
+                    ]
+                },
+            },
+        }
+        failed_line = {"custom_id": "report-0", "response": {"status_code": 500}}
+        mock_content.return_value.text = "\n".join(
+            [json.dumps(success_line), json.dumps(failed_line)]
+        )
+
+        agent = BugReportAgent()
+        results = agent.poll_batch("batch-456", poll_interval=0)
+
+        self.assertIsNone(results[0])
+        self.assertEqual("proj", results[1].project_affected)
+        self.assertEqual(Severity.HIGH, results[1].severity)
+
+    @patch.object(agent_module, "get_openai_client")
+    def test_poll_batch_unparseable_entries_are_none(self, mock_get_client):
+        """An invalid, truncated or malformed entry is None; the rest still parse."""
+        completed = MagicMock(status="completed", output_file_id="file-out")
+        completed.request_counts.total = 3
+        mock_get_client.return_value.batches.retrieve.return_value = completed
+
+        def line(index, text):
+            body = {
+                "output": [
+                    {
+                        "type": "message",
+                        "content": [{"type": "output_text", "text": text}],
+                    }
+                ]
+            }
+            return json.dumps(
+                {
+                    "custom_id": f"report-{index}",
+                    "response": {"status_code": 200, "body": body},
+                }
+            )
+
+        mock_get_client.return_value.files.content.return_value.text = "\n".join(
+            [
+                line(0, BASE_REPORT.model_dump_json()[:40]),
+                line(1, BASE_REPORT.model_dump_json()),
+                '{"custom_id": "report-2", "resp',
+            ]
+        )
+
+        results = BugReportAgent().poll_batch("batch-456", poll_interval=0)
+
+        self.assertIsNone(results[0])
+        self.assertEqual("proj", results[1].project_affected)
+        self.assertIsNone(results[2])
+
+    @patch.object(agent_module, "get_openai_client")
+    def test_poll_batch_failed_status_raises(self, mock_get_client):
+        """poll_batch raises when the batch ends without output."""
+        mock_get_client.return_value.batches.retrieve.return_value = MagicMock(
+            status="expired"
+        )
+        agent = BugReportAgent()
+        with self.assertRaises(RuntimeError):
+            agent.poll_batch("batch-456", poll_interval=0)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1 @@
+# This file marks the directory as a Python package for test discovery.
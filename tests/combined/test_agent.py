@@ -0,0 +1,114 @@
+"""
+Unit tests for the combined standup and bug report agent.
+"""
+
+import unittest
+from unittest.mock import patch
+
+from src.bug_report.schema import BugReport, Severity
+from src.combined.agent import (
+    CombinedOutput,
+    combined,
+    combined_with_output,
+    format_bug_report,
+)
+from src.daily_standup.agent import DailyStatus
+
+
+class TestCombined(unittest.TestCase):
+    """Tests for parsing a standup and a bug report in one request."""
+
+    @patch("src.combined.agent.get_openai_client")
+    def test_combined_makes_one_request(self, mock_get_client):
+        """Both inputs are sent in a single request with the composite model."""
+        mock_parse = mock_get_client.return_value.responses.parse
+        expected = CombinedOutput(
+            standup=DailyStatus(yesterday=["Fixed bugs"], today=["Write tests"]),
+            bug=BugReport(project_affected="proj"),
+        )
+        mock_parse.return_value.output_parsed = expected
+
+        result = combined("Yesterday fixed bugs, today write tests", "proj crashes")
+
+        self.assertEqual(expected, result)
+        mock_parse.assert_called_once()
+        kwargs = mock_parse.call_args[1]
+        self.assertEqual(CombinedOutput, kwargs["text_format"])
+        user_message = kwargs["input"][-1]["content"]
+        self.assertIn("Yesterday fixed bugs, today write tests", user_message)
+        self.assertIn("proj crashes", user_message)
+
+    @patch("src.combined.agent.get_openai_client")
+    def test_combined_refusal_raises(self, mock_get_client):
+        """A refused or incomplete response is reported instead of returning None."""
+        mock_get_client.return_value.responses.parse.return_value.output_parsed = None
+
+        with self.assertRaises(ValueError) as ctx:
+            combined_with_output("status", "bug")
+
+        self.assertIn("refused or incomplete", str(ctx.exception))
+
+    @patch("src.combined.agent.get_openai_client")
+    def test_combined_with_output_formats_both(self, mock_get_client):
+        """The output contains the formatted standup and bug report."""
+        mock_parse = mock_get_client.return_value.responses.parse
+        mock_parse.return_value.output_parsed = CombinedOutput(
+            standup=DailyStatus(yesterday=["Fixed bugs"], today=["Write tests"]),
+            bug=BugReport(
+                project_affected="proj",
+                error_message="err",
+                steps_to_reproduce=["open app"],
+                severity=Severity.HIGH,
+            ),
+        )
+
+        result = combined_with_output("status", "bug")
+
+        self.assertIn("### Daily Standup Update", result)
+        self.assertIn("  - No blockers", result)
+        self.assertIn("### Bug Report", result)
+        self.assertIn("- **Project Affected:** proj", result)
+        self.assertIn("  1. open app", result)
+        self.assertNotIn("Missing information", result)
+
+    @patch("src.combined.agent.get_openai_client")
+    def test_combined_with_output_reports_incomplete_standup(self, mock_get_client):
+        """An incomplete standup shows its error message and the bug report is still shown."""
+        mock_parse = mock_get_client.return_value.responses.parse
+        mock_parse.return_value.output_parsed = CombinedOutput(
+            standup=DailyStatus(today=["Write tests"]),
+            bug=BugReport(project_affected="proj"),
+        )
+
+        result = combined_with_output("status", "bug")
+
+        self.assertIn("Missing information for: yesterday.", result)
+        self.assertIn("- **Project Affected:** proj", result)
+
+
+class TestFormatBugReport(unittest.TestCase):
+    """Tests for format_bug_report."""
+
+    def test_missing_severity_defaults_to_medium(self):
+        """Severity defaults to Medium when it is the only missing field."""
+        result = format_bug_report(
+            BugReport(
+                project_affected="proj",
+                error_message="err",
+                steps_to_reproduce=["step1"],
+            )
+        )
+        self.assertIn("- **Severity:** Medium", result)
+        self.assertNotIn("Missing information", result)
+
+    def test_lists_missing_fields(self):
+        """Fields that are still missing are listed after the report."""
+        result = format_bug_report(BugReport(project_affected="proj"))
+        self.assertIn(
+            "Missing information for: error_message, steps_to_reproduce, severity.",
+            result,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+"""
+pytest configuration shared by the whole suite.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Request methods every OpenAI client call ends up in, sync and async
+OPENAI_REQUEST_METHODS = [
+    ("openai.resources.chat.completions", "Completions"),
+    ("openai.resources.chat.completions", "AsyncCompletions"),
+    ("openai.resources.responses", "Responses"),
+    ("openai.resources.responses", "AsyncResponses"),
+]
+
+
+@pytest.fixture(autouse=True)
+def block_openai_requests(monkeypatch):
+    """
+    Fail any test that sends a real OpenAI request without RUN_OPENAI_LIVE set.
+    Tests stub the client before it is used, so only a missing stub ends up here.
+    openai is only patched once something has imported it, so runs that never use
+    it do not pay for the import.
+    """
+    if os.getenv("RUN_OPENAI_LIVE") or "openai" not in sys.modules:
+        return
+
+    def blocked(*_args, **_kwargs):
+        pytest.fail("Un-mocked OpenAI request; set RUN_OPENAI_LIVE=1 to allow it")
+
+    for module, name in OPENAI_REQUEST_METHODS:
+        monkeypatch.setattr(f"{module}.{name}.create", blocked)
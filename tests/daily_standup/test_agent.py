@@ -2,17 +2,72 @@
 Unit tests for the Daily Standup Agent.
 """
 
+import asyncio
+import os
 import unittest
-from unittest.mock import Mock, patch
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
 
+import pytest
+
+from src.daily_standup import agent as agent_module
 from src.daily_standup.agent import (
     daily_standup,
     DailyStatus,
     format_daily_status,
     daily_standup_with_output,
+    daily_standup_many,
+    DailyStatusBatch,
+    gather_daily_standups,
+    IndexedDailyStatus,
+)
+from src import openai_client
+from src.semantic_cache import SemanticCache
+
+# Built once; tests pass a model_copy() because the agent fills in default blockers in place
+SUCCESS_STATUS = DailyStatus(
+    yesterday=["worked on features"],
+    today=["continue development"],
+    blockers=["No blockers"],
+)
+
+# Parsed statuses missing a required section, keyed by the sections reported missing.
+# Shared as-is: blockers are already set, so the agent does not modify them.
+MISSING_STATUSES = {
+    "yesterday": DailyStatus(today=["work on new feature"], blockers=["No blockers"]),
+    "today": DailyStatus(yesterday=["worked on feature"], blockers=["No blockers"]),
+    "yesterday, today": DailyStatus(blockers=["No blockers"]),
+}
+
+EXPECTED_COMPLETE_FORMAT = (
+    "### Daily Standup Update\n"
+    "- **Yesterday:**\n"
+    "  - worked on login feature\n"
+    "- **Today:**\n"
+    "  - continue with login\n"
+    "  - start signup feature\n"
+    "- **Blockers:**\n"
+    "  - No blockers"
 )
 
 
+class PatchedClientTestCase(unittest.TestCase):
+    """Patches the agent's OpenAI client once per class instead of once per test."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client_patcher = patch.object(agent_module, "get_openai_client")
+        cls.mock_client = cls.client_patcher.start().return_value
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client_patcher.stop()
+
+    def setUp(self):
+        self.mock_client.reset_mock(return_value=True, side_effect=True)
+        self.mock_parse = self.mock_client.responses.parse
+
+
 class TestDailyStatus(unittest.TestCase):
     """Tests for the DailyStatus Pydantic model."""
 
@@ -46,21 +101,7 @@ class TestFormatDailyStatus(unittest.TestCase):
             blockers=["No blockers"],
         )
 
-        result = format_daily_status(status)
-        expected = (
-            "### Daily Standup Update\n"
-            "- **Yesterday:**\n"
-            "  - worked on login feature\n"
-            "- **Today:**\n"
-            "  - continue with login\n"
-            "  - start signup feature\n"
-            "- **Blockers:**\n"
-            "  - No blockers"
-        )
-        self.assertEqual(
-            result,
-            expected,
-        )
+        self.assertEqual(EXPECTED_COMPLETE_FORMAT, format_daily_status(status))
 
     def test_format_status_with_multiple_blockers(self):
         """Test formatting a status with multiple blockers."""
@@ -75,20 +116,14 @@ class TestFormatDailyStatus(unittest.TestCase):
         self.assertIn("  - waiting for design", result)
 
 
-class TestDailyStandup(unittest.TestCase):
+class TestDailyStandup(PatchedClientTestCase):
     """Tests for the daily_standup function."""
 
-    @patch("src.daily_standup.agent.openai.responses.parse")
-    def test_daily_standup_success(self, mock_parse):
+    def test_daily_standup_success(self):
         """Test successful parsing of daily status."""
         # Mock the OpenAI response
-        mock_response = Mock()
-        mock_response.output_parsed = DailyStatus(
-            yesterday=["worked on features"],
-            today=["continue development"],
-            blockers=["No blockers"],
-        )
-        mock_parse.return_value = mock_response
+        mock_response = SimpleNamespace(output_parsed=SUCCESS_STATUS.model_copy())
+        self.mock_parse.return_value = mock_response
 
         result = daily_standup(
             "Yesterday I worked on features. Today I continue development."
@@ -99,72 +134,41 @@ class TestDailyStandup(unittest.TestCase):
         self.assertEqual(result.today, ["continue development"])
         self.assertEqual(result.blockers, ["No blockers"])
 
-        # Verify OpenAI was called with correct parameters
-        mock_parse.assert_called_once()
-        call_args = mock_parse.call_args
-        self.assertEqual(call_args[1]["model"], "gpt-4.1-nano")
-        self.assertEqual(call_args[1]["text_format"], DailyStatus)
-
-    @patch("src.daily_standup.agent.openai.responses.parse")
-    def test_daily_standup_missing_yesterday(self, mock_parse):
-        """Test handling of missing yesterday information."""
-        mock_response = Mock()
-        mock_response.output_parsed = DailyStatus(
-            yesterday=[],  # Empty yesterday
-            today=["work on new feature"],
-            blockers=["No blockers"],
-        )
-        mock_parse.return_value = mock_response
-
-        with self.assertRaises(ValueError) as cm:
-            daily_standup("Today I will work on new feature.")
-
-        self.assertIn("Missing information for: yesterday", str(cm.exception))
-        self.assertIn("Status for yesterday and today are required", str(cm.exception))
-
-    @patch("src.daily_standup.agent.openai.responses.parse")
-    def test_daily_standup_missing_today(self, mock_parse):
-        """Test handling of missing today information."""
-        mock_response = Mock()
-        mock_response.output_parsed = DailyStatus(
-            yesterday=["worked on feature"],
-            today=[],  # Empty today
-            blockers=["No blockers"],
+    def test_openai_called_with_correct_kwargs(self):
+        """Test the model, schema and token limit sent to the API."""
+        self.mock_parse.return_value = SimpleNamespace(
+            output_parsed=SUCCESS_STATUS.model_copy()
         )
-        mock_parse.return_value = mock_response
 
-        with self.assertRaises(ValueError) as cm:
-            daily_standup("Yesterday I worked on feature.")
+        daily_standup("Yesterday I worked on features. Today I continue development.")
 
-        self.assertIn("Missing information for: today", str(cm.exception))
-        self.assertIn("Status for yesterday and today are required", str(cm.exception))
-
-    @patch("src.daily_standup.agent.openai.responses.parse")
-    def test_daily_standup_missing_both_yesterday_and_today(self, mock_parse):
-        """Test handling of missing both yesterday and today information."""
-        mock_response = Mock()
-        mock_response.output_parsed = DailyStatus(
-            yesterday=[],  # Empty yesterday
-            today=[],  # Empty today
-            blockers=["No blockers"],
+        self.mock_parse.assert_called_once()
+        kwargs = self.mock_parse.call_args.kwargs
+        self.assertEqual(
+            ("gpt-4.1-nano", DailyStatus, 300),
+            (kwargs["model"], kwargs["text_format"], kwargs["max_output_tokens"]),
         )
-        mock_parse.return_value = mock_response
 
-        with self.assertRaises(ValueError) as cm:
-            daily_standup("I have no specific updates.")
+    def test_daily_standup_missing_sections(self):
+        """Test handling of missing yesterday and/or today information."""
+        for missing, status in MISSING_STATUSES.items():
+            with self.subTest(missing=missing):
+                self.mock_parse.return_value = SimpleNamespace(output_parsed=status)
+
+                with self.assertRaises(ValueError) as cm:
+                    daily_standup(f"Missing {missing}.")
 
-        self.assertIn("Missing information for: yesterday, today", str(cm.exception))
+                self.assertIn(f"Missing information for: {missing}", str(cm.exception))
+                self.assertIn(
+                    "Status for yesterday and today are required", str(cm.exception)
+                )
 
-    @patch("src.daily_standup.agent.openai.responses.parse")
-    def test_daily_standup_empty_blockers_defaults_to_no_blockers(self, mock_parse):
+    def test_daily_standup_empty_blockers_defaults_to_no_blockers(self):
         """Test that empty blockers defaults to 'No blockers'."""
-        mock_response = Mock()
-        mock_response.output_parsed = DailyStatus(
-            yesterday=["worked on features"],
-            today=["continue development"],
-            blockers=[],  # Empty blockers
+        mock_response = SimpleNamespace(
+            output_parsed=SUCCESS_STATUS.model_copy(update={"blockers": []})
         )
-        mock_parse.return_value = mock_response
+        self.mock_parse.return_value = mock_response
 
         result = daily_standup(
             "Yesterday I worked on features. Today I continue development."
@@ -172,16 +176,14 @@ class TestDailyStandup(unittest.TestCase):
 
         self.assertEqual(result.blockers, ["No blockers"])
 
-    @patch("src.daily_standup.agent.openai.responses.parse")
-    def test_daily_standup_preserves_existing_blockers(self, mock_parse):
+    def test_daily_standup_preserves_existing_blockers(self):
         """Test that existing blockers are preserved."""
-        mock_response = Mock()
-        mock_response.output_parsed = DailyStatus(
-            yesterday=["worked on features"],
-            today=["continue development"],
-            blockers=["need API access", "waiting for review"],
+        mock_response = SimpleNamespace(
+            output_parsed=SUCCESS_STATUS.model_copy(
+                update={"blockers": ["need API access", "waiting for review"]}
+            )
         )
-        mock_parse.return_value = mock_response
+        self.mock_parse.return_value = mock_response
 
         result = daily_standup(
             "Yesterday I worked on features. Today I continue development. Blocked by API access and review."
@@ -189,20 +191,35 @@ class TestDailyStandup(unittest.TestCase):
 
         self.assertEqual(result.blockers, ["need API access", "waiting for review"])
 
+    def test_daily_standup_semantic_cache_reuses_similar_update(self):
+        """A near-duplicate update is served from the semantic cache."""
+        self.mock_parse.return_value.output_parsed = DailyStatus(
+            yesterday=["Worked on login"], today=["Worked on login"]
+        )
+        vectors = {"first": [1.0, 0.0], "again": [0.99, 0.05], "other": [0.0, 1.0]}
+        cache = SemanticCache(embed=vectors.__getitem__)
+
+        first = daily_standup("first", cache=cache)
+        again = daily_standup("again", cache=cache)
+        daily_standup("other", cache=cache)
+
+        self.assertEqual(first, again)
+        self.assertEqual(2, self.mock_parse.call_count)
 
-class TestDailyStandupWithOutput(unittest.TestCase):
+
+class TestDailyStandupWithOutput(PatchedClientTestCase):
     """Tests for the daily_standup_with_output function."""
 
-    @patch("src.daily_standup.agent.openai.responses.parse")
-    def test_daily_standup_with_output_returns_formatted_status(self, mock_parse):
+    def test_daily_standup_with_output_returns_formatted_status(self):
         """Test that daily_standup_with_output returns the formatted status."""
-        mock_response = Mock()
-        mock_response.output_parsed = DailyStatus(
-            yesterday=["worked on login"],
-            today=["work on signup"],
-            blockers=["No blockers"],
+        mock_response = SimpleNamespace(
+            output_parsed=DailyStatus(
+                yesterday=["worked on login"],
+                today=["work on signup"],
+                blockers=["No blockers"],
+            )
         )
-        mock_parse.return_value = mock_response
+        self.mock_parse.return_value = mock_response
 
         result = daily_standup_with_output(
             "Yesterday I worked on login. Today I work on signup."
@@ -212,68 +229,194 @@ class TestDailyStandupWithOutput(unittest.TestCase):
         self.assertIn("worked on login", result)
         self.assertIn("work on signup", result)
 
-    @patch("src.daily_standup.agent.openai.responses.parse")
-    def test_daily_standup_with_output_missing_yesterday_and_today(self, mock_parse):
-        """Test that daily_standup_with_output returns error for missing yesterday and today."""
-        status = "No blockers."
-        mock_response = Mock()
-        mock_response.output_parsed = DailyStatus(
-            yesterday=[],  # Empty yesterday
-            today=[],  # Empty today
-            blockers=["No blockers"],
-        )
-        mock_parse.return_value = mock_response
+    def test_daily_standup_with_output_missing_sections(self):
+        """Test that daily_standup_with_output returns an error for missing sections."""
+        for missing, status in MISSING_STATUSES.items():
+            with self.subTest(missing=missing):
+                self.mock_parse.return_value = SimpleNamespace(output_parsed=status)
 
-        result = daily_standup_with_output(status)
+                result = daily_standup_with_output(f"Missing {missing}. No blockers.")
 
-        self.assertIn("Missing information for: yesterday, today", result)
-        self.assertIn("Status for yesterday and today are required", result)
+                self.assertIn(f"Missing information for: {missing}", result)
+                self.assertIn("Status for yesterday and today are required", result)
 
-    @patch("src.daily_standup.agent.openai.responses.parse")
-    def test_daily_standup_with_output_missing_today(self, mock_parse):
-        """Test that daily_standup_with_output returns error for missing today."""
-        status = "Yesterday I fixed bugs. No blockers."
-        mock_response = Mock()
-        mock_response.output_parsed = DailyStatus(
-            yesterday=["worked on features"],
-            today=[],  # Empty today
-            blockers=["No blockers"],
+    def test_daily_standup_labeled_input_skips_api(self):
+        """Test that an update with explicit section labels is parsed locally."""
+        result = daily_standup(
+            "Yesterday: fixed bugs in v1.2; wrote docs\n"
+            "Today: write tests. review PRs\n"
+            "Blockers: none"
+        )
+
+        self.mock_parse.assert_not_called()
+        self.assertEqual(["Fixed bugs in v1.2", "Wrote docs"], result.yesterday)
+        self.assertEqual(["Write tests", "Review PRs"], result.today)
+        self.assertEqual(["No blockers"], result.blockers)
+
+    def test_daily_standup_labeled_input_keeps_blockers(self):
+        """Test that labeled blockers are preserved."""
+        result = daily_standup(
+            "Yesterday: research. Today: implement. Blockers: waiting for API keys"
         )
-        mock_parse.return_value = mock_response
 
-        result = daily_standup_with_output(status)
+        self.mock_parse.assert_not_called()
+        self.assertEqual(["Waiting for API keys"], result.blockers)
+
+    def test_daily_standup_labeled_input_missing_today(self):
+        """Test that an empty labeled section still raises a ValueError."""
+        with self.assertRaises(ValueError) as cm:
+            daily_standup("Yesterday: research. Today: Blockers: none")
+
+        self.mock_parse.assert_not_called()
+        self.assertIn("Missing information for: today", str(cm.exception))
 
-        self.assertIn("Missing information for: today", result)
 
-    @patch("src.daily_standup.agent.openai.responses.parse")
-    def test_daily_standup_with_output_missing_yesterday(self, mock_parse):
-        """Test that daily_standup_with_output returns error for missing yesterday."""
-        status = "Today I will work on the API. No blockers."
-        mock_response = Mock()
-        mock_response.output_parsed = DailyStatus(
-            yesterday=[],  # Empty yesterday
-            today=["work on new feature"],
-            blockers=["No blockers"],
+class TestDailyStandupMany(PatchedClientTestCase):
+    """Tests for the single-request daily_standup_many function."""
+
+    def test_daily_standup_many_single_request(self):
+        """Test that all statuses are sent in one request and matched by index."""
+        # Returned out of order to check that results are matched by index
+        mock_response = SimpleNamespace(
+            output_parsed=DailyStatusBatch(
+                statuses=[
+                    IndexedDailyStatus(
+                        index=1, yesterday=["second"], today=["second today"]
+                    ),
+                    IndexedDailyStatus(
+                        index=0, yesterday=["first"], today=["first today"]
+                    ),
+                ]
+            )
+        )
+        self.mock_parse.return_value = mock_response
+
+        results = daily_standup_many(["status one", "status two"])
+
+        self.mock_parse.assert_called_once()
+        user_message = self.mock_parse.call_args[1]["input"][-1]["content"]
+        self.assertIn("status one", user_message)
+        self.assertIn("status two", user_message)
+        self.assertEqual(["first"], results[0].yesterday)
+        self.assertEqual(["second"], results[1].yesterday)
+        self.assertEqual(["No blockers"], results[0].blockers)
+
+    def test_daily_standup_many_missing_entries(self):
+        """Test that incomplete or missing entries are returned as errors."""
+        mock_response = SimpleNamespace(
+            output_parsed=DailyStatusBatch(
+                statuses=[IndexedDailyStatus(index=0, yesterday=[], today=["today"])]
+            )
+        )
+        self.mock_parse.return_value = mock_response
+
+        results = daily_standup_many(["incomplete", "dropped"])
+
+        self.assertIsInstance(results[0], ValueError)
+        self.assertIn("Missing information for: yesterday", str(results[0]))
+        self.assertIsInstance(results[1], ValueError)
+
+    def test_daily_standup_many_empty(self):
+        """Test that an empty list makes no API call."""
+        self.assertEqual([], daily_standup_many([]))
+        self.mock_parse.assert_not_called()
+
+
+class TestGatherDailyStandups(unittest.TestCase):
+    """Tests for the concurrent gather_daily_standups function."""
+
+    @patch.object(agent_module, "get_async_openai_client")
+    def test_gather_returns_results_in_input_order(self, mock_get_client):
+        """Test that results are returned in the same order as the inputs."""
+        mock_parse = AsyncMock(
+            side_effect=[
+                SimpleNamespace(
+                    output_parsed=DailyStatus(
+                        yesterday=["first"], today=["first today"], blockers=[]
+                    )
+                ),
+                SimpleNamespace(
+                    output_parsed=DailyStatus(
+                        yesterday=["second"], today=["second today"], blockers=[]
+                    )
+                ),
+            ]
         )
-        mock_parse.return_value = mock_response
+        mock_get_client.return_value.responses.parse = mock_parse
+
+        results = asyncio.run(gather_daily_standups(["status one", "status two"]))
+
+        self.assertEqual(2, mock_parse.await_count)
+        self.assertEqual(["first"], results[0].yesterday)
+        self.assertEqual(["second"], results[1].yesterday)
+        self.assertEqual(["No blockers"], results[0].blockers)
+
+    @patch.object(agent_module, "get_async_openai_client")
+    def test_gather_returns_errors_without_failing_others(self, mock_get_client):
+        """Test that a status with missing information does not fail the batch."""
+        mock_parse = AsyncMock(
+            side_effect=[
+                SimpleNamespace(
+                    output_parsed=DailyStatus(yesterday=[], today=["only today"])
+                ),
+                SimpleNamespace(
+                    output_parsed=DailyStatus(
+                        yesterday=["worked"], today=["working"], blockers=[]
+                    )
+                ),
+            ]
+        )
+        mock_get_client.return_value.responses.parse = mock_parse
+
+        results = asyncio.run(gather_daily_standups(["incomplete", "complete"]))
+
+        self.assertIsInstance(results[0], ValueError)
+        self.assertIn("Missing information for: yesterday", str(results[0]))
+        self.assertIsInstance(results[1], DailyStatus)
+
+    @patch("openai.AsyncOpenAI")
+    @patch.dict("os.environ", {"OPENAI_API_KEY": "test"})
+    def test_gather_in_consecutive_event_loops(self, mock_async_openai):
+        """Back-to-back asyncio.run calls each get a client opened on their own loop."""
+        for cached in (
+            openai_client.get_openai_api_key,
+            openai_client._async_openai_client_for,  # pylint: disable=protected-access
+        ):
+            cached.cache_clear()
+            self.addCleanup(cached.cache_clear)
 
-        result = daily_standup_with_output(status)
+        def make_client(**_kwargs):
+            loop = asyncio.get_running_loop()
 
-        self.assertIn("Missing information for: yesterday", result)
+            async def parse(**_kwargs):
+                # Pooled connections from a closed loop fail like this in httpx
+                if asyncio.get_running_loop() is not loop:
+                    raise RuntimeError("Event loop is closed")
+                return SimpleNamespace(output_parsed=SUCCESS_STATUS.model_copy())
+
+            return SimpleNamespace(responses=SimpleNamespace(parse=parse))
+
+        mock_async_openai.side_effect = make_client
+        for _ in range(2):
+            results = asyncio.run(gather_daily_standups(["status one", "status two"]))
+            self.assertEqual([SUCCESS_STATUS, SUCCESS_STATUS], results)
+        self.assertEqual(2, mock_async_openai.call_count)
 
 
 class TestIntegration(unittest.TestCase):
     """Integration tests for the complete workflow."""
 
     def test_end_to_end_workflow(self):
-        """Test the complete workflow from input to formatted output."""
+        """Test the complete workflow from free-form input to a parsed status."""
         # This test would require a real OpenAI API call, so we'll mock it
-        with patch("src.daily_standup.agent.openai.responses.parse") as mock_parse:
-            mock_response = Mock()
-            mock_response.output_parsed = DailyStatus(
-                yesterday=["researched openAPI info", "relaxed"],
-                today=["catch up on emails", "work on openai agent"],
-                blockers=["No blockers"],
+        with patch.object(agent_module, "get_openai_client") as mock_get_client:
+            mock_parse = mock_get_client.return_value.responses.parse
+            mock_response = SimpleNamespace(
+                output_parsed=DailyStatus(
+                    yesterday=["researched openAPI info", "relaxed"],
+                    today=["catch up on emails", "work on openai agent"],
+                    blockers=["No blockers"],
+                )
             )
             mock_parse.return_value = mock_response
 
@@ -283,16 +426,39 @@ class TestIntegration(unittest.TestCase):
                 "I am not blocked"
             )
 
-            # Test the main function
             result = daily_standup(status_text)
 
-            # Test formatting
-            formatted = format_daily_status(result)
+            self.assertEqual(["researched openAPI info", "relaxed"], result.yesterday)
+            self.assertEqual(
+                ["catch up on emails", "work on openai agent"], result.today
+            )
+            self.assertEqual(["No blockers"], result.blockers)
+
+
+@pytest.mark.integration
+@pytest.mark.xdist_group("openai_live")
+@unittest.skipUnless(
+    os.getenv("RUN_OPENAI_LIVE"), "set RUN_OPENAI_LIVE=1 to call the OpenAI API"
+)
+class TestLiveBatch(unittest.TestCase):
+    """Live end-to-end check; all scenarios share one API request."""
+
+    def test_daily_standup_many_live(self):
+        """Test that complete updates parse and an incomplete one is reported."""
+        results = daily_standup_many(
+            [
+                "Yesterday I fixed the login bug. Today I am writing tests. No blockers.",
+                "Yesterday I reviewed PRs. Today I deploy v2. Blocked on staging access.",
+                "Today I will refactor the parser.",
+            ]
+        )
 
-            self.assertIn("researched openAPI info", formatted)
-            self.assertIn("catch up on emails", formatted)
-            self.assertIn("No blockers", formatted)
-            self.assertIn("### Daily Standup Update", formatted)
+        self.assertEqual(3, len(results))
+        self.assertIsInstance(results[0], DailyStatus)
+        self.assertEqual(["No blockers"], results[0].blockers)
+        self.assertIsInstance(results[1], DailyStatus)
+        self.assertNotEqual(["No blockers"], results[1].blockers)
+        self.assertIsInstance(results[2], ValueError)
 
 
 if __name__ == "__main__":
@@ -2,12 +2,22 @@
 Unit tests for DevToolsAgent function stubs.
 """
 
+import io
+import json
+import os
+import sys
 import unittest
 from unittest.mock import patch, MagicMock
 import subprocess
 import builtins
+import threading
+import time
+from types import SimpleNamespace
 
-from src.dev_tools.agent import DevToolsAgent
+import openai
+import pytest
+
+from src.dev_tools.agent import SUMMARY_MODEL, DevToolsAgent
 from src.dev_tools.schema import (
     RunFormatterLinterRequest,
     RunUnitTestsRequest,
@@ -15,59 +25,146 @@ from src.dev_tools.schema import (
 )
 from src.dev_tools.function_schemas import get_openai_function_schemas
 
+# Subprocess results shared by tests; the agent only reads them
+BLACK_OK = SimpleNamespace(stdout="Black formatted 2 files.", stderr="", returncode=0)
+PYLINT_OK = SimpleNamespace(
+    stdout="Your code has been rated at 9.50/10", stderr="", returncode=0
+)
+GIT_MODIFIED = SimpleNamespace(stdout=" M src/main.py\0", stderr="", returncode=0)
+UNITTEST_OK = SimpleNamespace(
+    stdout=(
+        "...\n"
+        "----------------------------------------------------------------------\n"
+        "Ran 2 tests in 0.123s\n\nOK\n"
+    ),
+    stderr="",
+    returncode=0,
+)
+UNITTEST_FAILED = SimpleNamespace(
+    stdout=(
+        "FAIL: test_foo (test_module.TestClass)\n"
+        "----------------------------------------------------------------------\n"
+        "Ran 2 tests in 0.123s\n\nFAILED (failures=1)\n"
+    ),
+    stderr="",
+    returncode=1,
+)
+
+
+def tool_name(cmd):
+    """Return the executable name of a command; the agent runs tools by absolute path."""
+    return os.path.basename(cmd[0])
+
+
+def run_by_tool(black, pylint, *others):
+    """
+    Build a subprocess.run stand-in that answers black and pylint by command name.
+    They run concurrently, so their call order is not fixed. Other commands get
+    the remaining results in order. Exceptions are raised instead of returned.
+    Commands are recorded in run.calls, so it can replace subprocess.run directly
+    or serve as a mock's side effect. It is safe to call from several threads.
+    """
+    remaining = list(others)
+    lock = threading.Lock()
+
+    def run(cmd, **_kwargs):
+        with lock:
+            run.calls.append(cmd)
+            if tool_name(cmd) == "black":
+                result = black
+            elif tool_name(cmd) == "pylint":
+                result = pylint
+            else:
+                result = remaining.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    run.calls = []
+    return run
+
+
+class PatchedRunTestCase(unittest.TestCase):
+    """Patches subprocess.run in the agent once per class instead of once per test."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.run_patcher = patch("src.dev_tools.agent.subprocess.run")
+        cls.mock_run = cls.run_patcher.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.run_patcher.stop()
+
+    def setUp(self):
+        self.mock_run.reset_mock(return_value=True, side_effect=True)
+
 
 class FormatterLinterHelpers:
     """Helper methods for mocking formatter and linter subprocesses."""
 
+    # Stateless mixin; TestCase subclasses still get a __dict__ from TestCase
+    __slots__ = ()
+
     def make_mock_black(self, stdout="Black formatted 2 files.", stderr=""):
-        """Create a MagicMock for black subprocess output."""
-        mock_black = MagicMock()
-        mock_black.stdout = stdout
-        mock_black.stderr = stderr
-        return mock_black
+        """Create a fake black subprocess result."""
+        return SimpleNamespace(stdout=stdout, stderr=stderr, returncode=0)
 
     def make_mock_pylint(self, stdout="Your code has been rated at 9.50/10", stderr=""):
-        """Create a MagicMock for pylint subprocess output."""
-        mock_pylint = MagicMock()
-        mock_pylint.stdout = stdout
-        mock_pylint.stderr = stderr
-        return mock_pylint
-
-
-@patch("src.dev_tools.agent.subprocess.run")
-class TestFormatterLinter(FormatterLinterHelpers, unittest.TestCase):
+        """Create a fake pylint subprocess result."""
+        return SimpleNamespace(stdout=stdout, stderr=stderr, returncode=0)
+
+    def make_pylint_message(self, message_type, message_id):
+        """Create one message as it appears in pylint's JSON report."""
+        return {
+            "type": message_type,
+            "path": "src/a.py",
+            "line": 1,
+            "column": 0,
+            "symbol": "unused-import",
+            "message": "Unused import os",
+            "message-id": message_id,
+        }
+
+
+class TestFormatterLinter(FormatterLinterHelpers, PatchedRunTestCase):
     """Unit tests for formatter/linter logic."""
 
-    def setUp(self):
-        """Set up a DevToolsAgent instance for testing."""
-        self.agent = DevToolsAgent()
+    @classmethod
+    def setUpClass(cls):
+        """Set up one DevToolsAgent for the class; it holds no per-call state."""
+        super().setUpClass()
+        cls.agent = DevToolsAgent()
 
     # --- Formatter/Linter Success Cases ---
-    def test_run_formatter_linter_success(self, mock_run):
+    def test_run_formatter_linter_success(self):
         """Test successful run of formatter/linter."""
         mock_black = self.make_mock_black()
         mock_pylint = self.make_mock_pylint()
-        mock_run.side_effect = [mock_black, mock_pylint]
+        self.mock_run.side_effect = run_by_tool(mock_black, mock_pylint)
         request = RunFormatterLinterRequest(path="src")
         response = self.agent.run_formatter_linter(request)
         self.assertTrue(response.success)
         self.assertIn("Black formatted", response.black_output)
         self.assertIn("rated at", response.pylint_output)
+        self.assertEqual(
+            [10, 10], [c.kwargs["timeout"] for c in self.mock_run.call_args_list]
+        )
 
-    def test_run_formatter_linter_custom_path(self, mock_run):
+    def test_run_formatter_linter_custom_path(self):
         """Test formatter/linter with a custom file path."""
         mock_black = self.make_mock_black(stdout="Black formatted custom_path.py.")
         mock_pylint = self.make_mock_pylint(
             stdout="Your code has been rated at 10.00/10"
         )
-        mock_run.side_effect = [mock_black, mock_pylint]
+        self.mock_run.side_effect = run_by_tool(mock_black, mock_pylint)
         request = RunFormatterLinterRequest(path="custom_path.py")
         response = self.agent.run_formatter_linter(request)
         self.assertTrue(response.success)
         self.assertIn("custom_path.py", response.black_output)
         self.assertIn("10.00/10", response.pylint_output)
 
-    def test_run_formatter_linter_output_trimming(self, mock_run):
+    def test_run_formatter_linter_output_trimming(self):
         """Test that formatter/linter output is trimmed of whitespace."""
         mock_black = self.make_mock_black(
             stdout="  Black formatted 2 files.  ", stderr="  "
@@ -75,36 +172,115 @@ class TestFormatterLinter(FormatterLinterHelpers, unittest.TestCase):
         mock_pylint = self.make_mock_pylint(
             stdout="  Your code has been rated at 9.50/10  ", stderr="  "
         )
-        mock_run.side_effect = [mock_black, mock_pylint]
+        self.mock_run.side_effect = run_by_tool(mock_black, mock_pylint)
         request = RunFormatterLinterRequest(path="src")
         response = self.agent.run_formatter_linter(request)
         self.assertEqual(response.black_output, "Black formatted 2 files.")
         self.assertEqual(response.pylint_output, "Your code has been rated at 9.50/10")
 
+    def test_run_formatter_linter_runs_pylint_after_black(self):
+        """pylint is only started once black has finished rewriting files."""
+        events = []
+
+        def run(cmd, **_kwargs):
+            name = tool_name(cmd)
+            events.append(f"{name} started")
+            # Leave time for a concurrently started tool to show up in between
+            time.sleep(0.05)
+            events.append(f"{name} finished")
+            if name == "black":
+                return self.make_mock_black()
+            return self.make_mock_pylint()
+
+        self.mock_run.side_effect = run
+        response = self.agent.run_formatter_linter(RunFormatterLinterRequest())
+        self.assertTrue(response.success)
+        self.assertEqual(
+            ["black started", "black finished", "pylint started", "pylint finished"],
+            events,
+        )
+
     # --- Formatter/Linter Error and Edge Cases ---
-    def test_run_formatter_linter_black_error(self, mock_run):
+    def test_run_formatter_linter_parses_pylint_json(self):
+        """pylint's JSON report becomes structured messages and readable output."""
+        mock_pylint = self.make_mock_pylint(
+            stdout=json.dumps([self.make_pylint_message("warning", "W0611")])
+        )
+        self.mock_run.side_effect = run_by_tool(self.make_mock_black(), mock_pylint)
+        response = self.agent.run_formatter_linter(
+            RunFormatterLinterRequest(path="src")
+        )
+        self.assertTrue(response.success)
+        self.assertEqual(1, len(response.pylint_messages))
+        self.assertEqual("W0611", response.pylint_messages[0].message_id)
+        self.assertEqual(
+            "src/a.py:1:0: W0611: Unused import os (unused-import)",
+            response.pylint_output,
+        )
+
+    def test_run_formatter_linter_ignores_pylint_stderr(self):
+        """Warnings on stderr do not stop pylint's JSON report on stdout from parsing."""
+        mock_pylint = self.make_mock_pylint(
+            stdout=json.dumps([self.make_pylint_message("warning", "W0611")]),
+            stderr="DeprecationWarning: a plugin option is deprecated\n",
+        )
+        self.mock_run.side_effect = run_by_tool(self.make_mock_black(), mock_pylint)
+        response = self.agent.run_formatter_linter(
+            RunFormatterLinterRequest(path="src")
+        )
+        self.assertEqual(["W0611"], [m.message_id for m in response.pylint_messages])
+        self.assertNotIn("DeprecationWarning", response.pylint_output)
+
+    def test_run_formatter_linter_sends_pylint_messages_once(self):
+        """The model gets pylint's messages as text only, not also as a list."""
+        mock_pylint = self.make_mock_pylint(
+            stdout=json.dumps([self.make_pylint_message("warning", "W0611")])
+        )
+        self.mock_run.side_effect = run_by_tool(self.make_mock_black(), mock_pylint)
+        response = self.agent.run_formatter_linter(
+            RunFormatterLinterRequest(path="src")
+        )
+        sent = json.loads(response.model_dump_json())
+        self.assertNotIn("pylint_messages", sent)
+        self.assertEqual(1, sent["pylint_output"].count("W0611"))
+
+    def test_run_formatter_linter_pylint_error_message_fails(self):
+        """A pylint message of type error fails the run."""
+        mock_pylint = self.make_mock_pylint(
+            stdout=json.dumps([self.make_pylint_message("error", "E0602")])
+        )
+        self.mock_run.side_effect = run_by_tool(self.make_mock_black(), mock_pylint)
+        response = self.agent.run_formatter_linter(
+            RunFormatterLinterRequest(path="src")
+        )
+        self.assertFalse(response.success)
+
+    def test_run_formatter_linter_black_error(self):
         """Test error handling when black fails."""
-        mock_run.side_effect = [Exception("black not found"), self.make_mock_pylint()]
+        self.mock_run.side_effect = run_by_tool(
+            Exception("black not found"), self.make_mock_pylint()
+        )
         request = RunFormatterLinterRequest(path="src")
         response = self.agent.run_formatter_linter(request)
         self.assertFalse(response.success)
         self.assertIn("Error running black", response.black_output)
 
-    def test_run_formatter_linter_pylint_error(self, mock_run):
+    def test_run_formatter_linter_pylint_error(self):
         """Test error handling when pylint fails."""
         mock_black = self.make_mock_black()
-        mock_run.side_effect = [mock_black, Exception("pylint not found")]
+        self.mock_run.side_effect = run_by_tool(
+            mock_black, Exception("pylint not found")
+        )
         request = RunFormatterLinterRequest(path="src")
         response = self.agent.run_formatter_linter(request)
         self.assertFalse(response.success)
         self.assertIn("Error running pylint", response.pylint_output)
 
-    def test_run_formatter_linter_both_fail(self, mock_run):
+    def test_run_formatter_linter_both_fail(self):
         """Test both black and pylint failing."""
-        mock_run.side_effect = [
-            Exception("black not found"),
-            Exception("pylint not found"),
-        ]
+        self.mock_run.side_effect = run_by_tool(
+            Exception("black not found"), Exception("pylint not found")
+        )
         request = RunFormatterLinterRequest(path="src")
         response = self.agent.run_formatter_linter(request)
         self.assertFalse(response.success)
@@ -112,120 +288,160 @@ class TestFormatterLinter(FormatterLinterHelpers, unittest.TestCase):
         self.assertIn("Error running pylint", response.pylint_output)
 
     @patch("logging.exception")
-    def test_run_formatter_linter_logs_errors(self, mock_log, mock_run):
+    def test_run_formatter_linter_logs_errors(self, mock_log):
         """Test that errors are logged when formatter/linter fails."""
-        mock_run.side_effect = [
-            Exception("black not found"),
-            Exception("pylint not found"),
-        ]
+        self.mock_run.side_effect = run_by_tool(
+            Exception("black not found"), Exception("pylint not found")
+        )
         request = RunFormatterLinterRequest(path="src")
         self.agent.run_formatter_linter(request)
         self.assertEqual(mock_log.call_count, 2)
-        mock_log.assert_any_call("Error running black")
-        mock_log.assert_any_call("Error running pylint")
+        mock_log.assert_any_call("Error running %s", "black")
+        mock_log.assert_any_call("Error running %s", "pylint")
 
 
-@patch("src.dev_tools.agent.subprocess.run")
-class TestUnitTests(unittest.TestCase):
+class TestUnitTests(PatchedRunTestCase):
     """Unit tests for run_unit_tests logic."""
 
-    def setUp(self):
-        """Set up a DevToolsAgent instance for testing."""
-        self.agent = DevToolsAgent()
+    @classmethod
+    def setUpClass(cls):
+        """Set up one DevToolsAgent for the class; it holds no per-call state."""
+        super().setUpClass()
+        cls.agent = DevToolsAgent()
 
-    def test_run_unit_tests_success(self, mock_run):
+    def test_run_unit_tests_success(self):
         """Test successful run of unit tests."""
-        mock_proc = MagicMock()
-        mock_proc.stdout = (
-            "...\n"  # noqa: E501
-            "----------------------------------------------------------------------\n"
-            "Ran 2 tests in 0.123s\n\nOK\n"
-        )
-        mock_proc.stderr = ""
-        mock_proc.returncode = 0
-        mock_run.return_value = mock_proc
+        self.mock_run.return_value = UNITTEST_OK
         request = RunUnitTestsRequest(test_path=None)
         response = self.agent.run_unit_tests(request)
         self.assertTrue(response.success)
         self.assertIn("2 tests in", response.summary)
         self.assertEqual([], response.failed_tests)
 
-    def test_run_unit_tests_failure(self, mock_run):
+    def test_run_unit_tests_failure(self):
         """Test failed run of unit tests."""
-        mock_proc = MagicMock()
-        mock_proc.stdout = (
-            "FAIL: test_foo (test_module.TestClass)\n"  # noqa: E501
-            "----------------------------------------------------------------------\n"
-            "Ran 2 tests in 0.123s\n\nFAILED (failures=1)\n"
-        )
-        mock_proc.stderr = ""
-        mock_proc.returncode = 1
-        mock_run.return_value = mock_proc
+        self.mock_run.return_value = UNITTEST_FAILED
         request = RunUnitTestsRequest(test_path=None)
         response = self.agent.run_unit_tests(request)
         self.assertFalse(response.success)
         self.assertIn("2 tests in", response.summary)
         self.assertIn("FAIL:", " ".join(response.failed_tests))
 
-    def test_run_unit_tests_timeout(self, mock_run):
+    def test_run_unit_tests_parses_summary_and_errors(self):
+        """The "Ran" line becomes the summary and FAIL/ERROR headers are collected."""
+        mock_proc = SimpleNamespace(
+            stdout="",
+            stderr=(
+                "EF\n"
+                "ERROR: test_bar (test_module.TestClass)\n"
+                "FAIL: test_foo (test_module.TestClass)\n"
+                "----------------------------------------------------------------------\n"
+                "Ran 1 test in 0.010s\n\nFAILED (failures=1, errors=1)\n"
+            ),
+            returncode=1,
+        )
+        self.mock_run.return_value = mock_proc
+        response = self.agent.run_unit_tests(RunUnitTestsRequest(test_path=None))
+        self.assertEqual("1 test in 0.010s", response.summary)
+        self.assertEqual(
+            [
+                "ERROR: test_bar (test_module.TestClass)",
+                "FAIL: test_foo (test_module.TestClass)",
+            ],
+            response.failed_tests,
+        )
+
+    def test_run_unit_tests_uses_agent_interpreter(self):
+        """Tests run with the agent's interpreter and without writing bytecode."""
+        self.mock_run.return_value = SimpleNamespace(
+            stdout="", stderr="Ran 0 tests in 0.000s", returncode=0
+        )
+        self.agent.run_unit_tests(RunUnitTestsRequest(test_path="tests"))
+        cmd = self.mock_run.call_args[0][0]
+        self.assertEqual(sys.executable, cmd[0])
+        self.assertEqual(30, self.mock_run.call_args.kwargs["timeout"])
+        self.assertEqual(
+            "1", self.mock_run.call_args[1]["env"]["PYTHONDONTWRITEBYTECODE"]
+        )
+
+    def test_run_unit_tests_timeout(self):
         """Test timeout when running unit tests."""
-        mock_run.side_effect = subprocess.TimeoutExpired(cmd="unittest", timeout=30)
+        self.mock_run.side_effect = subprocess.TimeoutExpired(
+            cmd="unittest", timeout=30
+        )
         request = RunUnitTestsRequest(test_path=None)
         response = self.agent.run_unit_tests(request)
         self.assertFalse(response.success)
         self.assertIn("timed out", response.summary)
 
-    def test_run_unit_tests_exception(self, mock_run):
+    def test_run_unit_tests_exception(self):
         """Test exception when running unit tests."""
-        mock_run.side_effect = Exception("unittest crashed")
+        self.mock_run.side_effect = Exception("unittest crashed")
         request = RunUnitTestsRequest(test_path=None)
         response = self.agent.run_unit_tests(request)
         self.assertFalse(response.success)
         self.assertIn("Error running unit tests", response.summary)
 
 
-@patch("src.dev_tools.agent.subprocess.run")
-class TestGitStatus(unittest.TestCase):
+class TestGitStatus(PatchedRunTestCase):
     """Unit tests for check_git_status logic."""
 
-    def setUp(self):
-        """Set up a DevToolsAgent instance for testing."""
-        self.agent = DevToolsAgent()
+    @classmethod
+    def setUpClass(cls):
+        """Set up one DevToolsAgent for the class; it holds no per-call state."""
+        super().setUpClass()
+        cls.agent = DevToolsAgent()
 
-    def test_git_status_clean(self, mock_run):
+    def test_git_status_clean(self):
         """Test git status with no uncommitted files."""
-        mock_proc = MagicMock()
-        mock_proc.stdout = ""
-        mock_proc.returncode = 0
-        mock_run.return_value = mock_proc
+        mock_proc = SimpleNamespace(stdout="", stderr="", returncode=0)
+        self.mock_run.return_value = mock_proc
         request = CheckGitStatusRequest()
         response = self.agent.check_git_status(request)
         self.assertFalse(response.has_uncommitted)
         self.assertEqual([], response.uncommitted_files)
+        self.assertEqual(10, self.mock_run.call_args.kwargs["timeout"])
 
-    def test_git_status_dirty(self, mock_run):
+    def test_git_status_dirty(self):
         """Test git status with uncommitted files."""
-        mock_proc = MagicMock()
-        mock_proc.stdout = " M src/main.py\n?? new_file.py\n"
-        mock_proc.returncode = 0
-        mock_run.return_value = mock_proc
+        mock_proc = SimpleNamespace(
+            stdout=" M src/main.py\0?? new_file.py\0", stderr="", returncode=0
+        )
+        self.mock_run.return_value = mock_proc
         request = CheckGitStatusRequest()
         response = self.agent.check_git_status(request)
         self.assertTrue(response.has_uncommitted)
         self.assertIn("src/main.py", response.uncommitted_files)
         self.assertIn("new_file.py", response.uncommitted_files)
 
-    def test_git_status_timeout(self, mock_run):
+    def test_git_status_spaces_and_renames(self):
+        """Paths keep their spaces and renames report the new path only."""
+        mock_proc = SimpleNamespace(
+            stdout=" M my notes.txt\0R  new name.py\0old name.py\0?? b.py\0",
+            stderr="",
+            returncode=0,
+        )
+        self.mock_run.return_value = mock_proc
+        response = self.agent.check_git_status(CheckGitStatusRequest())
+        self.assertEqual(
+            ["my notes.txt", "new name.py", "b.py"], response.uncommitted_files
+        )
+        self.assertEqual(
+            [self.agent.tool_paths["git"], "-C", ".", "status", "--porcelain=v1", "-z"],
+            self.mock_run.call_args[0][0],
+        )
+
+    def test_git_status_timeout(self):
         """Test timeout when running git status."""
-        mock_run.side_effect = subprocess.TimeoutExpired(cmd="git", timeout=10)
+        self.mock_run.side_effect = subprocess.TimeoutExpired(cmd="git", timeout=10)
         request = CheckGitStatusRequest()
         response = self.agent.check_git_status(request)
         self.assertFalse(response.has_uncommitted)
         self.assertEqual([], response.uncommitted_files)
 
-    def test_git_status_exception(self, mock_run):
+    def test_git_status_exception(self):
         """Test exception when running git status."""
-        mock_run.side_effect = Exception("git crashed")
+        self.mock_run.side_effect = Exception("git crashed")
         request = CheckGitStatusRequest()
         response = self.agent.check_git_status(request)
         self.assertFalse(response.has_uncommitted)
@@ -235,27 +451,19 @@ class TestGitStatus(unittest.TestCase):
 class TestAgentDispatch(FormatterLinterHelpers, unittest.TestCase):
     """Unit tests for agent function dispatch logic."""
 
-    def setUp(self):
-        """Set up a DevToolsAgent instance for testing."""
-        self.agent = DevToolsAgent()
+    @classmethod
+    def setUpClass(cls):
+        """Set up one DevToolsAgent for the class; it holds no per-call state."""
+        cls.agent = DevToolsAgent()
 
     @patch("src.dev_tools.agent.subprocess.run")
     def test_call_function_dispatches(self, mock_run):
         """Test that call_function dispatches to the correct agent method."""
         mock_black = self.make_mock_black()
         mock_pylint = self.make_mock_pylint()
-        mock_unittest = MagicMock()
-        mock_unittest.stdout = (
-            "...\n"
-            "----------------------------------------------------------------------\n"
-            "Ran 2 tests in 0.123s\n\nOK\n"
-        )
-        mock_unittest.stderr = ""
-        mock_unittest.returncode = 0
-        mock_git = MagicMock()
-        mock_git.stdout = " M src/main.py\n"
-        mock_git.returncode = 0
-        mock_run.side_effect = [mock_black, mock_pylint, mock_unittest, mock_git]
+        mock_run.side_effect = run_by_tool(
+            mock_black, mock_pylint, UNITTEST_OK, GIT_MODIFIED
+        )
         resp1 = self.agent.call_function("run_formatter_linter", {"path": None})
         self.assertTrue(resp1.success)
         resp2 = self.agent.call_function("run_unit_tests", {"test_path": None})
@@ -265,140 +473,342 @@ class TestAgentDispatch(FormatterLinterHelpers, unittest.TestCase):
         with self.assertRaises(ValueError):
             self.agent.call_function("not_a_function", {})
 
+    @patch("src.dev_tools.agent.subprocess.run")
+    def test_run_tool_calls_logs_readable_json_for_debugging(self, mock_run):
+        """With debug logging on, the indented result is logged, not sent."""
+        mock_run.return_value = GIT_MODIFIED
+        with self.assertLogs(level="DEBUG") as logs:
+            results = self.agent.run_tool_calls(
+                [make_tool_call("call_1", "check_git_status", "{}")]
+            )
+        self.assertIn('\n  "uncommitted_files": [', logs.output[0])
+        self.assertNotIn("\n", results[0])
+
+    @patch("src.dev_tools.agent.subprocess.run")
+    def test_run_tool_calls_serializes_formatter_and_tests(self, mock_run):
+        """Formatter and unit test calls run one at a time, in order, on the caller's thread."""
+        mock_run.return_value = GIT_MODIFIED
+        agent = DevToolsAgent()
+        events = []
+        threads = set()
+
+        def tracked(name):
+            def tool(_request):
+                threads.add(threading.current_thread())
+                events.append(f"{name} started")
+                # Leave time for a concurrently started call to show up in between
+                time.sleep(0.02)
+                events.append(f"{name} finished")
+                return name
+
+            return tool
+
+        with patch.object(
+            agent, "run_formatter_linter", tracked("format")
+        ), patch.object(agent, "run_unit_tests", tracked("tests")):
+            results = agent.run_tool_calls(
+                [
+                    make_tool_call("call_1", "run_formatter_linter", "{}"),
+                    make_tool_call("call_2", "check_git_status", "{}"),
+                    make_tool_call("call_3", "run_unit_tests", "{}"),
+                    make_tool_call("call_4", "run_formatter_linter", "{}"),
+                ]
+            )
+        self.assertEqual(
+            [
+                f"{name} {event}"
+                for name in ("format", "tests", "format")
+                for event in ("started", "finished")
+            ],
+            events,
+        )
+        self.assertEqual({threading.current_thread()}, threads)
+        self.assertEqual("format", results[0])
+        self.assertIn("src/main.py", results[1])
+        self.assertEqual(["tests", "format"], results[2:])
+
+    @patch("src.dev_tools.agent.subprocess.run")
+    def test_run_tool_calls_returns_compact_json(self, mock_run):
+        """Tool results are sent to the model as compact JSON."""
+        mock_run.return_value = GIT_MODIFIED
+        results = self.agent.run_tool_calls(
+            [make_tool_call("call_1", "check_git_status", "{}")]
+        )
+        self.assertEqual(
+            '{"uncommitted_files":["src/main.py"],"has_uncommitted":true}', results[0]
+        )
+
 
+def make_tool_call(call_id, name, arguments):
+    """Create a tool call in assistant message format."""
+    return {
+        "id": call_id,
+        "type": "function",
+        "function": {"name": name, "arguments": arguments},
+    }
+
+
+def make_chunk(content=None, tool_calls=None, finish_reason=None):
+    """Create a mock streamed chat completion chunk with a single choice."""
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(
+        choices=[SimpleNamespace(delta=delta, finish_reason=finish_reason)]
+    )
+
+
+def make_tool_call_fragment(index, call_id=None, name=None, arguments=None):
+    """Create a mock streamed tool call fragment."""
+    return SimpleNamespace(
+        index=index,
+        id=call_id,
+        function=SimpleNamespace(name=name, arguments=arguments),
+    )
+
+
+def make_response(tool_calls=None, content=None, finish_reason=None):
+    """
+    Create the chunks of a mock streamed chat completion.
+    Content and tool call arguments are split across chunks, as the API streams them.
+    """
+    chunks = []
+    if content:
+        middle = len(content) // 2
+        chunks += [make_chunk(content=content[:middle]), make_chunk(content[middle:])]
+    for index, tool_call in enumerate(tool_calls or []):
+        function = tool_call["function"]
+        middle = len(function["arguments"]) // 2
+        first = make_tool_call_fragment(
+            index, tool_call["id"], function["name"], function["arguments"][:middle]
+        )
+        rest = make_tool_call_fragment(index, arguments=function["arguments"][middle:])
+        chunks += [make_chunk(tool_calls=[first]), make_chunk(tool_calls=[rest])]
+    if tool_calls and not finish_reason:
+        finish_reason = "tool_calls"
+    chunks.append(make_chunk(finish_reason=finish_reason))
+    return chunks
+
+
+class TestFunctionSchemas(unittest.TestCase):
+    """Tests for the OpenAI function schemas."""
+
+    @patch.object(RunFormatterLinterRequest, "model_json_schema")
+    def test_schemas_are_not_regenerated(self, mock_schema):
+        """Schemas are built at import, not on every call."""
+        schemas = get_openai_function_schemas()
+        mock_schema.assert_not_called()
+        self.assertEqual(
+            ["run_formatter_linter", "run_unit_tests", "check_git_status"],
+            [schema["name"] for schema in schemas],
+        )
+
+
+@pytest.mark.integration
+@pytest.mark.timeout(10)
+@pytest.mark.xdist_group("openai_global_patch")
 class TestChatLoopIntegration(unittest.TestCase):
     """Integration-style tests for the chat loop (OpenAI mocked)."""
 
-    @patch("openai.chat.completions.create")
-    @patch("src.dev_tools.agent.subprocess.run")
-    def test_chat_loop_formatter_linter(self, mock_subprocess_run, mock_openai_create):
+    @classmethod
+    def setUpClass(cls):
+        """Fetch the function schemas once; the chat loop only reads them."""
+        cls.function_schemas = get_openai_function_schemas()
+
+    def setUp(self):
+        patcher = patch("src.dev_tools.agent.get_openai_client")
+        self.mock_get_client = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_openai_create = (
+            self.mock_get_client.return_value.chat.completions.create
+        )
+        self.run = self.patch_run(run_by_tool(BLACK_OK, PYLINT_OK))
+
+    def patch_run(self, run):
+        """Replace subprocess.run in the agent with a plain function for this test."""
+        patcher = patch("src.dev_tools.agent.subprocess.run", run)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return run
+
+    @staticmethod
+    def feed_input(*lines):
+        """Replace stdin with the given lines, so the loop's real input() reads them."""
+        return patch("sys.stdin", io.StringIO("".join(f"{line}\n" for line in lines)))
+
+    def test_chat_loop_formatter_linter(self):
         """Test chat loop with formatter/linter function call."""
-        # Mock OpenAI: first call returns a function_call, second returns assistant message
-        function_call_message = MagicMock()
-        function_call_message.function_call = MagicMock()
-        function_call_message.function_call.name = "run_formatter_linter"
-        function_call_message.function_call.arguments = '{"path": "src"}'
-        function_call_message.content = None
-        function_call_message.role = "assistant"
-        function_call_message.model_dump = lambda: {}
-        assistant_message = MagicMock()
-        assistant_message.function_call = None
-        assistant_message.content = "Formatting complete!"
-        assistant_message.role = "assistant"
-        assistant_message.model_dump = lambda: {}
-        mock_openai_create.side_effect = [
-            MagicMock(
-                choices=[MagicMock(message=function_call_message, finish_reason=None)]
-            ),
-            MagicMock(
-                choices=[MagicMock(message=assistant_message, finish_reason="stop")]
+        # Mock OpenAI: first call returns a tool call, second returns assistant message
+        self.mock_openai_create.side_effect = [
+            make_response(
+                [make_tool_call("call_1", "run_formatter_linter", '{"path": "src"}')]
             ),
+            make_response(content="Formatting complete!", finish_reason="stop"),
         ]
-        # Mock subprocess for black and pylint
-        mock_black = MagicMock(
-            stdout="Black formatted 2 files.", stderr="", returncode=0
-        )
-        mock_pylint = MagicMock(
-            stdout="Your code has been rated at 9.50/10", stderr="", returncode=0
-        )
-        mock_subprocess_run.side_effect = [mock_black, mock_pylint]
-        # Patch input to simulate user and exit after one loop
-        with patch.object(builtins, "input", side_effect=["Format my code", "exit"]):
-            function_schemas = get_openai_function_schemas()
+        # Feed input to simulate user and exit after one loop
+        with self.feed_input("Format my code", "exit"):
             agent = DevToolsAgent()
-            agent.run_openai_chat_loop(function_schemas, model="gpt-4o")
-        # Assert OpenAI was called twice (function call, then assistant)
-        self.assertEqual(mock_openai_create.call_count, 2)
+            agent.run_openai_chat_loop(self.function_schemas, model="gpt-4o")
+        # Assert OpenAI was called twice (tool call, then assistant)
+        self.assertEqual(self.mock_openai_create.call_count, 2)
         # Assert subprocess was called for black and pylint
-        self.assertEqual(mock_subprocess_run.call_count, 2)
-
-    @patch("openai.chat.completions.create")
-    @patch("src.dev_tools.agent.subprocess.run")
-    def test_chat_loop_multiple_function_calls(
-        self, mock_subprocess_run, mock_openai_create
-    ):
+        self.assertEqual(2, len(self.run.calls))
+        # The tool result is sent back with the id of the call it answers
+        messages = self.mock_openai_create.call_args[1]["messages"]
+        self.assertEqual("call_1", messages[-2]["tool_calls"][0]["id"])
+        self.assertEqual("tool", messages[-1]["role"])
+        self.assertEqual("call_1", messages[-1]["tool_call_id"])
+        self.assertIn("rated at 9.50/10", messages[-1]["content"])
+        tools = self.mock_openai_create.call_args[1]["tools"]
+        self.assertEqual("function", tools[0]["type"])
+
+    def test_chat_loop_multiple_function_calls(self):
         """Test chat loop with multiple function calls before assistant message."""
-        # Simulate two function calls before assistant message
-        func_call1 = MagicMock()
-        func_call1.function_call = MagicMock()
-        func_call1.function_call.name = "run_formatter_linter"
-        func_call1.function_call.arguments = '{"path": "src"}'
-        func_call1.content = None
-        func_call1.role = "assistant"
-        func_call1.model_dump = lambda: {}
-        func_call2 = MagicMock()
-        func_call2.function_call = MagicMock()
-        func_call2.function_call.name = "check_git_status"
-        func_call2.function_call.arguments = "{}"
-        func_call2.content = None
-        func_call2.role = "assistant"
-        func_call2.model_dump = lambda: {}
-        assistant_message = MagicMock()
-        assistant_message.function_call = None
-        assistant_message.content = "All done!"
-        assistant_message.role = "assistant"
-        assistant_message.model_dump = lambda: {}
-        mock_openai_create.side_effect = [
-            MagicMock(choices=[MagicMock(message=func_call1, finish_reason=None)]),
-            MagicMock(choices=[MagicMock(message=func_call2, finish_reason=None)]),
-            MagicMock(
-                choices=[MagicMock(message=assistant_message, finish_reason="stop")]
+        # Simulate two sequential tool calls before assistant message
+        self.mock_openai_create.side_effect = [
+            make_response(
+                [make_tool_call("call_1", "run_formatter_linter", '{"path": "src"}')]
             ),
+            make_response([make_tool_call("call_2", "check_git_status", "{}")]),
+            make_response(content="All done!", finish_reason="stop"),
+        ]
+        # Fake subprocess results for black, pylint, git
+        self.run = self.patch_run(run_by_tool(BLACK_OK, PYLINT_OK, GIT_MODIFIED))
+        with self.feed_input("Format and check git", "exit"):
+            agent = DevToolsAgent()
+            agent.run_openai_chat_loop(self.function_schemas, model="gpt-4o")
+        self.assertEqual(self.mock_openai_create.call_count, 3)
+        self.assertEqual(3, len(self.run.calls))
+
+    def test_chat_loop_parallel_tool_calls(self):
+        """Several tool calls in one response all run and each gets its own result."""
+        self.mock_openai_create.side_effect = [
+            make_response(
+                [
+                    make_tool_call("call_1", "run_formatter_linter", '{"path": "src"}'),
+                    make_tool_call("call_2", "check_git_status", "{}"),
+                ]
+            ),
+            make_response(content="All done!", finish_reason="stop"),
+        ]
+        lint_ok = SimpleNamespace(stdout="ok", stderr="", returncode=0)
+        answer = run_by_tool(lint_ok, lint_ok, GIT_MODIFIED)
+        # git status runs while black is running (pylint waits for black);
+        # raises BrokenBarrierError if the tool calls run one after another
+        started = threading.Barrier(2, timeout=5)
+
+        def run(cmd, **kwargs):
+            if tool_name(cmd) != "pylint":
+                started.wait()
+            return answer(cmd, **kwargs)
+
+        self.patch_run(run)
+        self.run = answer
+        with self.feed_input("Format and check git"):
+            agent = DevToolsAgent()
+            agent.run_openai_chat_loop(self.function_schemas, model="gpt-4o")
+        self.assertEqual(self.mock_openai_create.call_count, 2)
+        self.assertEqual(3, len(self.run.calls))
+        messages = self.mock_openai_create.call_args[1]["messages"]
+        self.assertEqual(
+            ["call_1", "call_2"], [m["tool_call_id"] for m in messages[-2:]]
+        )
+        self.assertIn("src/main.py", messages[-1]["content"])
+
+    def test_chat_loop_unknown_tool_reports_error(self):
+        """An unknown tool name is reported back to the model instead of raising."""
+        self.mock_openai_create.side_effect = [
+            make_response([make_tool_call("call_1", "not_a_function", "{}")]),
+            make_response(content="Sorry!", finish_reason="stop"),
         ]
-        # Mock subprocess for black, pylint, git
-        mock_black = MagicMock(
-            stdout="Black formatted 2 files.", stderr="", returncode=0
+        with self.feed_input("Do something"):
+            with patch("logging.exception"):
+                agent = DevToolsAgent()
+                agent.run_openai_chat_loop(self.function_schemas)
+        messages = self.mock_openai_create.call_args[1]["messages"]
+        self.assertEqual(
+            "Error: Unknown function: not_a_function", messages[-1]["content"]
         )
-        mock_pylint = MagicMock(
-            stdout="Your code has been rated at 9.50/10", stderr="", returncode=0
+
+    @patch("src.dev_tools.agent.time.sleep")
+    def test_chat_loop_retries_transient_errors(self, mock_sleep):
+        """A rate limit error is retried with backoff before giving up."""
+        rate_limited = openai.RateLimitError(
+            "rate limited", response=MagicMock(status_code=429), body=None
         )
-        mock_git = MagicMock(stdout=" M src/main.py\n", stderr="", returncode=0)
-        mock_subprocess_run.side_effect = [mock_black, mock_pylint, mock_git]
-        with patch.object(
-            builtins, "input", side_effect=["Format and check git", "exit"]
-        ):
-            function_schemas = get_openai_function_schemas()
+        self.mock_openai_create.side_effect = [
+            rate_limited,
+            make_response(content="Hello!", finish_reason="stop"),
+        ]
+        with self.feed_input("Hi"):
+            with patch("logging.warning"):
+                agent = DevToolsAgent()
+                agent.run_openai_chat_loop(self.function_schemas)
+        self.assertEqual(2, self.mock_openai_create.call_count)
+        mock_sleep.assert_called_once()
+
+    def test_chat_loop_streams_reply(self):
+        """Reply text is printed chunk by chunk and stored joined in the history."""
+        self.mock_openai_create.side_effect = [
+            make_response(content="Hello there!"),
+            make_response(content="Bye!", finish_reason="stop"),
+        ]
+        with self.feed_input("Hi", "Bye"):
+            with patch.object(builtins, "print") as mock_print:
+                agent = DevToolsAgent()
+                agent.run_openai_chat_loop(self.function_schemas)
+        self.assertTrue(self.mock_openai_create.call_args[1]["stream"])
+        mock_print.assert_any_call("Hello ", end="", flush=True)
+        mock_print.assert_any_call("there!", end="", flush=True)
+        messages = self.mock_openai_create.call_args[1]["messages"]
+        self.assertEqual({"role": "assistant", "content": "Hello there!"}, messages[-2])
+
+    def test_chat_loop_summarizes_old_turns(self):
+        """Turns beyond the history window are summarized instead of resent."""
+        summary = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="Said hi."))]
+        )
+        self.mock_openai_create.side_effect = [
+            make_response(content="Hello!"),
+            summary,
+            make_response(content="Done.", finish_reason="stop"),
+        ]
+        with self.feed_input("Hi", "Lint it"):
             agent = DevToolsAgent()
-            agent.run_openai_chat_loop(function_schemas, model="gpt-4o")
-        self.assertEqual(mock_openai_create.call_count, 3)
-        self.assertEqual(mock_subprocess_run.call_count, 3)
+            agent.run_openai_chat_loop(self.function_schemas, max_history_turns=1)
+        summary_call = self.mock_openai_create.call_args_list[1][1]
+        self.assertEqual(SUMMARY_MODEL, summary_call["model"])
+        self.assertIn(
+            "user: Hi\nassistant: Hello!", summary_call["messages"][1]["content"]
+        )
+        messages = self.mock_openai_create.call_args[1]["messages"]
+        self.assertEqual(
+            [
+                "system",
+                "Summary of the earlier conversation: Said hi.",
+                "Lint it",
+            ],
+            [messages[0]["role"], messages[1]["content"], messages[2]["content"]],
+        )
+        self.assertEqual(3, len(messages))
 
-    @patch("openai.chat.completions.create")
-    @patch("src.dev_tools.agent.subprocess.run")
-    def test_chat_loop_exit_immediately(self, mock_subprocess_run, mock_openai_create):
+    def test_chat_loop_exit_immediately(self):
         """Test chat loop exits immediately when user types 'exit'."""
-        with patch.object(builtins, "input", side_effect=["exit"]):
-            function_schemas = get_openai_function_schemas()
+        with self.feed_input("exit"):
             agent = DevToolsAgent()
-            agent.run_openai_chat_loop(function_schemas, model="gpt-4o")
-        self.assertEqual(mock_openai_create.call_count, 0)
-        self.assertEqual(mock_subprocess_run.call_count, 0)
+            agent.run_openai_chat_loop(self.function_schemas, model="gpt-4o")
+        self.assertEqual(self.mock_openai_create.call_count, 0)
+        self.assertEqual(0, len(self.run.calls))
 
-    @patch("openai.chat.completions.create")
-    @patch("src.dev_tools.agent.subprocess.run")
-    def test_chat_loop_non_function_assistant_message(
-        self, mock_subprocess_run, mock_openai_create
-    ):
+    def test_chat_loop_non_function_assistant_message(self):
         """Test chat loop returns assistant message without function call."""
-        # Model returns an assistant message (no function_call) immediately
-        assistant_message = MagicMock()
-        assistant_message.function_call = None
-        assistant_message.content = "I don't understand."
-        assistant_message.role = "assistant"
-        assistant_message.model_dump = lambda: {}
-        mock_openai_create.side_effect = [
-            MagicMock(
-                choices=[MagicMock(message=assistant_message, finish_reason="stop")]
-            ),
+        # Model returns an assistant message (no tool calls) immediately
+        self.mock_openai_create.side_effect = [
+            make_response(content="I don't understand.", finish_reason="stop"),
         ]
-        with patch.object(
-            builtins, "input", side_effect=["What is the meaning of life?", "exit"]
-        ):
-            function_schemas = get_openai_function_schemas()
+        with self.feed_input("What is the meaning of life?", "exit"):
             agent = DevToolsAgent()
-            agent.run_openai_chat_loop(function_schemas, model="gpt-4o")
-        self.assertEqual(mock_openai_create.call_count, 1)
-        self.assertEqual(mock_subprocess_run.call_count, 0)
+            agent.run_openai_chat_loop(self.function_schemas, model="gpt-4o")
+        self.assertEqual(self.mock_openai_create.call_count, 1)
+        self.assertEqual(0, len(self.run.calls))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,85 @@
+"""
+Unit tests for the bounded chat loop history.
+"""
+
+import unittest
+from unittest.mock import MagicMock
+
+from src.dev_tools.chat_history import ChatHistory, format_transcript
+
+
+class TestChatHistory(unittest.TestCase):
+    """Tests for ChatHistory windowing and summarization."""
+
+    def setUp(self):
+        self.summarize = MagicMock(side_effect=lambda summary, turn: f"S{len(turn)}")
+        self.history = ChatHistory("Be helpful.", self.summarize, max_turns=2)
+
+    def test_recent_turns_are_sent_in_full(self):
+        """Turns within the window are sent after the system prompt."""
+        self.history.start_turn("one")
+        self.history.append({"role": "assistant", "content": "1"})
+        self.history.start_turn("two")
+        self.assertEqual(
+            [
+                {"role": "system", "content": "Be helpful."},
+                {"role": "user", "content": "one"},
+                {"role": "assistant", "content": "1"},
+                {"role": "user", "content": "two"},
+            ],
+            self.history.messages(),
+        )
+        self.summarize.assert_not_called()
+
+    def test_oldest_turn_is_summarized_as_a_whole(self):
+        """The evicted turn, with its tool messages, is folded into the summary."""
+        self.history.start_turn("one")
+        self.history.append({"role": "tool", "tool_call_id": "c1", "content": "ok"})
+        self.history.start_turn("two")
+        self.history.start_turn("three")
+        self.summarize.assert_called_once_with(
+            None,
+            [
+                {"role": "user", "content": "one"},
+                {"role": "tool", "tool_call_id": "c1", "content": "ok"},
+            ],
+        )
+        messages = self.history.messages()
+        self.assertEqual(
+            "Summary of the earlier conversation: S2", messages[1]["content"]
+        )
+        self.assertEqual(["two", "three"], [m["content"] for m in messages[2:]])
+
+    def test_max_turns_below_one_is_rejected(self):
+        """A window without room for the current turn is rejected up front."""
+        for max_turns in (0, -1):
+            with self.subTest(max_turns=max_turns):
+                with self.assertRaises(ValueError):
+                    ChatHistory("Be helpful.", self.summarize, max_turns=max_turns)
+
+    def test_single_turn_window(self):
+        """With max_turns=1, each new turn summarizes the previous one."""
+        history = ChatHistory("Be helpful.", self.summarize, max_turns=1)
+        history.start_turn("one")
+        history.start_turn("two")
+        self.summarize.assert_called_once_with(
+            None, [{"role": "user", "content": "one"}]
+        )
+        self.assertEqual(["two"], [m["content"] for m in history.messages()[2:]])
+
+    def test_format_transcript_names_tool_calls(self):
+        """Tool calls without text are rendered by function name."""
+        tool_call = {"id": "c1", "function": {"name": "check_git_status"}}
+        self.assertEqual(
+            "user: hi\nassistant: called check_git_status",
+            format_transcript(
+                [
+                    {"role": "user", "content": "hi"},
+                    {"role": "assistant", "content": None, "tool_calls": [tool_call]},
+                ]
+            ),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,243 @@
+"""
+Unit tests for running black and pylint in process.
+"""
+
+import json
+import os
+import sys
+import multiprocessing
+import tempfile
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+
+from src.dev_tools.agent import DevToolsAgent
+from src.dev_tools.in_process import run_black, run_in_process, run_pylint
+from src.dev_tools.schema import RunFormatterLinterRequest, RunUnitTestsRequest
+
+
+class TestRunInProcess(unittest.TestCase):
+    """Tests for run_in_process error handling."""
+
+    def test_returns_runner_output(self):
+        """The runner's output is returned with its arguments passed through."""
+        with patch.dict("src.dev_tools.in_process.RUNNERS", {"black": " ".join}):
+            self.assertEqual("--check src", run_in_process("black", ["--check", "src"]))
+
+    @patch("logging.error")
+    def test_timeout_returns_error(self, _mock_log):
+        """A run that exceeds the timeout is killed and returns an error message."""
+        stdout = sys.stdout
+        with patch.dict(
+            "src.dev_tools.in_process.RUNNERS",
+            {"pylint": lambda args: time.sleep(60), "black": " ".join},
+        ):
+            output = run_in_process("pylint", ["src"], timeout=0.05)
+            self.assertEqual([], multiprocessing.active_children())
+            # Later runs and the agent's own output are unaffected
+            self.assertEqual("src", run_in_process("black", ["src"], timeout=5))
+        self.assertEqual("Error: pylint timed out after 0.05 seconds.", output)
+        self.assertIs(stdout, sys.stdout)
+
+    @patch("logging.exception")
+    def test_child_exit_returns_error(self, _mock_log):
+        """A run whose process exits without reporting returns an error message."""
+        with patch.dict(
+            "src.dev_tools.in_process.RUNNERS", {"unittest": lambda args: os._exit(3)}
+        ):
+            self.assertEqual(
+                "Error running unittest: unittest exited with code 3",
+                run_in_process("unittest", ["discover"]),
+            )
+
+    @patch("logging.exception")
+    def test_exception_returns_error(self, _mock_log):
+        """An exception raised by the tool is returned as an error message."""
+
+        def fail(_args):
+            raise RuntimeError("crashed")
+
+        with patch.dict("src.dev_tools.in_process.RUNNERS", {"black": fail}):
+            self.assertEqual(
+                "Error running black: crashed", run_in_process("black", ["src"])
+            )
+
+    def test_run_black_captures_output(self):
+        """black runs in process and its report is captured."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "module.py")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("x=1\n")
+            output = run_black(["--check", path])
+        self.assertIn("would reformat", output)
+
+    def test_run_pylint_captures_json_report(self):
+        """pylint's JSON reporter output is captured instead of printed."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "module.py")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("import os\n")
+            output = run_pylint(["--output-format=json", path])
+        symbols = {m["symbol"] for m in json.loads(output)}
+        self.assertIn("unused-import", symbols)
+
+
+class TestFormatterLinterInProcess(unittest.TestCase):
+    """Tests for DevToolsAgent(in_process=True)."""
+
+    @patch("src.dev_tools.agent.subprocess.run")
+    @patch("src.dev_tools.agent.run_in_process")
+    def test_in_process_skips_subprocess(self, mock_in_process, mock_run):
+        """Both tools run in process with the subprocess arguments."""
+        mock_in_process.side_effect = lambda name, args: f"{name} ok"
+        agent = DevToolsAgent(in_process=True)
+
+        response = agent.run_formatter_linter(RunFormatterLinterRequest(path="src"))
+
+        self.assertTrue(response.success)
+        self.assertEqual("black ok", response.black_output)
+        self.assertEqual("pylint ok", response.pylint_output)
+        mock_in_process.assert_any_call("black", ["src"])
+        mock_in_process.assert_any_call(
+            "pylint", ["--ignore=.venv", "--jobs=0", "--output-format=json", "src"]
+        )
+        mock_run.assert_not_called()
+
+    @patch("src.dev_tools.agent.subprocess.run")
+    def test_black_formats_several_files_in_process(self, mock_run):
+        """black reformats a multi-file directory in process on the caller's thread."""
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = [os.path.join(tmp, name) for name in ("a.py", "b.py")]
+            for path in paths:
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write("x=1\n")
+            with patch.dict(
+                "src.dev_tools.in_process.RUNNERS", {"pylint": lambda args: "[]"}
+            ):
+                response = DevToolsAgent(in_process=True).run_formatter_linter(
+                    RunFormatterLinterRequest(path=tmp)
+                )
+            for path in paths:
+                with open(path, encoding="utf-8") as f:
+                    self.assertEqual("x = 1\n", f.read())
+        self.assertTrue(response.success, response.black_output)
+        self.assertIn("2 files reformatted", response.black_output)
+        mock_run.assert_not_called()
+
+    @patch("logging.warning")
+    @patch("logging.exception")
+    @patch("src.dev_tools.agent.subprocess.run")
+    def test_failed_in_process_run_falls_back_to_subprocess(
+        self, mock_run, _mock_log, _mock_warn
+    ):
+        """A tool that fails in process (e.g. off the main thread) is run as a subprocess."""
+        mock_run.return_value = MagicMock(
+            stdout="", stderr="All done! 2 files reformatted.", returncode=0
+        )
+
+        def fail(_args):
+            raise RuntimeError("set_wakeup_fd only works in main thread")
+
+        agent = DevToolsAgent(in_process=True)
+        with patch.dict(
+            "src.dev_tools.in_process.RUNNERS",
+            {"black": fail, "pylint": lambda args: "[]"},
+        ):
+            response = agent.run_formatter_linter(RunFormatterLinterRequest(path="src"))
+        self.assertTrue(response.success)
+        self.assertEqual("All done! 2 files reformatted.", response.black_output)
+        self.assertEqual([agent.tool_paths["black"], "src"], mock_run.call_args[0][0])
+
+    @patch("src.dev_tools.agent.subprocess.run")
+    def test_unit_tests_run_in_process(self, mock_run):
+        """Unit tests are discovered and run in this interpreter."""
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(
+                os.path.join(tmp, "test_in_process_sample.py"), "w", encoding="utf-8"
+            ) as f:
+                f.write(
+                    "import unittest\n\n\n"
+                    "class Sample(unittest.TestCase):\n"
+                    "    def test_pass(self):\n"
+                    "        pass\n\n"
+                    "    def test_fail(self):\n"
+                    "        self.fail('boom')\n"
+                )
+            self.addCleanup(sys.modules.pop, "test_in_process_sample", None)
+            self.addCleanup(lambda: tmp in sys.path and sys.path.remove(tmp))
+            # Project modules under the working directory are evicted before the run
+            with patch("os.getcwd", return_value=tmp):
+                agent = DevToolsAgent(in_process=True)
+                response = agent.run_unit_tests(RunUnitTestsRequest(test_path=tmp))
+        self.assertFalse(response.success)
+        self.assertTrue(response.summary.startswith("2 tests in"))
+        self.assertEqual(
+            ["FAIL: test_fail (test_in_process_sample.Sample.test_fail)"],
+            response.failed_tests,
+        )
+        mock_run.assert_not_called()
+
+    @patch("src.dev_tools.agent.subprocess.run")
+    def test_unit_tests_see_edited_project_code(self, _mock_run):
+        """Project modules the tests import are reloaded, so code edits are tested."""
+        with tempfile.TemporaryDirectory() as tmp:
+            test_dir = os.path.join(tmp, "tests")
+            os.mkdir(test_dir)
+            with open(
+                os.path.join(test_dir, "test_in_process_project.py"),
+                "w",
+                encoding="utf-8",
+            ) as f:
+                f.write(
+                    "import unittest\n\n"
+                    "import in_process_project_code\n\n\n"
+                    "class Sample(unittest.TestCase):\n"
+                    "    def test_answer(self):\n"
+                    "        self.assertEqual(2, in_process_project_code.ANSWER)\n"
+                )
+            for name in ("test_in_process_project", "in_process_project_code"):
+                self.addCleanup(sys.modules.pop, name, None)
+            sys.path.insert(0, tmp)
+            self.addCleanup(sys.path.remove, tmp)
+            self.addCleanup(lambda: test_dir in sys.path and sys.path.remove(test_dir))
+            # An edit within the same second could otherwise reuse the cached bytecode
+            self.enterContext(patch("sys.dont_write_bytecode", True))
+            agent = DevToolsAgent(in_process=True)
+            results = []
+            for answer in (1, 2):
+                with open(
+                    os.path.join(tmp, "in_process_project_code.py"),
+                    "w",
+                    encoding="utf-8",
+                ) as f:
+                    f.write(f"ANSWER = {answer}\n")
+                with patch("os.getcwd", return_value=tmp):
+                    response = agent.run_unit_tests(
+                        RunUnitTestsRequest(test_path=test_dir)
+                    )
+                results.append(response.success)
+        self.assertEqual([False, True], results)
+
+    @patch("logging.warning")
+    @patch("logging.exception")
+    @patch("src.dev_tools.agent.subprocess.run")
+    def test_unit_tests_fall_back_to_subprocess(self, mock_run, _mock_log, _mock_warn):
+        """Tests that exit the interpreter are rerun in a subprocess."""
+        mock_run.return_value = MagicMock(
+            stdout="", stderr="Ran 1 test in 0.001s\n\nOK\n", returncode=0
+        )
+
+        def exits(_args):
+            raise RuntimeError("unittest exited with status 2")
+
+        with patch.dict("src.dev_tools.in_process.RUNNERS", {"unittest": exits}):
+            response = DevToolsAgent(in_process=True).run_unit_tests(
+                RunUnitTestsRequest(test_path="tests")
+            )
+        self.assertTrue(response.success)
+        self.assertEqual("1 test in 0.001s", response.summary)
+        mock_run.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+"""
+Unit tests for the formatter/linter content-hash cache.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+from src.dev_tools.agent import CACHED_OUTPUT, DevToolsAgent
+from src.dev_tools.lint_cache import LintCache, python_files
+from src.dev_tools.schema import RunFormatterLinterRequest
+
+
+class LintCacheTestCase(unittest.TestCase):
+    """Base class that creates a temporary project directory and cache."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.tmp.cleanup)
+        self.src = os.path.join(self.tmp.name, "src")
+        os.makedirs(os.path.join(self.src, ".hidden"))
+        self.file_a = self.write("a.py", "A = 1\n")
+        self.file_b = self.write("b.py", "B = 2\n")
+        self.write(os.path.join(".hidden", "c.py"), "C = 3\n")
+        self.cache = LintCache(cache_dir=os.path.join(self.tmp.name, ".devtools_cache"))
+
+    def write(self, name, content):
+        """Write a file under the temporary src directory and return its path."""
+        path = os.path.join(self.src, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+
+class TestLintCache(LintCacheTestCase):
+    """Tests for LintCache change detection and persistence."""
+
+    def test_python_files_skips_hidden_dirs(self):
+        """Only Python files outside hidden directories are returned."""
+        self.assertEqual([self.file_a, self.file_b], python_files(self.src))
+
+    def test_python_files_single_file(self):
+        """A file path is returned as is."""
+        self.assertEqual([self.file_a], python_files(self.file_a))
+
+    def test_all_files_changed_initially(self):
+        """Nothing is cached before the first clean run."""
+        files = python_files(self.src)
+        self.assertEqual(files, self.cache.changed_files("pylint", files))
+
+    def test_clean_files_are_skipped_until_modified(self):
+        """Files marked clean are skipped until their contents change."""
+        files = python_files(self.src)
+        self.cache.mark_clean("pylint", files)
+        self.assertEqual([], self.cache.changed_files("pylint", files))
+
+        self.write("a.py", "A = 10\n")
+        self.assertEqual([self.file_a], self.cache.changed_files("pylint", files))
+
+    def test_tools_are_cached_separately(self):
+        """A file passed by pylint is still checked by black."""
+        files = python_files(self.src)
+        self.cache.mark_clean("pylint", files)
+        self.assertEqual(files, self.cache.changed_files("black", files))
+
+    def test_cache_persists_to_disk(self):
+        """A new cache instance reads the recorded hashes back."""
+        files = python_files(self.src)
+        self.cache.mark_clean("pylint", files)
+        reloaded = LintCache(cache_dir=os.path.dirname(self.cache.cache_path))
+        self.assertEqual([], reloaded.changed_files("pylint", files))
+
+    def test_version_change_invalidates(self):
+        """Entries are discarded when the tool version changes."""
+        files = python_files(self.src)
+        with patch("src.dev_tools.lint_cache.metadata.version", return_value="1.0"):
+            self.cache.mark_clean("pylint", files)
+        with patch("src.dev_tools.lint_cache.metadata.version", return_value="2.0"):
+            self.assertEqual(files, self.cache.changed_files("pylint", files))
+
+
+@patch("src.dev_tools.agent.subprocess.run")
+class TestFormatterLinterWithCache(LintCacheTestCase):
+    """Tests for run_formatter_linter with a lint cache."""
+
+    def setUp(self):
+        super().setUp()
+        self.agent = DevToolsAgent(lint_cache=self.cache)
+
+    def test_second_run_skips_unchanged_files(self, mock_run):
+        """Unchanged files are not passed to the tools on the next run."""
+        # pylint reports no messages as an empty JSON list
+        mock_run.side_effect = lambda cmd, **_kwargs: MagicMock(
+            stdout="[]" if cmd[0] == self.agent.tool_paths["pylint"] else "All done!",
+            stderr="",
+        )
+        request = RunFormatterLinterRequest(path=self.src)
+
+        self.agent.run_formatter_linter(request)
+        self.assertEqual(2, mock_run.call_count)
+        black = self.agent.tool_paths["black"]
+        black_cmd = next(
+            c[0][0] for c in mock_run.call_args_list if c[0][0][0] == black
+        )
+        self.assertEqual([black, self.file_a, self.file_b], black_cmd)
+
+        mock_run.reset_mock()
+        response = self.agent.run_formatter_linter(request)
+        mock_run.assert_not_called()
+        self.assertTrue(response.success)
+        self.assertEqual(CACHED_OUTPUT, response.pylint_output)
+
+    def test_files_with_pylint_messages_are_rechecked(self, mock_run):
+        """Files pylint reported on are linted again on the next run."""
+
+        def run(cmd, **_kwargs):
+            if cmd[0] == self.agent.tool_paths["pylint"]:
+                message = {
+                    "type": "convention",
+                    "path": self.file_b,
+                    "line": 1,
+                    "column": 0,
+                    "symbol": "missing-module-docstring",
+                    "message": "Missing module docstring",
+                    "message-id": "C0114",
+                }
+                return MagicMock(stdout=json.dumps([message]), stderr="")
+            return MagicMock(stdout="All done!", stderr="")
+
+        mock_run.side_effect = run
+        request = RunFormatterLinterRequest(path=self.src)
+        self.agent.run_formatter_linter(request)
+
+        mock_run.reset_mock()
+        self.agent.run_formatter_linter(request)
+        mock_run.assert_called_once_with(
+            [
+                self.agent.tool_paths["pylint"],
+                "--jobs=0",
+                "--output-format=json",
+                self.file_b,
+            ],
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=10,
+        )
+
+    def test_no_cache_checks_every_file(self, mock_run):
+        """no_cache runs the tools on the whole path."""
+        mock_run.return_value = MagicMock(stdout="All done!", stderr="")
+        self.agent.run_formatter_linter(RunFormatterLinterRequest(path=self.src))
+
+        mock_run.reset_mock()
+        self.agent.run_formatter_linter(
+            RunFormatterLinterRequest(path=self.src, no_cache=True)
+        )
+        self.assertEqual(2, mock_run.call_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
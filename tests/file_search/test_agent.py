@@ -2,24 +2,57 @@
 Unit tests for FileSearchAgent chunking logic and edge cases.
 """
 
+import itertools
+import os
+import tempfile
+import threading
+import time
 import unittest
-from unittest.mock import patch
-from src.file_search.agent import FileSearchAgent
+from unittest.mock import MagicMock
+from src.file_search.agent import (
+    CHUNK_SYSTEM_PROMPT,
+    DEFAULT_CHUNK_SIZE,
+    FileSearchAgent,
+    rechunk,
+)
+
+# A file with 3 chunks (chunk_size=10)
+CONTENT = "abcdefghij" * 3  # 30 chars
+QUESTION = "What is in this file?"
+# Files uploaded once per class, by key: (filename, content)
+CORPUS = {
+    "empty": ("empty.txt", ""),
+    "unicode": ("unicode.txt", "😀 Привет こんにちは مرحبا"),
+    "other": ("other.txt", "other content"),
+    "frog2": ("frog2.txt", "Another frog story."),
+    "huge": ("huge.txt", "abcdefghij" * 100),
+    "custom": ("custom.txt", "abcde" * 5),
+    "exact": ("exact.txt", "abcdefghij" * 2),  # exact multiple of chunk_size
+    "over": ("over.txt", "abcdefghijz"),  # just over the boundary
+}
 
 
 class TestFileSearchAgentChunking(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Uploads only add new file IDs, so one agent and upload serve every test
+        cls.completion = MagicMock()
+        cls.agent = FileSearchAgent(completion_fn=cls.completion)
+        cls.filename = "bigfile.txt"
+        cls.content = CONTENT
+        cls.file_id = cls.agent.upload_file(cls.filename, cls.content)
+        cls.question = QUESTION
+        cls.corpus = {
+            key: cls.agent.upload_file(filename, content)
+            for key, (filename, content) in CORPUS.items()
+        }
+
     def setUp(self):
-        self.agent = FileSearchAgent()
-        self.filename = "bigfile.txt"
-        # Create a file with 3 chunks (chunk_size=10)
-        self.content = "abcdefghij" * 3  # 30 chars
-        self.file_id = self.agent.upload_file(self.filename, self.content)
-        self.question = "What is in this file?"
-
-    @patch("src.file_search.agent.get_openai_completion")
-    def test_chunking_and_synthesis(self, mock_openai):
+        self.completion.reset_mock(return_value=True, side_effect=True)
+
+    def test_chunking_and_synthesis(self):
         # Simulate OpenAI returning the chunk number as the answer
-        mock_openai.side_effect = [
+        self.completion.side_effect = [
             "Chunk 1 answer",
             "Chunk 2 answer",
             "Chunk 3 answer",
@@ -27,104 +60,88 @@ class TestFileSearchAgentChunking(unittest.TestCase):
         ]
         answer = self.agent.answer_question(self.file_id, self.question, chunk_size=10)
         self.assertEqual("Synthesized answer", answer)
-        self.assertEqual(mock_openai.call_count, 4)
-        # Check that the synthesis prompt includes all partial answers
-        synthesis_prompt = mock_openai.call_args_list[-1][0][0]
-        self.assertIn("Chunk 1 answer", synthesis_prompt)
-        self.assertIn("Chunk 2 answer", synthesis_prompt)
-        self.assertIn("Chunk 3 answer", synthesis_prompt)
-
-    @patch("src.file_search.agent.get_openai_completion")
-    def test_single_chunk(self, mock_openai):
-        mock_openai.return_value = "Single chunk answer"
+        self.assertEqual(self.completion.call_count, 4)
+        # Check that the synthesis prompt includes all partial answers, in order
+        synthesis_prompt = self.completion.call_args_list[-1][0][0]
+        self.assertIn(
+            "Chunk 1 answer\nChunk 2 answer\nChunk 3 answer", synthesis_prompt
+        )
+
+    def test_single_chunk(self):
+        self.completion.return_value = "Single chunk answer"
         answer = self.agent.answer_question(self.file_id, self.question, chunk_size=100)
         self.assertEqual("Single chunk answer", answer)
-        self.assertEqual(mock_openai.call_count, 1)
+        self.assertEqual(self.completion.call_count, 1)
 
-    @patch("src.file_search.agent.get_openai_completion")
-    def test_file_not_found(self, mock_openai):
+    def test_file_not_found(self):
         with self.assertRaises(ValueError):
             self.agent.answer_question("nonexistent_id", self.question)
 
-    @patch("src.file_search.agent.get_openai_completion")
-    def test_empty_file_content(self, mock_openai):
-        file_id = self.agent.upload_file("empty.txt", "")
-        mock_openai.return_value = "No content"
-        answer = self.agent.answer_question(file_id, self.question)
+    def test_empty_file_content(self):
+        self.completion.return_value = "No content"
+        answer = self.agent.answer_question(self.corpus["empty"], self.question)
         self.assertEqual("No content", answer)
-        self.assertEqual(mock_openai.call_count, 1)
+        self.assertEqual(self.completion.call_count, 1)
 
-    @patch("src.file_search.agent.get_openai_completion")
-    def test_empty_question(self, mock_openai):
-        mock_openai.return_value = "No question provided"
+    def test_empty_question(self):
+        self.completion.return_value = "No question provided"
         answer = self.agent.answer_question(self.file_id, "")
         self.assertEqual("No question provided", answer)
-        self.assertEqual(mock_openai.call_count, 1)
-
-    @patch("src.file_search.agent.get_openai_completion")
-    def test_unicode_content(self, mock_openai):
-        unicode_content = "😀 Привет こんにちは مرحبا"
-        file_id = self.agent.upload_file("unicode.txt", unicode_content)
-        mock_openai.return_value = "Unicode handled"
-        answer = self.agent.answer_question(file_id, self.question)
+        self.assertEqual(self.completion.call_count, 1)
+
+    def test_unicode_content(self):
+        self.completion.return_value = "Unicode handled"
+        answer = self.agent.answer_question(self.corpus["unicode"], self.question)
         self.assertEqual("Unicode handled", answer)
-        self.assertEqual(mock_openai.call_count, 1)
-
-    @patch("src.file_search.agent.get_openai_completion")
-    def test_many_chunks(self, mock_openai):
-        # 100 chunks of 10 chars each
-        content = "abcdefghij" * 100
-        file_id = self.agent.upload_file("huge.txt", content)
-        # 100 partial answers + 1 synthesis
-        mock_openai.side_effect = [f"Chunk {i+1}" for i in range(100)] + ["Synthesized"]
-        answer = self.agent.answer_question(file_id, self.question, chunk_size=10)
-        self.assertEqual("Synthesized", answer)
-        self.assertEqual(mock_openai.call_count, 101)
-
-    @patch("src.file_search.agent.get_openai_completion")
-    def test_custom_chunk_size(self, mock_openai):
-        # 25 chars, chunk_size=5 -> 5 chunks
-        content = "abcde" * 5
-        file_id = self.agent.upload_file("custom.txt", content)
-        mock_openai.side_effect = [f"Chunk {i+1}" for i in range(5)] + ["Synthesized"]
-        answer = self.agent.answer_question(file_id, self.question, chunk_size=5)
-        self.assertEqual("Synthesized", answer)
-        self.assertEqual(mock_openai.call_count, 6)
+        self.assertEqual(self.completion.call_count, 1)
+
+    def test_chunk_counts(self):
+        # One request per chunk plus one synthesis request
+        for key, chunk_size, chunks in [
+            ("huge", 10, 100),
+            ("custom", 5, 5),
+            ("exact", 10, 2),
+            ("over", 10, 2),
+        ]:
+            with self.subTest(file=key, chunk_size=chunk_size):
+                self.completion.reset_mock()
+                # MagicMock draws from an iterator lazily, one reply per call
+                self.completion.side_effect = itertools.chain(
+                    map("Chunk {}".format, range(1, chunks + 1)), ["Synthesized"]
+                )
+                answer = self.agent.answer_question(
+                    self.corpus[key], self.question, chunk_size=chunk_size
+                )
+                self.assertEqual("Synthesized", answer)
+                self.assertEqual(chunks + 1, self.completion.call_count)
 
-    @patch("src.file_search.agent.get_openai_completion")
-    def test_multiple_files(self, mock_openai):
-        file_id2 = self.agent.upload_file("other.txt", "other content")
-        mock_openai.return_value = "Other file answer"
-        answer = self.agent.answer_question(file_id2, self.question)
+    def test_multiple_files(self):
+        self.completion.return_value = "Other file answer"
+        answer = self.agent.answer_question(self.corpus["other"], self.question)
         self.assertEqual("Other file answer", answer)
-        self.assertEqual(mock_openai.call_count, 1)
+        self.assertEqual(self.completion.call_count, 1)
 
-    @patch("src.file_search.agent.get_openai_completion")
-    def test_answer_question_multiple_files(self, mock_openai):
+    def test_answer_question_multiple_files(self):
         # Simulate two files, each with a single chunk
-        file_id2 = self.agent.upload_file("frog2.txt", "Another frog story.")
-        mock_openai.side_effect = [
+        self.completion.side_effect = [
             "Barley is a solitary frog.",
             "Another frog is also solitary.",
             "Both stories feature solitary frogs.",
         ]
         result = self.agent.answer_question_multiple_files(
-            [self.file_id, file_id2], self.question
+            [self.file_id, self.corpus["frog2"]], self.question
         )
         self.assertIn("Both stories feature solitary frogs.", result)
-        self.assertEqual(mock_openai.call_count, 3)
+        self.assertEqual(self.completion.call_count, 3)
 
-    @patch("src.file_search.agent.get_openai_completion")
-    def test_answer_question_multiple_files_empty(self, mock_openai):
+    def test_answer_question_multiple_files_empty(self):
         # Should return a clear message if no file IDs are provided
         result = self.agent.answer_question_multiple_files([], self.question)
         self.assertIn("No answers could be generated", result)
 
-    @patch("src.file_search.agent.get_openai_completion")
-    def test_answer_question_multiple_files_mixed_errors(self, mock_openai):
+    def test_answer_question_multiple_files_mixed_errors(self):
         # One valid, one invalid file ID
-        file_id2 = self.agent.upload_file("frog2.txt", "Another frog story.")
-        mock_openai.side_effect = [
+        self.completion.side_effect = [
             "Barley is a solitary frog.",
             "Both stories feature solitary frogs.",
         ]
@@ -134,56 +151,152 @@ class TestFileSearchAgentChunking(unittest.TestCase):
         self.assertIn("File ID bad_id: File not found.", result)
         self.assertNotIn("Both stories feature solitary frogs.", result)
 
-    @patch("src.file_search.agent.get_openai_completion")
-    def test_chunking_exact_multiple(self, mock_openai):
-        # File size is exactly 20, chunk_size=10 -> 2 chunks
-        content = "abcdefghij" * 2
-        file_id = self.agent.upload_file("exact.txt", content)
-        mock_openai.side_effect = ["Chunk 1", "Chunk 2", "Synthesized"]
-        answer = self.agent.answer_question(file_id, self.question, chunk_size=10)
-        self.assertEqual("Synthesized", answer)
-        self.assertEqual(mock_openai.call_count, 3)
-
-    @patch("src.file_search.agent.get_openai_completion")
-    def test_chunking_just_over_boundary(self, mock_openai):
-        # File size is 11, chunk_size=10 -> 2 chunks
-        content = "abcdefghijz"
-        file_id = self.agent.upload_file("over.txt", content)
-        mock_openai.side_effect = ["Chunk 1", "Chunk 2", "Synthesized"]
-        answer = self.agent.answer_question(file_id, self.question, chunk_size=10)
-        self.assertEqual("Synthesized", answer)
-        self.assertEqual(mock_openai.call_count, 3)
-
-    @patch("src.file_search.agent.get_openai_completion")
-    def test_many_files(self, mock_openai):
+    def test_many_files(self):
         # 10 files, each with a single chunk
         file_ids = [
             self.agent.upload_file(f"f{i}.txt", f"content {i}") for i in range(10)
         ]
-        mock_openai.side_effect = [f"A{i}" for i in range(10)] + ["Synthesized"]
+        self.completion.side_effect = [f"A{i}" for i in range(10)] + ["Synthesized"]
         answer = self.agent.answer_question_multiple_files(file_ids, self.question)
         self.assertEqual("Synthesized", answer)
-        self.assertEqual(mock_openai.call_count, 11)
+        self.assertEqual(self.completion.call_count, 11)
 
-    def test_upload_file_from_path_non_utf8(self):
-        import tempfile
-        import os
+    def test_chunk_answers_keep_file_order(self):
+        # Later chunks finish first; the synthesis prompt still lists them in order
+        def complete(prompt, system=None):
+            if "part 1" in prompt:
+                time.sleep(0.05)
+                return "Chunk 1 answer"
+            if "part " in prompt:
+                return "Chunk 2 answer" if "part 2" in prompt else "Chunk 3 answer"
+            return "Synthesized answer"
+
+        self.completion.side_effect = complete
+        self.agent.answer_question(self.file_id, self.question, chunk_size=10)
+        synthesis_prompt = self.completion.call_args_list[-1][0][0]
+        self.assertIn(
+            "Chunk 1 answer\nChunk 2 answer\nChunk 3 answer", synthesis_prompt
+        )
+
+    def test_max_in_flight_bounds_concurrent_requests(self):
+        agent = FileSearchAgent(max_in_flight=2, completion_fn=self.completion)
+        file_id = agent.upload_file("big.txt", "abcdefghij" * 10)
+        lock = threading.Lock()
+        in_flight = [0]
+        peak = [0]
+
+        def complete(_prompt, system=None):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.01)
+            with lock:
+                in_flight[0] -= 1
+            return "answer"
 
+        self.completion.side_effect = complete
+        agent.answer_question(file_id, self.question, chunk_size=10)
+        self.assertEqual(11, self.completion.call_count)
+        self.assertEqual(2, peak[0])
+
+    def test_upload_file_from_path_non_utf8(self):
         # Write a file with non-UTF-8 bytes
         with tempfile.NamedTemporaryFile(delete=False) as tmp:
             tmp.write(b"\xff\xfe\xfd")
             tmp_path = tmp.name
-        agent = FileSearchAgent()
         with self.assertRaises(ValueError):
-            agent.upload_file_from_path(tmp_path)
+            self.agent.upload_file_from_path(tmp_path)
         os.remove(tmp_path)
 
+    def test_upload_directory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, "sub"))
+            os.makedirs(os.path.join(tmp, ".git"))
+            for name, data in [
+                ("a.txt", b"alpha"),
+                (os.path.join("sub", "b.txt"), b"beta"),
+                (os.path.join(".git", "config"), b"hidden"),
+                ("binary.bin", b"\xff\xfe\xfd"),
+            ]:
+                with open(os.path.join(tmp, name), "wb") as f:
+                    f.write(data)
+            with self.assertLogs(level="WARNING"):
+                file_ids = self.agent.upload_directory(tmp)
+        a_path = os.path.join(tmp, "a.txt")
+        b_path = os.path.join(tmp, "sub", "b.txt")
+        self.assertEqual([a_path, b_path], list(file_ids))
+        self.assertEqual(["alpha"], self.agent.chunks[file_ids[a_path]])
+        self.assertEqual(b_path, self.agent.filenames[file_ids[b_path]])
+
     def test_duplicate_file_uploads(self):
         file_id1 = self.agent.upload_file("dupe.txt", "same content")
         file_id2 = self.agent.upload_file("dupe.txt", "same content")
         self.assertNotEqual(file_id1, file_id2)
-        self.assertIn(file_id1, self.agent.files)
-        self.assertIn(file_id2, self.agent.files)
+        self.assertIn(file_id1, self.agent.filenames)
+        self.assertIn(file_id2, self.agent.filenames)
+
+    def test_file_ids_are_sequential_per_agent(self):
+        agent = FileSearchAgent()
+        self.assertEqual("f1", agent.upload_file("a.txt", "a"))
+        self.assertEqual("f2", agent.upload_file("b.txt", "b"))
+
+    def test_chunk_instructions_sent_as_system_message(self):
+        self.completion.return_value = "Answer"
+        self.agent.answer_question(self.file_id, self.question)
+        prompt = self.completion.call_args[0][0]
+        self.assertEqual(CHUNK_SYSTEM_PROMPT, self.completion.call_args[1]["system"])
+        self.assertNotIn("You are an assistant", prompt)
+        self.assertTrue(prompt.startswith("File name: bigfile.txt\n"))
+
+    def test_upload_rejects_oversized_file(self):
+        agent = FileSearchAgent(max_file_chars=10)
+        agent.upload_file("small.txt", "a" * 10)
+        with self.assertRaises(ValueError):
+            agent.upload_file("big.txt", "a" * 11)
+
+    def test_one_request_in_flight_sends_chunks_in_order(self):
+        # With one slot, each chunk is sent only after the previous one is answered
+        agent = FileSearchAgent(max_in_flight=1, completion_fn=self.completion)
+        file_id = agent.upload_file("lazy.txt", "abcdefghij" * 3)
+        self.completion.side_effect = ["Chunk 1", "Chunk 2", "Chunk 3", "Synthesized"]
+        answer = agent.answer_question(file_id, self.question, chunk_size=10)
+        self.assertEqual("Synthesized", answer)
+        prompts = [c[0][0] for c in self.completion.call_args_list[:3]]
+        self.assertEqual(
+            ["part 1", "part 2", "part 3"],
+            [p[p.index("part") : p.index(")")] for p in prompts],
+        )
+
+    def test_upload_splits_content_into_default_chunks(self):
+        content = "a" * (DEFAULT_CHUNK_SIZE + 5)
+        file_id = self.agent.upload_file("split.txt", content)
+        self.assertEqual(
+            ["a" * DEFAULT_CHUNK_SIZE, "aaaaa"], self.agent.chunks[file_id]
+        )
+
+    def test_rechunk_matches_slicing(self):
+        content = "abcdefghijklmnopqrstuvwxyz"
+        even = [content[i : i + 8] for i in range(0, len(content), 8)]
+        # Segments spanning several chunks, and an empty one
+        uneven = [content[:2], content[2:19], "", content[19:]]
+        for chunk_size in (1, 3, 8, 10, 26, 100):
+            expected = [
+                content[i : i + chunk_size] for i in range(0, len(content), chunk_size)
+            ]
+            for segments in (even, uneven):
+                with self.subTest(chunk_size=chunk_size, segments=segments):
+                    self.assertEqual(expected, list(rechunk(segments, chunk_size)))
+
+    def test_non_positive_chunk_size_is_rejected(self):
+        for chunk_size in (0, -1):
+            with self.subTest(chunk_size=chunk_size):
+                with self.assertRaises(ValueError):
+                    list(rechunk(["abc"], chunk_size))
+                with self.assertRaises(ValueError):
+                    self.agent.answer_question(
+                        self.file_id, self.question, chunk_size=chunk_size
+                    )
+        self.completion.assert_not_called()
 
 
 if __name__ == "__main__":
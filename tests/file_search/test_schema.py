@@ -3,29 +3,37 @@ Unit tests for File Search Agent schemas.
 """
 
 import unittest
+import warnings
 from src.file_search import schema
 
+# Models are validated once per process; the tests only read them back.
+# Warnings (e.g. pydantic deprecations) raised while validating fail the import.
+with warnings.catch_warnings():
+    warnings.simplefilter("error")
+    UPLOAD_REQUEST = schema.FileUploadRequest(
+        filename="test.txt", content="Hello world!"
+    )
+    QUESTION_REQUEST = schema.QuestionRequest(
+        question="What is this file about?", file_id="abc123"
+    )
+    ANSWER_RESPONSE = schema.AnswerResponse(answer="This file is a greeting.")
+    ERROR_RESPONSE = schema.ErrorResponse(error="File not found.")
+
 
 class TestFileSearchSchemas(unittest.TestCase):
     def test_file_upload_request(self):
-        req = schema.FileUploadRequest(filename="test.txt", content="Hello world!")
-        self.assertEqual("test.txt", req.filename)
-        self.assertEqual("Hello world!", req.content)
+        self.assertEqual("test.txt", UPLOAD_REQUEST.filename)
+        self.assertEqual("Hello world!", UPLOAD_REQUEST.content)
 
     def test_question_request(self):
-        req = schema.QuestionRequest(
-            question="What is this file about?", file_id="abc123"
-        )
-        self.assertEqual("What is this file about?", req.question)
-        self.assertEqual("abc123", req.file_id)
+        self.assertEqual("What is this file about?", QUESTION_REQUEST.question)
+        self.assertEqual("abc123", QUESTION_REQUEST.file_id)
 
     def test_answer_response(self):
-        resp = schema.AnswerResponse(answer="This file is a greeting.")
-        self.assertEqual("This file is a greeting.", resp.answer)
+        self.assertEqual("This file is a greeting.", ANSWER_RESPONSE.answer)
 
     def test_error_response(self):
-        resp = schema.ErrorResponse(error="File not found.")
-        self.assertEqual("File not found.", resp.error)
+        self.assertEqual("File not found.", ERROR_RESPONSE.error)
 
 
 if __name__ == "__main__":
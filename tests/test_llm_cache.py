@@ -0,0 +1,66 @@
+"""
+Unit tests for the in-memory LLM response cache.
+"""
+
+import unittest
+
+from src.bug_report.schema import Severity
+from src.llm_cache import LLMCache
+
+
+class TestLLMCache(unittest.TestCase):
+    """Test suite for LLMCache key generation and eviction."""
+
+    def test_make_key_ignores_key_order(self):
+        """Payloads with the same content produce the same key."""
+        key1 = LLMCache.make_key({"model": "m", "state": {"a": 1, "b": 2}})
+        key2 = LLMCache.make_key({"state": {"b": 2, "a": 1}, "model": "m"})
+        self.assertEqual(key1, key2)
+
+    def test_make_key_differs_for_different_input(self):
+        """Different user input produces a different key."""
+        key1 = LLMCache.make_key({"model": "m", "user": "hello"})
+        key2 = LLMCache.make_key({"model": "m", "user": "goodbye"})
+        self.assertNotEqual(key1, key2)
+
+    def test_make_key_handles_non_json_values(self):
+        """Values JSON cannot encode natively (e.g. enums) fall back to str."""
+        key1 = LLMCache.make_key({"state": {"severity": Severity.HIGH}})
+        key2 = LLMCache.make_key({"state": {"severity": Severity.LOW}})
+        self.assertNotEqual(key1, key2)
+        self.assertEqual(
+            key1, LLMCache.make_key({"state": {"severity": Severity.HIGH}})
+        )
+
+    def test_get_miss_returns_none(self):
+        """A missing key returns None."""
+        cache = LLMCache()
+        self.assertIsNone(cache.get("missing"))
+
+    def test_set_then_get(self):
+        """A stored value is returned on a hit."""
+        cache = LLMCache()
+        cache.set("key", {"field": "value"})
+        self.assertEqual({"field": "value"}, cache.get("key"))
+
+    def test_evicts_least_recently_used(self):
+        """The least recently used entry is evicted when the cache is full."""
+        cache = LLMCache(max_size=2)
+        cache.set("a", {"v": 1})
+        cache.set("b", {"v": 2})
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", {"v": 3})
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual({"v": 1}, cache.get("a"))
+
+    def test_clear(self):
+        """clear removes all entries."""
+        cache = LLMCache()
+        cache.set("a", {"v": 1})
+        cache.clear()
+        self.assertEqual(0, len(cache))
+
+
+if __name__ == "__main__":
+    unittest.main()
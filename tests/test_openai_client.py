@@ -2,28 +2,173 @@
 Unit tests for the OpenAI client utility functions in the AI Agents project.
 """
 
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
 import unittest
-from unittest.mock import patch, MagicMock
-from src.openai_client import get_openai_completion
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from src.openai_client import (
+    get_openai_api_key,
+    get_openai_client,
+    get_openai_completion,
+    soothing_sunset_description,
+)
+
+# Recorded OpenAI replies for the live tests, one JSON file per request
+FIXTURE_DIR = Path(__file__).parent / "fixtures" / "openai"
+
+# Any real sunset description mentions at least one of these
+SUNSET_PATTERN = re.compile(r"\b(sun|sunset|horizon|sky)\b", re.IGNORECASE)
+
+# Fake chat completion; get_openai_completion only reads the first choice's text
+HELLO_RESPONSE = SimpleNamespace(
+    choices=[SimpleNamespace(message=SimpleNamespace(content="Hello, world!"))]
+)
+
+
+class TestOpenAICompletion(unittest.TestCase):
+    """Tests for get_openai_completion against a fake shared client."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Patch get_openai_client once for the class."""
+        cls.patcher = patch("src.openai_client.get_openai_client")
+        cls.mock_create = cls.patcher.start().return_value.chat.completions.create
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.patcher.stop()
+
+    def setUp(self):
+        self.mock_create.reset_mock(return_value=True, side_effect=True)
+        self.mock_create.return_value = HELLO_RESPONSE
+
+    def test_get_openai_completion(self):
+        """Test get_openai_completion returns expected content from mocked API."""
+        self.assertEqual("Hello, world!", get_openai_completion("Say hello"))
+        self.assertEqual(
+            [{"role": "user", "content": "Say hello"}],
+            self.mock_create.call_args[1]["messages"],
+        )
+
+    def test_get_openai_completion_with_system(self):
+        """A system message is sent before the prompt when given."""
+        get_openai_completion("Question", system="Instructions")
+        self.assertEqual(
+            [
+                {"role": "system", "content": "Instructions"},
+                {"role": "user", "content": "Question"},
+            ],
+            self.mock_create.call_args[1]["messages"],
+        )
+
+    def test_soothing_sunset_description(self):
+        """The sunset helper returns the model's reply to its fixed prompt."""
+        self.mock_create.return_value = SimpleNamespace(
+            choices=[
+                SimpleNamespace(
+                    message=SimpleNamespace(content="A calm sunset over the horizon.")
+                )
+            ]
+        )
+        self.assertEqual(
+            "A calm sunset over the horizon.", soothing_sunset_description()
+        )
+        self.assertIn("sunset", self.mock_create.call_args[1]["messages"][0]["content"])
+
+
+def replay_create(**kwargs):
+    """
+    chat.completions.create stand-in that replays recorded replies from FIXTURE_DIR.
+    Recordings are keyed by model and messages. A missing recording is made with the
+    real API when RUN_OPENAI_LIVE is set (OPENAI_TEST_REFRESH=1 re-records all),
+    otherwise the test is skipped.
+    """
+    request = {"model": kwargs["model"], "messages": kwargs["messages"]}
+    key = hashlib.sha1(json.dumps(request, sort_keys=True).encode()).hexdigest()
+    path = FIXTURE_DIR / f"{key}.json"
+    if os.getenv("OPENAI_TEST_REFRESH") or not path.exists():
+        if not os.getenv("RUN_OPENAI_LIVE"):
+            raise unittest.SkipTest("no recording; set RUN_OPENAI_LIVE=1 to record one")
+        response = get_openai_client().chat.completions.create(**kwargs)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps(
+                {**request, "content": response.choices[0].message.content}, indent=2
+            ),
+            encoding="utf-8",
+        )
+    content = json.loads(path.read_text(encoding="utf-8"))["content"]
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+    )
+
+
+@pytest.mark.integration
+@pytest.mark.xdist_group("openai_live")
+class TestLiveOpenAIClient(unittest.TestCase):
+    """Checks against real API replies, recorded once and replayed from disk."""
+
+    def test_soothing_sunset_description_real_api(self):
+        """A real reply describes a sunset."""
+        client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=replay_create))
+        )
+        with patch("src.openai_client.get_openai_client", return_value=client):
+            description = soothing_sunset_description()
+        self.assertRegex(description, SUNSET_PATTERN)
 
 
 class TestOpenAIClient(unittest.TestCase):
     """Test suite for OpenAI client helper functions."""
 
-    @patch("src.openai_client.openai.chat.completions.create")
-    def test_get_openai_completion(self, mock_create):
-        """Test get_openai_completion returns expected content from mocked API."""
-        # Arrange: Mock the OpenAI API response for openai>=1.0.0
-        mock_choice = MagicMock()
-        mock_choice.message.content = "Hello, world!"
-        mock_create.return_value.choices = [mock_choice]
-        prompt = "Say hello"
+    @patch("openai.OpenAI")
+    @patch.dict("os.environ", {"OPENAI_API_KEY": "test"})
+    def test_get_openai_client_is_shared(self, mock_openai):
+        """get_openai_client creates one client and reuses it on later calls."""
+        # Both are cached; clear them so the patched key and client are used
+        for cached in (get_openai_api_key, get_openai_client):
+            cached.cache_clear()
+            self.addCleanup(cached.cache_clear)
+
+        first = get_openai_client()
+        second = get_openai_client()
+
+        self.assertIs(first, second)
+        mock_openai.assert_called_once_with(api_key="test")
 
-        # Act
-        result = get_openai_completion(prompt)
+    @patch("dotenv.load_dotenv")
+    @patch.dict("os.environ", {}, clear=True)
+    def test_missing_api_key_raises_on_first_use(self, _mock_load_dotenv):
+        """A missing key is reported when a client is needed, not at import."""
+        get_openai_api_key.cache_clear()
+        self.addCleanup(get_openai_api_key.cache_clear)
+        with self.assertRaises(RuntimeError):
+            get_openai_api_key()
 
-        # Assert
-        self.assertEqual("Hello, world!", result)
+    def test_import_does_not_load_openai(self):
+        """Importing the client helpers and agents that use them leaves openai unloaded."""
+        code = (
+            "import sys, src.openai_client, src.dev_tools.agent, src.bug_report.agent, "
+            "src.daily_standup.agent, src.combined.agent, src.file_search.agent, "
+            "src.top_news.agent; "
+            "print('openai' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual("False", result.stdout.strip())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,100 @@
+"""
+Unit tests for the semantic-similarity LLM cache.
+"""
+
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from src.semantic_cache import SemanticCache, quantize_int8
+
+# Fixed embeddings so similarity is known: "a" and "a2" are near-duplicates
+VECTORS = {
+    "a": [1.0, 0.0, 0.0],
+    "a2": [0.99, 0.1, 0.0],
+    "b": [0.0, 1.0, 0.0],
+    "c": [0.0, 0.0, 1.0],
+}
+
+
+class TestSemanticCache(unittest.TestCase):
+    """Test suite for SemanticCache lookup and eviction."""
+
+    def setUp(self):
+        self.cache = SemanticCache(embed=VECTORS.__getitem__, max_size=2)
+
+    def test_embed_is_unit_length(self):
+        """Embeddings are normalized so the dot product is cosine similarity."""
+        embedding = self.cache.embed("a2")
+        self.assertEqual(np.float32, embedding.dtype)
+        self.assertAlmostEqual(1.0, float(np.linalg.norm(embedding)), places=5)
+
+    def test_near_duplicate_hits(self):
+        """A similar input returns the stored value."""
+        self.cache.set(self.cache.embed("a"), {"value": 1})
+        self.assertEqual({"value": 1}, self.cache.get(self.cache.embed("a2")))
+
+    def test_dissimilar_input_misses(self):
+        """An input below the similarity threshold is a miss."""
+        self.cache.set(self.cache.embed("a"), {"value": 1})
+        self.assertIsNone(self.cache.get(self.cache.embed("b")))
+
+    def test_empty_cache_misses(self):
+        """An empty cache returns None."""
+        self.assertIsNone(self.cache.get(self.cache.embed("a")))
+
+    def test_oldest_entry_replaced_when_full(self):
+        """Storing past max_size replaces the oldest entry."""
+        self.cache.set(self.cache.embed("a"), {"value": 1})
+        self.cache.set(self.cache.embed("b"), {"value": 2})
+        self.cache.set(self.cache.embed("c"), {"value": 3})
+        self.assertEqual(2, len(self.cache))
+        self.assertIsNone(self.cache.get(self.cache.embed("a")))
+        self.assertEqual({"value": 2}, self.cache.get(self.cache.embed("b")))
+        self.assertEqual({"value": 3}, self.cache.get(self.cache.embed("c")))
+
+    def test_clear(self):
+        """clear removes all entries."""
+        self.cache.set(self.cache.embed("a"), {"value": 1})
+        self.cache.clear()
+        self.assertEqual(0, len(self.cache))
+        self.assertIsNone(self.cache.get(self.cache.embed("a")))
+
+    def test_quantized_cache_matches_float_results(self):
+        """An int8 cache finds the same hits and misses as the float32 cache."""
+        cache = SemanticCache(embed=VECTORS.__getitem__, quantize=True)
+        cache.set(cache.embed("a"), {"value": 1})
+        self.assertEqual({"value": 1}, cache.get(cache.embed("a2")))
+        self.assertIsNone(cache.get(cache.embed("b")))
+
+    def test_quantized_lookup_across_blocks_matches_float(self):
+        """Block-wise int8 lookups pick the same entries as float32 over many rows."""
+        rng = np.random.default_rng(0)
+        vectors = {str(i): rng.standard_normal(64).tolist() for i in range(10)}
+        float_cache = SemanticCache(embed=vectors.__getitem__, threshold=-1.0)
+        int8_cache = SemanticCache(
+            embed=vectors.__getitem__, threshold=-1.0, quantize=True
+        )
+        for key in vectors:
+            for cache in (float_cache, int8_cache):
+                cache.set(cache.embed(key), {"value": key})
+        # Three full blocks and a partial one
+        with patch("src.semantic_cache.QUANTIZED_BLOCK_ROWS", 3):
+            for key in vectors:
+                with self.subTest(key=key):
+                    query = float_cache.embed(key)
+                    self.assertEqual(float_cache.get(query), int8_cache.get(query))
+                    self.assertEqual({"value": key}, int8_cache.get(query))
+
+    def test_quantize_int8_round_trip(self):
+        """Dequantized values stay within half a quantization step."""
+        vector = np.array([0.5, -0.25, 0.1], np.float32)
+        quantized, scale = quantize_int8(vector)
+        self.assertEqual(np.int8, quantized.dtype)
+        self.assertEqual(127, int(quantized[0]))
+        np.testing.assert_allclose(vector, quantized * scale, atol=scale / 2)
+
+
+if __name__ == "__main__":
+    unittest.main()